@@ -1,10 +1,14 @@
 from rltk.blocking.block import Block
+from rltk.blocking.compact_block import CompactBlock
 from rltk.blocking.block_black_list import BlockBlackList
 from rltk.blocking.block_generator import BlockGenerator
 from rltk.blocking.hash_block_generator import HashBlockGenerator
 from rltk.blocking.token_block_generator import TokenBlockGenerator
 from rltk.blocking.canopy_block_generator import CanopyBlockGenerator
 from rltk.blocking.sorted_neighbourhood_block_generator import SortedNeighbourhoodBlockGenerator
+from rltk.blocking.set_similarity_join_block_generator import SetSimilarityJoinBlockGenerator
+from rltk.blocking.edit_distance_join_block_generator import EditDistanceJoinBlockGenerator
+from rltk.blocking.meta_blocker import MetaBlocker
 from rltk.blocking.blocking_helper import BlockingHelper
 
 Blocker = BlockGenerator
@@ -12,3 +16,5 @@ HashBlocker = HashBlockGenerator
 TokenBlocker = TokenBlockGenerator
 CanopyBlocker = CanopyBlockGenerator
 SortedNeighbourhoodBlocker = SortedNeighbourhoodBlockGenerator
+SetSimilarityJoinBlocker = SetSimilarityJoinBlockGenerator
+EditDistanceJoinBlocker = EditDistanceJoinBlockGenerator
@@ -1,9 +1,17 @@
+import collections
+import heapq
 import itertools
+import json
+import os
+import tempfile
+from typing import TYPE_CHECKING
 
 from rltk.io.adapter.key_set_adapter import KeySetAdapter
 from rltk.io.adapter.memory_key_set_adapter import MemoryKeySetAdapter
 from rltk.dataset import Dataset
 from rltk.record import Record
+if TYPE_CHECKING:
+    from rltk.blocking.block_black_list import BlockBlackList
 
 
 class Block(object):
@@ -98,3 +106,220 @@ class Block(object):
                 # combinations of two elements
                 for ds1, ds1_ in itertools.combinations(ds1, 2):
                     yield block_id, ds1, ds1_
+
+    def _pairs(self, ds_id1, ds_id2=None):
+        """
+        Same as :meth:`pairwise`, but ids of a self-join pair are ordered, so a pair has only one form.
+        """
+        for _, id1, id2 in self.pairwise(ds_id1, ds_id2):
+            if ds_id2 is None and id2 < id1:
+                id1, id2 = id2, id1
+            yield id1, id2
+
+    def unique_pairs(self, ds_id1: str, ds_id2: str = None, buffer_size: int = None, temp_dir: str = None):
+        """
+        Iterator of id pairs generated according to blocks, each pair is generated only once \
+        even if both records are in several blocks.
+
+        Args:
+            ds_id1 (str / Dataset): Dataset id or Dataset object.
+            ds_id2 (str / Dataset, optional): Dataset id or Dataset object. \
+                If it's None, pairs within ds_id1 are generated.
+            buffer_size (int, optional): If it's None, seen pairs are kept in memory (hash set) \
+                and pairs are generated as soon as they are found. \
+                Otherwise, at most this number of pairs is kept in memory, the others are sorted \
+                and spilled to temporary files, then merged; pairs are generated in sorted order \
+                after all blocks are read. Defaults to None.
+            temp_dir (str, optional): Directory of temporary files. Defaults to None (system default).
+
+        Returns:
+            iter: id1, id2. In self-join, id1 < id2.
+
+        Note:
+            Record ids need to be comparable. If `buffer_size` is set, ids need to be JSON serializable.
+        """
+        if isinstance(ds_id1, Dataset):
+            ds_id1 = ds_id1.id
+        if ds_id2 and isinstance(ds_id2, Dataset):
+            ds_id2 = ds_id2.id
+
+        if buffer_size is None:
+            seen = set()
+            for pair in self._pairs(ds_id1, ds_id2):
+                if pair not in seen:
+                    seen.add(pair)
+                    yield pair
+            return
+
+        if buffer_size < 1:
+            raise ValueError('buffer_size should be a positive integer')
+
+        with tempfile.TemporaryDirectory(dir=temp_dir) as run_dir:
+            runs, buffer = [], set()
+            for pair in self._pairs(ds_id1, ds_id2):
+                buffer.add(pair)
+                if len(buffer) >= buffer_size:
+                    runs.append(self._spill(run_dir, len(runs), buffer))
+                    buffer = set()
+
+            files = [open(f, 'r') for f in runs]
+            try:
+                sources = [(tuple(json.loads(line)) for line in f) for f in files]
+                last = None
+                for pair in heapq.merge(sorted(buffer), *sources):
+                    if pair != last:
+                        last = pair
+                        yield pair
+            finally:
+                for f in files:
+                    f.close()
+
+    @staticmethod
+    def _spill(run_dir, run_no, pairs):
+        """
+        Write a sorted run of pairs to a file, one pair per line.
+        """
+        file_path = os.path.join(run_dir, 'run_{}.jl'.format(run_no))
+        with open(file_path, 'w') as f:
+            for pair in sorted(pairs):
+                f.write(json.dumps(pair) + '\n')
+        return file_path
+
+    @staticmethod
+    def _pair_count(data, ds_id1, ds_id2=None):
+        """
+        Number of pairs :meth:`pairwise` generates from one block.
+        """
+        n1 = sum(1 for dataset_id, _ in data if dataset_id == ds_id1)
+        if ds_id2:
+            return n1 * sum(1 for dataset_id, _ in data if dataset_id == ds_id2)
+        return n1 * (n1 - 1) // 2
+
+    def pair_redundancy(self, ds_id1: str, ds_id2: str = None, buffer_size: int = None, temp_dir: str = None):
+        """
+        How many pairs generated by :meth:`pairwise` are repeated.
+
+        Args:
+            ds_id1 (str / Dataset): Dataset id or Dataset object.
+            ds_id2 (str / Dataset, optional): Dataset id or Dataset object.
+            buffer_size (int, optional): See :meth:`unique_pairs`.
+            temp_dir (str, optional): See :meth:`unique_pairs`.
+
+        Returns:
+            dict: `pairs` (generated by :meth:`pairwise`), `unique_pairs` and \
+                `redundancy_ratio` (fraction of pairs which are repeated).
+        """
+        if isinstance(ds_id1, Dataset):
+            ds_id1 = ds_id1.id
+        if ds_id2 and isinstance(ds_id2, Dataset):
+            ds_id2 = ds_id2.id
+
+        pairs = sum(self._pair_count(data, ds_id1, ds_id2) for _, data in self.key_set_adapter)
+        unique = sum(1 for _ in self.unique_pairs(ds_id1, ds_id2, buffer_size, temp_dir))
+        return {
+            'pairs': pairs,
+            'unique_pairs': unique,
+            'redundancy_ratio': 1.0 - float(unique) / pairs if pairs else 0.0
+        }
+
+    def _block_sizes(self):
+        """
+        Returns:
+            iter: block_id, {dataset_id: number of records}.
+        """
+        for block_id, data in self.key_set_adapter:
+            yield block_id, collections.Counter(dataset_id for dataset_id, _ in data)
+
+    @staticmethod
+    def _comparisons(sizes, ds_id1, ds_id2=None):
+        if ds_id2:
+            return sizes.get(ds_id1, 0) * sizes.get(ds_id2, 0)
+        n = sizes.get(ds_id1, 0)
+        return n * (n - 1) // 2
+
+    def statistics(self, top: int = 10):
+        """
+        Statistics of blocks, which can be used to estimate the cost before generating pairs.
+
+        Args:
+            top (int, optional): Number of largest blocks in report. Defaults to 10.
+
+        Returns:
+            dict: `blocks` (number of blocks), `records` (sum of block sizes), \
+                `size_histogram` (``{block size: number of blocks}``), \
+                `comparisons` (``{(dataset_id1, dataset_id2): number of pairs}``, \
+                same as the number of pairs :meth:`pairwise` generates, \
+                `dataset_id1` equals `dataset_id2` in de-duplication) and \
+                `largest_blocks` (``[(block_id, size)]``).
+        """
+        num_blocks, num_records = 0, 0
+        histogram = collections.Counter()
+        comparisons = collections.Counter()
+        largest = []  # heap of (size, block_id)
+        for block_id, sizes in self._block_sizes():
+            size = sum(sizes.values())
+            num_blocks += 1
+            num_records += size
+            histogram[size] += 1
+            if len(largest) < top:
+                heapq.heappush(largest, (size, block_id))
+            elif top > 0 and size > largest[0][0]:
+                heapq.heapreplace(largest, (size, block_id))
+
+            ds_ids = sorted(sizes)
+            for i, ds_id1 in enumerate(ds_ids):
+                comparisons[(ds_id1, ds_id1)] += self._comparisons(sizes, ds_id1)
+                for ds_id2 in ds_ids[i + 1:]:
+                    comparisons[(ds_id1, ds_id2)] += self._comparisons(sizes, ds_id1, ds_id2)
+
+        return {
+            'blocks': num_blocks,
+            'records': num_records,
+            'size_histogram': dict(sorted(histogram.items())),
+            'comparisons': {k: v for k, v in comparisons.items() if v > 0},
+            'largest_blocks': [(block_id, size) for size, block_id in sorted(largest, reverse=True)],
+        }
+
+    def purge(self, max_comparisons: int, ds_id1: str, ds_id2: str = None,
+              block_black_list: 'BlockBlackList' = None):
+        """
+        Remove the largest blocks so that :meth:`pairwise` generates at most `max_comparisons` pairs. \
+        The size cutoff is the largest one which satisfies the budget, \
+        all blocks larger than it are removed.
+
+        Args:
+            max_comparisons (int): Budget of pairs.
+            ds_id1 (str / Dataset): Dataset id or Dataset object.
+            ds_id2 (str / Dataset, optional): Dataset id or Dataset object. \
+                If it's None, pairs within ds_id1 are counted.
+            block_black_list (BlockBlackList, optional): Where removed block ids are added. Defaults to None.
+
+        Returns:
+            dict: `max_size` (size cutoff, None if nothing is removed), `removed_blocks` and \
+                `comparisons` (number of pairs after purging).
+        """
+        if isinstance(ds_id1, Dataset):
+            ds_id1 = ds_id1.id
+        if ds_id2 and isinstance(ds_id2, Dataset):
+            ds_id2 = ds_id2.id
+
+        comparisons_of_size = collections.Counter()
+        for _, sizes in self._block_sizes():
+            comparisons_of_size[sum(sizes.values())] += self._comparisons(sizes, ds_id1, ds_id2)
+
+        total, max_size = 0, None
+        for size in sorted(comparisons_of_size):
+            if total + comparisons_of_size[size] > max_comparisons:
+                break
+            total += comparisons_of_size[size]
+            max_size = size
+        else:
+            return {'max_size': None, 'removed_blocks': 0, 'comparisons': total}
+
+        max_size = max_size or 0
+        removed = [block_id for block_id, data in self.key_set_adapter if len(data) > max_size]
+        for block_id in removed:
+            self.key_set_adapter.delete(block_id)
+            if block_black_list:
+                block_black_list.key_set_adapter.set(block_id, set())
+        return {'max_size': max_size, 'removed_blocks': len(removed), 'comparisons': total}
@@ -41,8 +41,8 @@ class BlockBlackList(object):
                 this block_id will be added to BlockBlackList and this block is removed from Block.
         """
         if self._max_size > 0:
-            d = block.key_set_adapter.get(block_id)
-            if len(d) > self._max_size:
+            # size is asked from the adapter (e.g., SCARD of redis), so the block data is not fetched
+            if block.key_set_adapter.size(block_id) > self._max_size:
                 self.key_set_adapter.set(block_id, set())
                 block.key_set_adapter.delete(block_id)
         else:
@@ -1,3 +1,5 @@
+import collections
+import itertools
 from typing import Callable, TYPE_CHECKING
 
 if TYPE_CHECKING:
@@ -12,7 +14,8 @@ class BlockGenerator(object):
     """
 
     def block(self, dataset: 'Dataset', function_: Callable = None, property_: str = None,
-              block: Block = None, block_black_list: BlockBlackList = None, base_on: Block = None):
+              block: Block = None, block_black_list: BlockBlackList = None, base_on: Block = None,
+              pp_num_of_processor: int = 0, pp_chunk_size: int = 1000):
         """
         Block on property or by function for dataset.
         
@@ -23,6 +26,10 @@ class BlockGenerator(object):
             block (Block): Where to write blocks. If None, a new block will be created. Defaults to None.
             block_black_list (BlockBlackList, optional): Where all blacklisted blocks are stored. Defaults to None.
             base_on (Block, optional): Current block is generated base on this block. Defaults to None.
+            pp_num_of_processor (int, optional): If it's greater than 1, `function_` (or `property_`) is computed \
+                            for chunks of records by this number of processes, and blocks are merged in \
+                            the main process. It doesn't apply to `base_on`. Defaults to 0.
+            pp_chunk_size (int, optional): Number of records in one task of a process. Defaults to 1000.
                                     
         Returns:
             Block: 
@@ -30,6 +37,41 @@ class BlockGenerator(object):
         block = BlockGenerator._block_args_check(function_, property_, block)
         return block
 
+    @staticmethod
+    def _record_values(dataset: 'Dataset', function_: Callable = None, property_: str = None,
+                       pp_num_of_processor: int = 0, pp_chunk_size: int = 1000):
+        """
+        Return of `function_` (or `property_`) of each record in dataset.
+        If `pp_num_of_processor` is greater than 1, chunks of records are computed in parallel.
+
+        Returns:
+            iter: record id, value.
+        """
+        def value_of(r):
+            return function_(r) if function_ else getattr(r, property_)
+
+        if pp_num_of_processor <= 1:
+            for r in dataset:
+                yield r.id, value_of(r)
+            return
+
+        import multiprocess  # only needed in parallel
+
+        def mapper(records):
+            return [(r.id, value_of(r)) for r in records]
+
+        records = iter(dataset)
+        chunks = iter(lambda: list(itertools.islice(records, pp_chunk_size)), [])
+        with multiprocess.Pool(pp_num_of_processor) as pool:
+            # keep a few chunks per process in flight, results are in the order of dataset
+            pending = collections.deque()
+            for chunk in chunks:
+                pending.append(pool.apply_async(mapper, (chunk,)))
+                if len(pending) >= 2 * pp_num_of_processor:
+                    yield from pending.popleft().get()
+            while pending:
+                yield from pending.popleft().get()
+
     @staticmethod
     def _block_args_check(function_, property_, block):
         if not function_ and not property_:
@@ -2,9 +2,20 @@ import json
 import random
 from typing import Callable
 
+import numpy as np
+
 from rltk.blocking.block_generator import BlockGenerator
 from rltk.blocking.block import Block
 from rltk.blocking.block_black_list import BlockBlackList
+from rltk.similarity.distance import euclidean_distance, euclidean_distance_batch, \
+    manhattan_distance, manhattan_distance_batch
+
+
+# one-to-many versions of built-in distance metrics
+_BATCH_DISTANCE_METRICS = {
+    euclidean_distance: euclidean_distance_batch,
+    manhattan_distance: manhattan_distance_batch,
+}
 
 
 class CanopyBlockGenerator(BlockGenerator):
@@ -15,7 +26,9 @@ class CanopyBlockGenerator(BlockGenerator):
         t1 (float): The loose distance.
         t2 (float): The tight distance.
         distance_metric (Callable): Compute the distance between two vectors return from :meth:`block`.
-                              The signature is `distance(v1: List, v2: List) -> float`
+                              The signature is `distance(v1: List, v2: List) -> float`.
+                              If it is :meth:`rltk.euclidean_distance` or :meth:`rltk.manhattan_distance`,
+                              distances to all points are computed at once.
     """
     def __init__(self, t1, t2, distance_metric):
         if t1 <= t2:
@@ -30,7 +43,7 @@ class CanopyBlockGenerator(BlockGenerator):
     def block(self, dataset, function_: Callable = None, property_: str = None,
               block: Block = None, block_black_list: BlockBlackList = None, base_on: Block = None):
         """
-        The return of `property_` or `function_` should be a vector (list).
+        The return of `property_` or `function_` should be a vector (list or numpy.ndarray).
         """
         block = super()._block_args_check(function_, property_, block)
 
@@ -53,6 +66,8 @@ class CanopyBlockGenerator(BlockGenerator):
         else:
             for r in dataset:
                 value = function_(r) if function_ else getattr(r, property_)
+                if isinstance(value, np.ndarray):
+                    value = value.tolist()
                 if not isinstance(value, list):
                     raise ValueError('Return of the function or property should be a vector (list)')
                 k = self._encode_key(value)
@@ -117,9 +132,14 @@ class CanopyBlockGenerator(BlockGenerator):
             delete_list = []
             del dataset[center_idx]
 
+            if distance_metric in _BATCH_DISTANCE_METRICS:
+                distances = _BATCH_DISTANCE_METRICS[distance_metric](center_vec, dataset)
+            else:
+                distances = [distance_metric(center_vec, d) for d in dataset]
+
             for d_idx in range(len(dataset)):
                 d = dataset[d_idx]
-                distance = distance_metric(center_vec, d)
+                distance = distances[d_idx]
                 if distance < t1:
                     new_canopy.append(d)
                 if distance < t2:
@@ -0,0 +1,296 @@
+import array
+import itertools
+
+import numpy as np
+
+from rltk.io.adapter.key_set_adapter import KeySetAdapter
+from rltk.blocking.block import Block
+from rltk.dataset import Dataset
+
+
+# members are encoded as (dataset index << 32 | record index) in int64
+_MAX_DATASETS = 1 << 31
+_MAX_RECORDS = 1 << 32
+
+
+def _index_dtype(max_value):
+    """
+    Smallest unsigned integer type which holds indices up to max_value.
+    """
+    for dtype in (np.uint16, np.uint32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.uint64
+
+
+class CompactKeySetAdapter(KeySetAdapter):
+    """
+    Key set adapter of :meth:`CompactBlock`. Values need to be `(dataset_id, record_id)`.
+
+    Each dataset id and record id (per dataset) is stored once and mapped to an integer, \
+    members of a block are stored as integers in an array. After :meth:`freeze`, \
+    all blocks are packed into CSR-style numpy arrays (block -> members) and the adapter is read-only.
+    """
+
+    def __init__(self):
+        self._datasets = []  # dataset index -> dataset id
+        self._dataset_index = {}
+        self._records = []  # dataset index -> [record id]
+        self._record_index = []  # dataset index -> {record id: record index}
+        self._blocks = []  # block index -> block id, None if deleted
+        self._block_index = {}
+        self._building = {}  # block index -> array of (dataset index << 32 | record index)
+        self._frozen = False
+        self._indptr = None  # CSR arrays, available after freezing
+        self._member_datasets = None
+        self._member_records = None
+
+    @property
+    def frozen(self):
+        return self._frozen
+
+    def _check_writable(self):
+        if self._frozen:
+            raise ValueError('Block is frozen (read-only)')
+
+    def _encode(self, value):
+        dataset_id, record_id = value
+        ds_idx = self._dataset_index.get(dataset_id)
+        if ds_idx is None:
+            if len(self._datasets) >= _MAX_DATASETS:
+                raise ValueError('Too many datasets in a compact block')
+            ds_idx = self._dataset_index[dataset_id] = len(self._datasets)
+            self._datasets.append(dataset_id)
+            self._records.append([])
+            self._record_index.append({})
+        record_index = self._record_index[ds_idx]
+        rec_idx = record_index.get(record_id)
+        if rec_idx is None:
+            if len(self._records[ds_idx]) >= _MAX_RECORDS:
+                raise ValueError('Too many records of a dataset in a compact block')
+            rec_idx = record_index[record_id] = len(self._records[ds_idx])
+            self._records[ds_idx].append(record_id)
+        return ds_idx << 32 | rec_idx
+
+    def _block_no(self, key, create=False):
+        block_no = self._block_index.get(key)
+        if block_no is None and create:
+            block_no = self._block_index[key] = len(self._blocks)
+            self._blocks.append(key)
+        return block_no
+
+    def members(self, key):
+        """
+        Members of a block as integers.
+
+        Args:
+            key (str): Block id.
+
+        Returns:
+            tuple: Dataset indices (numpy.ndarray) and record indices (numpy.ndarray) of unique members, \
+                None if key doesn't exist.
+        """
+        block_no = self._block_index.get(key)
+        if block_no is None:
+            return None
+        return self._members(block_no)
+
+    def _members(self, block_no):
+        if self._frozen:
+            start, end = self._indptr[block_no], self._indptr[block_no + 1]
+            return self._member_datasets[start:end], self._member_records[start:end]
+        codes = np.unique(np.frombuffer(self._building[block_no], dtype=np.int64))
+        return codes >> 32, codes & 0xFFFFFFFF
+
+    def _decode(self, datasets, records):
+        return set((self._datasets[d], self._records[d][r]) for d, r in zip(datasets.tolist(), records.tolist()))
+
+    def dataset_index(self, dataset_id):
+        """
+        Returns:
+            int: Index of dataset id, None if it's not in any block.
+        """
+        return self._dataset_index.get(dataset_id)
+
+    def record_ids(self, ds_idx, records):
+        """
+        Args:
+            ds_idx (int): Dataset index.
+            records (numpy.ndarray): Record indices.
+
+        Returns:
+            list: Record ids.
+        """
+        ids = self._records[ds_idx]
+        return [ids[r] for r in records.tolist()]
+
+    def get(self, key):
+        members = self.members(key)
+        return self._decode(*members) if members is not None else None
+
+    def size(self, key):
+        members = self.members(key)
+        return len(members[0]) if members is not None else 0
+
+    def set(self, key, value):
+        self._check_writable()
+        if not isinstance(value, set):
+            raise ValueError('value must be a set')
+        block_no = self._block_no(key, create=True)
+        self._building[block_no] = array.array('q', [self._encode(v) for v in value])
+
+    def add(self, key, value):
+        self._check_writable()
+        block_no = self._block_no(key, create=True)
+        members = self._building.get(block_no)
+        if members is None:
+            members = self._building[block_no] = array.array('q')
+        members.append(self._encode(value))
+
+    def remove(self, key, value):
+        self._check_writable()
+        block_no = self._block_index[key]
+        code = self._encode(value)
+        self._building[block_no] = array.array('q', [c for c in self._building[block_no] if c != code])
+
+    def delete(self, key):
+        self._check_writable()
+        block_no = self._block_index.pop(key)
+        self._blocks[block_no] = None
+        del self._building[block_no]
+
+    def clean(self):
+        self.__init__()
+
+    def freeze(self):
+        """
+        Pack all blocks into CSR arrays (members of each block are sorted and deduplicated), \
+        then the adapter becomes read-only.
+        """
+        if self._frozen:
+            return
+        blocks, lengths, codes = [], [], []
+        for block_no, key in enumerate(self._blocks):
+            if key is None:
+                continue
+            members = np.unique(np.frombuffer(self._building[block_no], dtype=np.int64))
+            blocks.append(key)
+            lengths.append(len(members))
+            codes.append(members)
+        codes = np.concatenate(codes) if codes else np.zeros(0, dtype=np.int64)
+
+        self._blocks = blocks
+        self._block_index = {key: block_no for block_no, key in enumerate(blocks)}
+        self._indptr = np.zeros(len(blocks) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self._indptr[1:])
+        # index types are chosen by the numbers of datasets and records, so indices never wrap
+        self._member_datasets = (codes >> 32).astype(_index_dtype(max(len(self._datasets) - 1, 0)))
+        max_records = max([len(records) for records in self._records] + [1])
+        self._member_records = (codes & 0xFFFFFFFF).astype(_index_dtype(max_records - 1))
+        self._building = None
+        self._frozen = True
+
+    def blocks(self):
+        """
+        Iterator of blocks as integers.
+
+        Returns:
+            iter: block_id, dataset indices (numpy.ndarray), record indices (numpy.ndarray).
+        """
+        for block_no, key in enumerate(self._blocks):
+            if key is not None:
+                datasets, records = self._members(block_no)
+                yield key, datasets, records
+
+    def __next__(self):
+        for key, datasets, records in self.blocks():
+            yield key, self._decode(datasets, records)
+
+
+class CompactBlock(Block):
+    """
+    Block which stores dataset ids and record ids once, and members of blocks as integers, \
+    so it takes much less memory than :meth:`Block` with :meth:`MemoryKeySetAdapter` \
+    when there are many records in many blocks (e.g., token blocking). It has the same API as :meth:`Block`, \
+    :meth:`pairwise` works on the integer arrays directly.
+
+    After :meth:`freeze`, blocks are packed into numpy arrays (usually 4 or 6 bytes per member, \
+    integer types are chosen by the numbers of datasets and records) and become read-only.
+
+    Examples::
+
+        block = rltk.TokenBlockGenerator().block(ds, property_='name_tokens', block=rltk.CompactBlock())
+        block.freeze()
+        for r1, r2 in rltk.candidate_pairs(ds, block=block):
+            ...
+    """
+
+    def __init__(self):
+        super(CompactBlock, self).__init__(CompactKeySetAdapter())
+
+    @classmethod
+    def from_block(cls, block: Block):
+        """
+        Copy a block.
+
+        Args:
+            block (Block): Block.
+
+        Returns:
+            CompactBlock: Frozen block.
+        """
+        compact = cls()
+        for block_id, dataset_id, record_id in block:
+            compact.add(block_id, dataset_id, record_id)
+        compact.freeze()
+        return compact
+
+    @property
+    def frozen(self):
+        """
+        bool: If the block is read-only.
+        """
+        return self.key_set_adapter.frozen
+
+    def freeze(self):
+        """
+        Pack blocks into arrays and make the block read-only.
+
+        Returns:
+            CompactBlock: self
+        """
+        self.key_set_adapter.freeze()
+        return self
+
+    def pairwise(self, ds_id1: str, ds_id2: str = None):
+        """
+        Iterator of id pairs generated according to blocks.
+
+        Returns:
+            iter: block_id, id1, id2.
+        """
+        if isinstance(ds_id1, Dataset):
+            ds_id1 = ds_id1.id
+        if ds_id2 and isinstance(ds_id2, Dataset):
+            ds_id2 = ds_id2.id
+
+        adapter = self.key_set_adapter
+        ds_idx1 = adapter.dataset_index(ds_id1)
+        ds_idx2 = adapter.dataset_index(ds_id2) if ds_id2 else None
+        if ds_idx1 is None or (ds_id2 and ds_idx2 is None):
+            return
+
+        for block_id, datasets, records in adapter.blocks():
+            ids1 = records[datasets == ds_idx1]
+            if ds_id2:
+                ids2 = records[datasets == ds_idx2]
+                if len(ids1) == 0 or len(ids2) == 0:
+                    continue
+                for id1, id2 in itertools.product(adapter.record_ids(ds_idx1, ids1),
+                                                  adapter.record_ids(ds_idx2, ids2)):
+                    yield block_id, id1, id2
+            else:
+                if len(ids1) < 2:
+                    continue
+                for id1, id2 in itertools.combinations(adapter.record_ids(ds_idx1, ids1), 2):
+                    yield block_id, id1, id2
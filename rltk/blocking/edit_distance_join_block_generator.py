@@ -0,0 +1,163 @@
+import collections
+from typing import Callable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from rltk.dataset import Dataset
+from rltk.blocking.block_generator import BlockGenerator
+from rltk.blocking.block import Block
+from rltk.blocking.block_black_list import BlockBlackList
+from rltk.similarity.levenshtein import levenshtein_distance
+from rltk.similarity.qgram import qgram_profile, qgram_profile_similarity
+
+
+def _segments(length, k):
+    """
+    Even partition of a string of length into k + 1 segments (shorter ones first).
+
+    Returns:
+        list: [(start, length)]
+    """
+    n = k + 1
+    short_len, long_num = divmod(length, n)
+    segments, start = [], 0
+    for i in range(n):
+        seg_len = short_len + 1 if i >= n - long_num else short_len
+        segments.append((start, seg_len))
+        start += seg_len
+    return segments
+
+
+class EditDistanceJoinBlockGenerator(BlockGenerator):
+    """
+    Edit distance join (Pass-Join) block generator. It finds all the record pairs whose strings are within \
+    Levenshtein distance `max_distance`, without comparing all pairs. \
+    Each indexed string is partitioned into `max_distance + 1` segments, a string within the distance must \
+    contain one of them at a nearby position (pigeonhole principle). Candidates are found from the segment index \
+    only for strings whose lengths differ no more than `max_distance`, filtered by q-gram count \
+    (each edit destroys at most q q-grams), then verified by bounded :meth:`rltk.levenshtein_distance`.
+    Each pair is written as a block of two records, so the block can be used by :meth:`rltk.candidate_pairs`.
+
+    Args:
+        max_distance (int): Maximum Levenshtein distance.
+        q (int, optional): Length of q-gram in count filter. Defaults to 2.
+
+    Examples::
+
+        bg = rltk.EditDistanceJoinBlockGenerator(max_distance=2)
+        block = bg.block(ds1, property_='name', dataset2=ds2)
+        for r1, r2 in rltk.candidate_pairs(ds1, ds2, block=block):
+            ...
+        # or stream of pairs with distance
+        for id1, id2, distance in bg.join(ds1, ds2, property_='name'):
+            ...
+    """
+
+    def __init__(self, max_distance: int, q: int = 2):
+        if not isinstance(max_distance, int) or max_distance < 0:
+            raise ValueError('max_distance should be a non-negative integer')
+        self._max_distance = max_distance
+        self._q = q
+
+    def block(self, dataset, function_: Callable = None, property_: str = None,
+              block: Block = None, block_black_list: BlockBlackList = None, base_on: Block = None,
+              dataset2: 'Dataset' = None):
+        """
+        The return of `property_` or `function_` should be string.
+        If `dataset2` is given, pairs between `dataset` and `dataset2` are generated, \
+        otherwise, pairs within `dataset` are generated.
+        """
+        block = super()._block_args_check(function_, property_, block)
+        if base_on:
+            raise Exception('Edit distance join currently doesn\'t support `base_on`')
+
+        for idx, (id1, id2, _) in enumerate(self.join(dataset, dataset2, function_, property_)):
+            block_id = str(idx)
+            block.add(block_id, dataset.id, id1)
+            block.add(block_id, dataset2.id if dataset2 else dataset.id, id2)
+        return block
+
+    def join(self, dataset1: 'Dataset', dataset2: 'Dataset' = None,
+             function_: Callable = None, property_: str = None):
+        """
+        Stream of similar pairs.
+
+        Args:
+            dataset1 (Dataset): Dataset 1.
+            dataset2 (Dataset, optional): Dataset 2. If it's not provided, it will be a self-join of dataset 1.
+            function_ (Callable): `function_(r: record)`, returns string.
+            property_ (str): The property in Record object.
+
+        Returns:
+            iter: id1 (in dataset 1), id2, distance.
+        """
+        super()._block_args_check(function_, property_, None)
+
+        records = []  # (dataset index, record id, string)
+        for ds_idx, dataset in enumerate([dataset1, dataset2] if dataset2 else [dataset1]):
+            for r in dataset:
+                value = function_(r) if function_ else getattr(r, property_)
+                if not isinstance(value, str):
+                    raise ValueError('Return of the function or property should be a string')
+                records.append((ds_idx, r.id, value))
+
+        sides = [ds_idx for ds_idx, _, _ in records] if dataset2 else None
+        for i, j, distance in self._join_strings([s for _, _, s in records], sides):
+            (ds_i, id_i, _), (ds_j, id_j, _) = records[i], records[j]
+            if ds_i > ds_j:
+                id_i, id_j = id_j, id_i
+            yield id_i, id_j, distance
+
+    def _join_strings(self, strings, sides=None):
+        """
+        Pass-Join over list of strings.
+
+        Args:
+            strings (list): Strings.
+            sides (list, optional): Side (0 or 1) of each string. If it's given, only pairs of strings \
+                on different sides are generated: each string probes the segment index of the other side, \
+                then its segments are indexed on its own side. Defaults to None (self-join).
+
+        Returns:
+            iter: index1, index2, distance.
+        """
+        k, q = self._max_distance, self._q
+        profiles = [None] * len(strings)  # q-gram profiles, computed when needed
+        # of each side, (length, segment no, segment) -> [string index] and lengths in index
+        indexes = (collections.defaultdict(list), collections.defaultdict(list))
+        indexed_lengths = (set(), set())
+
+        for x in sorted(range(len(strings)), key=lambda i: len(strings[i])):
+            side = sides[x] if sides else 0
+            probe_side = 1 - side if sides else 0
+            index = indexes[probe_side]
+            s = strings[x]
+            len_x = len(s)
+
+            candidates = set()
+            for length in range(max(0, len_x - k), len_x + 1):
+                if length not in indexed_lengths[probe_side]:
+                    continue
+                for seg_no, (start, seg_len) in enumerate(_segments(length, k)):
+                    # the segment can only be shifted by at most k
+                    for p in range(max(0, start - k), min(len_x - seg_len, start + k) + 1):
+                        candidates.update(index.get((length, seg_no, s[p:p + seg_len]), ()))
+
+            # strings within k edits share at least max(len) - q + 1 - k * q q-grams
+            min_common = len_x - q + 1 - k * q
+            profile_x = None
+            for y in candidates:
+                if min_common > 0:
+                    if profile_x is None:
+                        profile_x = qgram_profile(s, q)
+                    if profiles[y] is None:
+                        profiles[y] = qgram_profile(strings[y], q)
+                    if qgram_profile_similarity(profile_x, profiles[y]) < min_common:
+                        continue
+                distance = levenshtein_distance(strings[y], s, max_distance=k)
+                if distance <= k:
+                    yield y, x, distance
+
+            profiles[x] = profile_x
+            for seg_no, (start, seg_len) in enumerate(_segments(len_x, k)):
+                indexes[side][(len_x, seg_no, s[start:start + seg_len])].append(x)
+            indexed_lengths[side].add(len_x)
@@ -13,7 +13,8 @@ class HashBlockGenerator(BlockGenerator):
     """
 
     def block(self, dataset, function_: Callable = None, property_: str = None,
-              block: Block = None, block_black_list: BlockBlackList = None, base_on: Block = None):
+              block: Block = None, block_black_list: BlockBlackList = None, base_on: Block = None,
+              pp_num_of_processor: int = 0, pp_chunk_size: int = 1000):
         """
         The return of `property_` or `function_` should be string.
         """
@@ -34,13 +35,13 @@ class HashBlockGenerator(BlockGenerator):
                         block_black_list.add(value, block)
 
         else:
-            for r in dataset:
-                value = function_(r) if function_ else getattr(r, property_)
+            for record_id, value in self._record_values(dataset, function_, property_,
+                                                        pp_num_of_processor, pp_chunk_size):
                 if not isinstance(value, str):
                     raise ValueError('Return of the function or property should be a string')
                 if block_black_list and block_black_list.has(value):
                     continue
-                block.add(value, dataset.id, r.id)
+                block.add(value, dataset.id, record_id)
                 if block_black_list:
                     block_black_list.add(value, block)
 
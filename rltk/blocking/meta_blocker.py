@@ -0,0 +1,251 @@
+import numpy as np
+
+from rltk.blocking.block import Block
+from rltk.dataset import Dataset
+
+
+_WEIGHTINGS = ('cbs', 'ecbs', 'js', 'arcs')
+_PRUNINGS = ('wep', 'wnp', 'cnp', 'rcnp')
+# comparisons of blocks collected before they are merged into distinct edges
+_CHUNK_SIZE = 1 << 20
+
+
+def _merge_edges(edges, weights, codes, code_weights):
+    """
+    Merge edge codes (with repeats) into distinct edges (sorted), summing the weights of each edge.
+
+    Args:
+        edges (numpy.ndarray): Distinct edge codes so far.
+        weights (list): Weights (numpy.ndarray) of edges so far.
+        codes (list): Edge codes (numpy.ndarray) of blocks.
+        code_weights (list): For each weight, weights (numpy.ndarray) of codes of blocks.
+
+    Returns:
+        tuple: Distinct edge codes and list of weights.
+    """
+    distinct, inverse = np.unique(np.concatenate([edges] + codes), return_inverse=True)
+    inverse = inverse.ravel()
+    return distinct, [np.bincount(inverse, weights=np.concatenate([w] + cw), minlength=len(distinct))
+                      for w, cw in zip(weights, code_weights)]
+
+
+def _not_less(weights, mean):
+    # mean of equal weights can be slightly greater than them because of float error
+    return weights >= mean - 1e-9 * np.abs(mean)
+
+
+class MetaBlocker(object):
+    """
+    Meta-blocking. It restructures a (redundancy-heavy) block, e.g., from :meth:`TokenBlockGenerator`, \
+    into a much smaller one. Each pair of records which co-occur in some blocks is an edge of the blocking graph, \
+    weighted by the blocks they share, then the edges of low weight are pruned.
+
+    Weighting schemes (Papadakis et al.):
+
+    * `cbs`: Common Blocks Scheme, number of blocks shared by the pair.
+    * `ecbs`: Enhanced CBS, CBS discounted by the numbers of blocks of each record, \
+      ``cbs * log(|B| / |B_i|) * log(|B| / |B_j|)``.
+    * `js`: Jaccard Scheme, ``cbs / (|B_i| + |B_j| - cbs)``.
+    * `arcs`: Aggregate Reciprocal Comparisons Scheme, sum of ``1 / comparisons of block`` over shared blocks.
+
+    Pruning schemes:
+
+    * `wep`: Weighted Edge Pruning, keep the edges not lighter than the average weight of all edges.
+    * `wnp`: Weighted Node Pruning, keep the edges not lighter than the average weight of edges \
+      of either record.
+    * `cnp`: Cardinality Node Pruning, keep the edges which are one of the top-k heaviest edges of either record.
+    * `rcnp`: Reciprocal CNP, keep the edges which are one of the top-k heaviest edges of both records.
+
+    In 'cnp' and 'rcnp', ties of weights are broken arbitrarily.
+
+    Comparisons of blocks are aggregated in chunks, so the blocking graph takes memory in proportion to \
+    the number of distinct pairs, not the (redundant) number of comparisons.
+
+    Args:
+        weighting (str, optional): 'cbs', 'ecbs', 'js' or 'arcs'. Defaults to 'cbs'.
+        pruning (str, optional): 'wep', 'wnp', 'cnp' or 'rcnp'. Defaults to 'wep'.
+        k (int, optional): k of 'cnp' and 'rcnp'. Defaults to None, which means \
+            ``max(1, sum of block sizes / number of records - 1)``.
+
+    Examples::
+
+        block = rltk.TokenBlockGenerator().block(ds1, property_='name_tokens')
+        block = rltk.TokenBlockGenerator().block(ds2, property_='name_tokens', block=block)
+        pruned = rltk.MetaBlocker(weighting='ecbs', pruning='wep').block(block, ds1, ds2)
+        for r1, r2 in rltk.candidate_pairs(ds1, ds2, block=pruned):
+            ...
+    """
+
+    def __init__(self, weighting: str = 'cbs', pruning: str = 'wep', k: int = None):
+        if weighting not in _WEIGHTINGS:
+            raise ValueError('weighting should be one of {}'.format(', '.join(_WEIGHTINGS)))
+        if pruning not in _PRUNINGS:
+            raise ValueError('pruning should be one of {}'.format(', '.join(_PRUNINGS)))
+        if k is not None and k < 1:
+            raise ValueError('k should be a positive integer')
+        self._weighting = weighting
+        self._pruning = pruning
+        self._k = k
+
+    def block(self, block: Block, ds_id1: str, ds_id2: str = None, output_block: Block = None):
+        """
+        Pruned block. Each pair is written as a block of two records, \
+        so the block can be used by :meth:`rltk.candidate_pairs`.
+
+        Args:
+            block (Block): Input block.
+            ds_id1 (str / Dataset): Dataset id or Dataset object.
+            ds_id2 (str / Dataset, optional): Dataset id or Dataset object. \
+                If it's None, pairs within ds_id1 are generated.
+            output_block (Block, optional): Where the output block goes. \
+                If None, a new block will be created. Defaults to None.
+
+        Returns:
+            Block:
+        """
+        ds_id1, ds_id2 = self._dataset_ids(ds_id1, ds_id2)
+        output_block = output_block or Block()
+        for idx, (id1, id2, _) in enumerate(self.pairs(block, ds_id1, ds_id2)):
+            block_id = str(idx)
+            output_block.add(block_id, ds_id1, id1)
+            output_block.add(block_id, ds_id2 or ds_id1, id2)
+        return output_block
+
+    def pairs(self, block: Block, ds_id1: str, ds_id2: str = None):
+        """
+        Stream of pairs which are kept after pruning, each pair is generated once.
+
+        Args:
+            block (Block): Input block.
+            ds_id1 (str / Dataset): Dataset id or Dataset object.
+            ds_id2 (str / Dataset, optional): Dataset id or Dataset object. \
+                If it's None, pairs within ds_id1 are generated.
+
+        Returns:
+            iter: id1 (in dataset 1), id2, weight.
+        """
+        ds_id1, ds_id2 = self._dataset_ids(ds_id1, ds_id2)
+        record_ids, sources, targets, weights, avg_blocks = self._graph(block, ds_id1, ds_id2)
+        if len(weights) == 0:
+            return
+
+        k = self._k or max(1, int(avg_blocks) - 1)
+        keep = self._prune(sources, targets, weights, len(record_ids), k)
+        for s, t, w in zip(sources[keep].tolist(), targets[keep].tolist(), weights[keep].tolist()):
+            yield record_ids[s], record_ids[t], w
+
+    @staticmethod
+    def _dataset_ids(ds_id1, ds_id2):
+        if isinstance(ds_id1, Dataset):
+            ds_id1 = ds_id1.id
+        if ds_id2 and isinstance(ds_id2, Dataset):
+            ds_id2 = ds_id2.id
+        return ds_id1, ds_id2
+
+    def _graph(self, block, ds_id1, ds_id2):
+        """
+        Weighted blocking graph. Records of dataset 1 are numbered before the ones of dataset 2.
+
+        Comparisons of blocks are merged into distinct edges every `_CHUNK_SIZE` comparisons, \
+        so the memory is bounded by the number of distinct edges (plus one chunk) \
+        rather than the number of comparisons.
+
+        Returns:
+            tuple: record ids (list), edge sources, edge targets, edge weights (numpy.ndarray) \
+                and average number of blocks of a record.
+        """
+        index = ({}, {})  # record id -> node, of each dataset
+        record_ids = []
+
+        def nodes(data, ds_no, ds_id):
+            ids = []
+            for dataset_id, record_id in data:
+                if dataset_id != ds_id:
+                    continue
+                node = index[ds_no].get(record_id)
+                if node is None:
+                    node = index[ds_no][record_id] = len(record_ids)
+                    record_ids.append(record_id)
+                ids.append(node)
+            return ids
+
+        arcs = self._weighting == 'arcs'
+        # distinct edges (source << 32 | target) with cbs (and arcs) weights, and the pending chunk
+        edges, weights = np.zeros(0, dtype=np.int64), [np.zeros(0)] * (2 if arcs else 1)
+        codes, code_weights, pending = [], [[] for _ in weights], 0
+        block_members = []
+        for _, data in block.key_set_adapter:
+            left = nodes(data, 0, ds_id1)
+            if ds_id2:
+                right = nodes(data, 1, ds_id2)
+                if not left or not right:
+                    continue
+                left, right = np.array(left, dtype=np.int64), np.array(right, dtype=np.int64)
+                sources, targets = np.repeat(left, len(right)), np.tile(right, len(left))
+            else:
+                if len(left) < 2:
+                    continue
+                left = np.sort(np.array(left, dtype=np.int64))
+                rows, cols = np.triu_indices(len(left), 1)
+                sources, targets, right = left[rows], left[cols], np.zeros(0, dtype=np.int64)
+            block_members.append(np.concatenate((left, right)))
+
+            comparisons = len(sources)
+            codes.append(sources << 32 | targets)
+            code_weights[0].append(np.ones(comparisons))
+            if arcs:
+                code_weights[1].append(np.full(comparisons, 1.0 / comparisons))
+            pending += comparisons
+            if pending >= _CHUNK_SIZE:
+                edges, weights = _merge_edges(edges, weights, codes, code_weights)
+                codes, code_weights, pending = [], [[] for _ in weights], 0
+
+        num_nodes = len(record_ids)
+        if not block_members:
+            return record_ids, np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0), 0.0
+        if codes:
+            edges, weights = _merge_edges(edges, weights, codes, code_weights)
+
+        # number of blocks (with comparisons) of each record
+        members = np.concatenate(block_members)
+        node_blocks = np.bincount(members, minlength=num_nodes)
+
+        sources, targets = edges >> 32, edges & 0xFFFFFFFF
+        cbs = weights[0]
+
+        if self._weighting == 'cbs':
+            weights = cbs
+        elif self._weighting == 'ecbs':
+            num_blocks = float(len(block_members))
+            weights = cbs * np.log(num_blocks / node_blocks[sources]) * np.log(num_blocks / node_blocks[targets])
+        elif self._weighting == 'js':
+            weights = cbs / (node_blocks[sources] + node_blocks[targets] - cbs)
+        else:  # arcs
+            weights = weights[1]
+        avg_blocks = len(members) / float(np.count_nonzero(node_blocks))
+        return record_ids, sources, targets, weights, avg_blocks
+
+    def _prune(self, sources, targets, weights, num_nodes, k):
+        """
+        Returns:
+            numpy.ndarray: Mask of edges to keep.
+        """
+        if self._pruning == 'wep':
+            return _not_less(weights, weights.mean())
+
+        nodes = np.concatenate((sources, targets))
+        node_weights = np.concatenate((weights, weights))
+        edge_ids = np.concatenate((np.arange(len(weights)), np.arange(len(weights))))
+
+        if self._pruning == 'wnp':
+            degree = np.bincount(nodes, minlength=num_nodes)
+            mean = np.bincount(nodes, weights=node_weights, minlength=num_nodes) / np.maximum(degree, 1)
+            return _not_less(weights, mean[sources]) | _not_less(weights, mean[targets])
+
+        # rank edges of each node by weight (heaviest first, ties by edge order)
+        order = np.lexsort((edge_ids, -node_weights, nodes))
+        sorted_nodes = nodes[order]
+        group_start = np.searchsorted(sorted_nodes, sorted_nodes, side='left')
+        rank = np.arange(len(order)) - group_start
+        votes = np.bincount(edge_ids[order][rank < k], minlength=len(weights))
+        return votes >= (2 if self._pruning == 'rcnp' else 1)
@@ -0,0 +1,180 @@
+import collections
+import math
+from typing import Callable, TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from rltk.dataset import Dataset
+from rltk.blocking.block_generator import BlockGenerator
+from rltk.blocking.block import Block
+from rltk.blocking.block_black_list import BlockBlackList
+
+
+def _ceil(x):
+    # tolerate floating error, a smaller bound is still safe
+    return int(math.ceil(x - 1e-9))
+
+
+# measure: (similarity(overlap, size1, size2), min size of the other set, min overlap)
+_MEASURES = {
+    'jaccard': (
+        lambda o, l1, l2: float(o) / (l1 + l2 - o),
+        lambda t, l: t * l,
+        lambda t, l1, l2: t / (1.0 + t) * (l1 + l2),
+    ),
+    'dice': (
+        lambda o, l1, l2: 2.0 * o / (l1 + l2),
+        lambda t, l: t / (2.0 - t) * l,
+        lambda t, l1, l2: t * (l1 + l2) / 2.0,
+    ),
+    'cosine': (
+        lambda o, l1, l2: o / math.sqrt(l1 * l2),
+        lambda t, l: t * t * l,
+        lambda t, l1, l2: t * math.sqrt(l1 * l2),
+    ),
+}
+
+
+class SetSimilarityJoinBlockGenerator(BlockGenerator):
+    """
+    Set similarity join (AllPairs / PPJoin) block generator. It finds all the record pairs whose token sets have \
+    Jaccard, Dice or cosine similarity not less than threshold, without comparing all pairs. \
+    Tokens are sorted by a global order (rare first), and candidates are found by prefix filtering, \
+    then pruned by length filtering and positional filtering. Every pair it generates is verified.
+    Each pair is written as a block of two records, so the block can be used by :meth:`rltk.candidate_pairs`.
+
+    Args:
+        threshold (float): Similarity threshold, in range (0, 1].
+        measure (str, optional): 'jaccard', 'dice' or 'cosine' (of binary vectors). Defaults to 'jaccard'.
+
+    Note:
+        Records with empty token set are never paired.
+
+    Examples::
+
+        bg = rltk.SetSimilarityJoinBlockGenerator(threshold=0.8)
+        block = bg.block(ds1, property_='name_tokens', dataset2=ds2)
+        for r1, r2 in rltk.candidate_pairs(ds1, ds2, block=block):
+            ...
+        # or stream of pairs with similarity
+        for id1, id2, sim in bg.join(ds1, ds2, property_='name_tokens'):
+            ...
+    """
+
+    def __init__(self, threshold: float, measure: str = 'jaccard'):
+        if not 0 < threshold <= 1:
+            raise ValueError('threshold should be in range (0, 1]')
+        if measure not in _MEASURES:
+            raise ValueError('measure should be one of {}'.format(', '.join(sorted(_MEASURES))))
+        self._threshold = threshold
+        self._measure = measure
+
+    def block(self, dataset, function_: Callable = None, property_: str = None,
+              block: Block = None, block_black_list: BlockBlackList = None, base_on: Block = None,
+              dataset2: 'Dataset' = None):
+        """
+        The return of `property_` or `function_` should be list or set.
+        If `dataset2` is given, pairs between `dataset` and `dataset2` are generated, \
+        otherwise, pairs within `dataset` are generated.
+        """
+        block = super()._block_args_check(function_, property_, block)
+        if base_on:
+            raise Exception('Set similarity join currently doesn\'t support `base_on`')
+
+        for idx, (id1, id2, _) in enumerate(self.join(dataset, dataset2, function_, property_)):
+            block_id = str(idx)
+            block.add(block_id, dataset.id, id1)
+            block.add(block_id, dataset2.id if dataset2 else dataset.id, id2)
+        return block
+
+    def join(self, dataset1: 'Dataset', dataset2: 'Dataset' = None,
+             function_: Callable = None, property_: str = None):
+        """
+        Stream of similar pairs.
+
+        Args:
+            dataset1 (Dataset): Dataset 1.
+            dataset2 (Dataset, optional): Dataset 2. If it's not provided, it will be a self-join of dataset 1.
+            function_ (Callable): `function_(r: record)`, returns list or set of string.
+            property_ (str): The property in Record object.
+
+        Returns:
+            iter: id1 (in dataset 1), id2, similarity.
+        """
+        super()._block_args_check(function_, property_, None)
+
+        records = []  # (dataset index, record id, token set)
+        for ds_idx, dataset in enumerate([dataset1, dataset2] if dataset2 else [dataset1]):
+            for r in dataset:
+                value = function_(r) if function_ else getattr(r, property_)
+                if not isinstance(value, list) and not isinstance(value, set):
+                    raise ValueError('Return of the function or property should be a list or set')
+                if len(value) > 0:
+                    records.append((ds_idx, r.id, set(value)))
+
+        sides = [ds_idx for ds_idx, _, _ in records] if dataset2 else None
+        for i, j, sim in self._join_sets([tokens for _, _, tokens in records], sides):
+            (ds_i, id_i, _), (ds_j, id_j, _) = records[i], records[j]
+            if ds_i > ds_j:
+                id_i, id_j = id_j, id_i
+            yield id_i, id_j, sim
+
+    def _join_sets(self, sets, sides=None):
+        """
+        PPJoin over list of sets.
+
+        Args:
+            sets (list): Sets.
+            sides (list, optional): Side (0 or 1) of each set. If it's given, only pairs of sets \
+                on different sides are generated: each set probes the index of the other side, \
+                then it is indexed on its own side. Defaults to None (self-join).
+
+        Returns:
+            iter: index1, index2, similarity.
+        """
+        t = self._threshold
+        similarity, min_size, min_overlap = _MEASURES[self._measure]
+
+        # global order: rare tokens first
+        df = collections.Counter(token for s in sets for token in s)
+        order = {token: rank for rank, token in enumerate(sorted(df, key=lambda token: (df[token], token)))}
+        ranked = [sorted(order[token] for token in s) for s in sets]
+
+        # of each side, token rank -> [(set index, position)] and first useful position in index list
+        indexes = (collections.defaultdict(list), collections.defaultdict(list))
+        starts = (collections.defaultdict(int), collections.defaultdict(int))
+        for x in sorted(range(len(ranked)), key=lambda i: len(ranked[i])):
+            side = sides[x] if sides else 0
+            index, start = (indexes[1 - side], starts[1 - side]) if sides else (indexes[0], starts[0])
+            tokens_x = ranked[x]
+            len_x = len(tokens_x)
+            lower_size = min_size(t, len_x)
+
+            overlap = {}  # candidate -> partial overlap, None if pruned
+            for i in range(min(len_x, len_x - _ceil(lower_size) + 1)):
+                postings = index[tokens_x[i]]
+                # sets are indexed by increasing size, the ones too small are skipped forever
+                s = start[tokens_x[i]]
+                while s < len(postings) and len(ranked[postings[s][0]]) < lower_size - 1e-9:
+                    s += 1
+                start[tokens_x[i]] = s
+                for y, j in postings[s:]:
+                    o = overlap.get(y, 0)
+                    if o is None:
+                        continue
+                    len_y = len(ranked[y])
+                    alpha = _ceil(min_overlap(t, len_x, len_y))
+                    if o + 1 + min(len_x - i - 1, len_y - j - 1) >= alpha:
+                        overlap[y] = o + 1
+                    else:
+                        overlap[y] = None
+
+            for y, o in overlap.items():
+                if o is None:
+                    continue
+                o = len(sets[x] & sets[y])
+                sim = similarity(o, len_x, len(ranked[y]))
+                if sim >= t:
+                    yield y, x, sim
+
+            for i in range(min(len_x, len_x - _ceil(min_overlap(t, len_x, len_x)) + 1)):
+                indexes[side][tokens_x[i]].append((x, i))
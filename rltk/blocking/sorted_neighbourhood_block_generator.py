@@ -28,7 +28,8 @@ class SortedNeighbourhoodBlockGenerator(BlockGenerator):
         self.block_id_prefix = block_id_prefix
 
     def block(self, dataset, function_: Callable = None, property_: str = None,
-              block: Block = None, block_black_list: BlockBlackList = None, base_on: Block = None):
+              block: Block = None, block_black_list: BlockBlackList = None, base_on: Block = None,
+              pp_num_of_processor: int = 0, pp_chunk_size: int = 1000):
         """
         The return of `property_` or `function_` should be a vector (list).
         """
@@ -52,8 +53,8 @@ class SortedNeighbourhoodBlockGenerator(BlockGenerator):
                             block_black_list.add(v, block)
 
         else:
-            for r in dataset:
-                value = function_(r) if function_ else getattr(r, property_)
+            for record_id, value in self._record_values(dataset, function_, property_,
+                                                        pp_num_of_processor, pp_chunk_size):
                 if not isinstance(value, (list, set)):
                     value = set(value)
                 for v in value:
@@ -61,7 +62,7 @@ class SortedNeighbourhoodBlockGenerator(BlockGenerator):
                         raise ValueError('Elements in return list should be string')
                     if block_black_list and block_black_list.has(v):
                         continue
-                    block.add(v, dataset.id, r.id)
+                    block.add(v, dataset.id, record_id)
                     if block_black_list:
                         block_black_list.add(v, block)
 
@@ -13,7 +13,8 @@ class TokenBlockGenerator(BlockGenerator):
     """
 
     def block(self, dataset, function_: Callable = None, property_: str = None,
-              block: Block = None, block_black_list: BlockBlackList = None, base_on: Block = None):
+              block: Block = None, block_black_list: BlockBlackList = None, base_on: Block = None,
+              pp_num_of_processor: int = 0, pp_chunk_size: int = 1000):
         """
         The return of `property_` or `function_` should be list or set.
         """
@@ -37,8 +38,8 @@ class TokenBlockGenerator(BlockGenerator):
                             block_black_list.add(v, block)
 
         else:
-            for r in dataset:
-                value = function_(r) if function_ else getattr(r, property_)
+            for record_id, value in self._record_values(dataset, function_, property_,
+                                                        pp_num_of_processor, pp_chunk_size):
                 if not isinstance(value, list) and not isinstance(value, set):
                     raise ValueError('Return of the function or property should be a list')
                 for v in value:
@@ -46,7 +47,7 @@ class TokenBlockGenerator(BlockGenerator):
                         raise ValueError('Elements in return list should be string')
                     if block_black_list and block_black_list.has(v):
                         continue
-                    block.add(v, dataset.id, r.id)
+                    block.add(v, dataset.id, record_id)
                     if block_black_list:
                         block_black_list.add(v, block)
 
@@ -19,6 +19,20 @@ class KeySetAdapter(object):
         """
         raise NotImplementedError
 
+    def size(self, key: str):
+        """
+        Number of values in a set by key. Adapters override it if it can be computed \
+        without fetching the whole set.
+
+        Args:
+            key (str): Key.
+
+        Returns:
+            int: Size of the set, 0 if key doesn't exist.
+        """
+        value = self.get(key)
+        return len(value) if value else 0
+
     def set(self, key: str, value: set):
         """
         Set a set by key.
@@ -12,6 +12,9 @@ class MemoryKeySetAdapter(KeySetAdapter):
     def get(self, key):
         return self._store.get(key)
 
+    def size(self, key):
+        return len(self._store.get(key, ()))
+
     def set(self, key, value):
         if not isinstance(value, set):
             raise ValueError('value must be a set')
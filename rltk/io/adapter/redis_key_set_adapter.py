@@ -44,6 +44,9 @@ class RedisKeySetAdapter(KeySetAdapter):
         if len(v) != 0:
             return v
 
+    def size(self, key):
+        return self._redis.scard(self._encode_key(key))
+
     def set(self, key, value):
         if not isinstance(value, set):
             raise ValueError('value must be a set')
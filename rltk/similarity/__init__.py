@@ -1,27 +1,42 @@
 # common distance
 from rltk.similarity.distance import euclidean_distance, euclidean_similarity, \
-    manhattan_distance, manhattan_similarity
+    manhattan_distance, manhattan_similarity, euclidean_distance_batch, euclidean_distance_matrix, \
+    manhattan_distance_batch, manhattan_distance_matrix
 
 # normal
 from rltk.similarity.equal import string_equal, number_equal
-from rltk.similarity.hamming import hamming_distance, hamming_similarity, normalized_hamming_distance
+from rltk.similarity.hamming import hamming_distance, hamming_similarity, normalized_hamming_distance, \
+    hamming_distance_batch, hamming_similarity_batch
 from rltk.similarity.dice import dice_similarity
 from rltk.similarity.levenshtein import levenshtein_distance, levenshtein_similarity, \
     damerau_levenshtein_distance, damerau_levenshtein_similarity, \
-    optimal_string_alignment_distance, optimal_string_alignment_similarity
-from rltk.similarity.needleman import needleman_wunsch_score, needleman_wunsch_similarity
-from rltk.similarity.jaro import jaro_winkler_distance, jaro_winkler_similarity, jaro_distance
+    optimal_string_alignment_distance, optimal_string_alignment_similarity, \
+    levenshtein_distance_batch, levenshtein_similarity_batch
+from rltk.similarity.needleman import needleman_wunsch_score, needleman_wunsch_similarity, \
+    needleman_wunsch_score_batch, needleman_wunsch_similarity_batch
+from rltk.similarity.jaro import jaro_winkler_distance, jaro_winkler_similarity, jaro_distance, \
+    jaro_winkler_similarity_batch
 from rltk.similarity.jaccard import jaccard_index_similarity, jaccard_index_distance
-from rltk.similarity.cosine import cosine_similarity, string_cosine_similarity
+from rltk.similarity.token_ids import TokenInterner, sorted_overlap, sorted_jaccard_similarity, \
+    sorted_dice_similarity, sorted_overlap_batch, sorted_jaccard_similarity_batch, sorted_dice_similarity_batch
+from rltk.similarity.cosine import cosine_similarity, string_cosine_similarity, \
+    cosine_similarity_batch, cosine_similarity_matrix
 from rltk.similarity.tf_idf import tf_idf_similarity, compute_idf, compute_tf, tf_idf_cosine_similarity, TF_IDF
 from rltk.similarity.lcs import longest_common_subsequence_distance, metric_longest_common_subsequence
 from rltk.similarity.ngram import ngram_distance, ngram_similarity
-from rltk.similarity.qgram import qgram_distance, qgram_similarity
+from rltk.similarity.qgram import qgram_distance, qgram_similarity, \
+    qgram_profile, qgram_profile_distance, qgram_profile_similarity
 
 # # hybrid
-from rltk.similarity.hybrid import hybrid_jaccard_similarity, monge_elkan_similarity, symmetric_monge_elkan_similarity
+from rltk.similarity.hybrid import hybrid_jaccard_similarity, monge_elkan_similarity, symmetric_monge_elkan_similarity, \
+    TokenScoreCache
+from rltk.similarity.soft_tf_idf import soft_tf_idf_similarity, Soft_TF_IDF
+
+# # bound and cache
+from rltk.similarity.bound import similarity_upper_bound, distance_lower_bound, weighted_similarity
+from rltk.similarity.cache import cached, CachedSimilarity
 
 # # phonetic
-from rltk.similarity.soundex import soundex_similarity, soundex
-from rltk.similarity.metaphone import metaphone_similarity, metaphone
-from rltk.similarity.nysiis import nysiis_similarity, nysiis
+from rltk.similarity.soundex import soundex_similarity, soundex, soundex_encode_many
+from rltk.similarity.metaphone import metaphone_similarity, metaphone, metaphone_encode_many
+from rltk.similarity.nysiis import nysiis_similarity, nysiis, nysiis_encode_many
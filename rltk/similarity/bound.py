@@ -0,0 +1,103 @@
+def similarity_upper_bound(function, *args, **kwargs):
+    """
+    Cheap upper bound of a similarity function. Similarity functions which have one expose it as \
+    ``function.upper_bound``, which takes the same arguments as the function \
+    (e.g., ``rltk.levenshtein_similarity.upper_bound(s1, s2)`` is computed from lengths only).
+    If the exact similarity is needed only when it reaches a threshold, \
+    the computation can be skipped when the bound is already below the threshold. \
+    Bounds which only depend on the lengths of the arguments (and of their lowercase forms) \
+    are marked with ``upper_bound.length_only = True``.
+
+    Args:
+        function (function): Similarity function.
+        *args: Arguments of function.
+        **kwargs: Keyword arguments of function.
+
+    Returns:
+        float: Upper bound, 1.0 if the function has no bound (similarities are in range [0, 1]).
+
+    Examples:
+        >>> rltk.similarity_upper_bound(rltk.levenshtein_similarity, 'abc', 'abcdef')
+        0.5
+    """
+    upper_bound = getattr(function, 'upper_bound', None)
+    return upper_bound(*args, **kwargs) if upper_bound else 1.0
+
+
+def distance_lower_bound(function, *args, **kwargs):
+    """
+    Cheap lower bound of a distance function, exposed as ``function.lower_bound`` \
+    (e.g., ``rltk.levenshtein_distance.lower_bound(s1, s2)``). See :meth:`similarity_upper_bound`.
+
+    Args:
+        function (function): Distance function.
+        *args: Arguments of function.
+        **kwargs: Keyword arguments of function.
+
+    Returns:
+        float: Lower bound, 0 if the function has no bound.
+
+    Examples:
+        >>> rltk.distance_lower_bound(rltk.levenshtein_distance, 'abc', 'abcdef')
+        3
+    """
+    lower_bound = getattr(function, 'lower_bound', None)
+    return lower_bound(*args, **kwargs) if lower_bound else 0
+
+
+def weighted_similarity(features, weights=None, lower_bound=None):
+    """
+    Weighted average of several similarities, e.g., scores of different fields of a record pair.
+
+    Args:
+        features (list): List of ``(function, value1, value2)`` or ``(function, value1, value2, parameters)``, \
+            where parameters (dict) are other parameters of function.
+        weights (list, optional): Weight of each feature. Defaults to None (all are 1).
+        lower_bound (float): This is for early exit. The upper bounds of all features \
+            (see :meth:`similarity_upper_bound`) are combined first, then each exact similarity \
+            replaces its bound in turn. Once the combination is not possible to satisfy this value, \
+            the function returns immediately with the return value 0.0. Defaults to None.
+
+    Returns:
+        float: Weighted similarity.
+
+    Examples::
+
+        rltk.weighted_similarity([
+            (rltk.levenshtein_similarity, r1.name, r2.name),
+            (rltk.jaccard_index_similarity, r1.name_tokens, r2.name_tokens),
+            (rltk.jaro_winkler_similarity, r1.city, r2.city, {'prefix_len': 2}),
+        ], weights=[0.5, 0.3, 0.2], lower_bound=0.8)
+    """
+    weights = weights if weights is not None else [1.0] * len(features)
+    if len(weights) != len(features):
+        raise ValueError('Length of weights should be the same as features')
+    total_weight = float(sum(weights))
+    if total_weight <= 0:
+        raise ValueError('Sum of weights should be positive')
+
+    features = [(f[0], f[1], f[2], f[3] if len(f) > 3 and f[3] else {}) for f in features]
+
+    if not lower_bound:
+        return sum(w * function(v1, v2, **parameters)
+                   for w, (function, v1, v2, parameters) in zip(weights, features)) / total_weight
+
+    # a small tolerance is added for float error, result is checked again below
+    min_score = lower_bound * total_weight - 1e-9
+    bounds = [w * similarity_upper_bound(function, v1, v2, **parameters)
+              for w, (function, v1, v2, parameters) in zip(weights, features)]
+    score = sum(bounds)
+    if score < min_score:
+        return 0.0
+
+    # features with higher weight change the bound more, so they go first
+    scores = [0.0] * len(features)
+    for idx in sorted(range(len(features)), key=lambda i: -weights[i]):
+        function, v1, v2, parameters = features[idx]
+        scores[idx] = weights[idx] * function(v1, v2, **parameters)
+        score += scores[idx] - bounds[idx]
+        if score < min_score:
+            return 0.0
+
+    sim = sum(scores) / total_weight
+    return sim if sim >= lower_bound else 0.0
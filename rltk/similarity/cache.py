@@ -0,0 +1,245 @@
+import collections
+import functools
+import hashlib
+import threading
+
+import numpy as np
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from rltk.io.adapter import KeyValueAdapter
+
+
+class _LRUCache(object):
+    """
+    Bounded and thread-safe LRU store with statistics, shared by :meth:`cached` and :meth:`TokenScoreCache`.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, maxsize=None):
+        if maxsize is not None and maxsize < 0:
+            raise ValueError('maxsize should be None or a non-negative integer')
+        self.maxsize = maxsize
+        self._data = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        """
+        Returns:
+            object: Cached value or `_LRUCache._MISSING`. Statistics are updated.
+        """
+        with self._lock:
+            value = self._data.get(key, self._MISSING)
+            if value is self._MISSING:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if self.maxsize is not None:
+                while len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+                    self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+
+def _freeze(value):
+    """
+    Hashable and type-aware form of an argument, e.g. `[1, 2]` and `(1, 2)` are different keys.
+    """
+    if isinstance(value, (str, bytes, int, float, bool, type(None))):
+        return value
+    if isinstance(value, list):
+        return list, tuple(_freeze(v) for v in value)
+    if isinstance(value, tuple):
+        return tuple, tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return set, frozenset(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return dict, frozenset((_freeze(k), _freeze(v)) for k, v in value.items())
+    if isinstance(value, np.ndarray):
+        return np.ndarray, value.dtype.str, value.shape, value.tobytes()
+    hash(value)  # raises TypeError if it can't be a key
+    return value
+
+
+def _stable_repr(key):
+    # repr of frozenset depends on hash seed, sort it to get the same string in every process
+    if isinstance(key, frozenset):
+        return 'frozenset({})'.format(','.join(sorted(_stable_repr(k) for k in key)))
+    if isinstance(key, tuple):
+        return '({})'.format(','.join(_stable_repr(k) for k in key))
+    if isinstance(key, type):
+        return key.__name__
+    return repr(key)
+
+
+class CachedSimilarity(object):
+    """
+    Memoized similarity function, created by :meth:`cached`.
+
+    Attributes:
+        hits (int): Number of calls answered from memory.
+        misses (int): Number of calls not found in memory.
+        evictions (int): Number of entries evicted from memory.
+        adapter_hits (int): Number of misses answered by the key value adapter (second tier).
+    """
+
+    def __init__(self, function, maxsize=65536, symmetric=False, key_value_adapter: 'KeyValueAdapter' = None):
+        self.function = function
+        self.symmetric = symmetric
+        self.key_value_adapter = key_value_adapter
+        self._adapter_hits = 0
+        self._cache = _LRUCache(maxsize)
+        self._name = '{}.{}'.format(getattr(function, '__module__', ''),
+                                    getattr(function, '__qualname__', repr(function)))
+        functools.update_wrapper(self, function)
+
+    def __call__(self, *args, **kwargs):
+        try:
+            key = self._key(args, kwargs)
+        except TypeError:
+            return self.function(*args, **kwargs)
+
+        value = self._cache.get(key)
+        if value is not _LRUCache._MISSING:
+            return value
+
+        adapter_key = None
+        if self.key_value_adapter is not None:
+            adapter_key = self._adapter_key(key)
+            value = self.key_value_adapter.get(adapter_key)
+            if value is not None:
+                self._adapter_hit(key, value)
+                return value
+
+        value = self.function(*args, **kwargs)
+        self._cache.put(key, value)
+        if adapter_key is not None:
+            self.key_value_adapter.set(adapter_key, value)
+        return value
+
+    def _adapter_hit(self, key, value):
+        # statistics are updated under the lock of memory, so concurrent callers don't lose counts
+        with self._cache._lock:
+            self._adapter_hits += 1
+        self._cache.put(key, value)
+
+    def _key(self, args, kwargs):
+        args = tuple(_freeze(a) for a in args)
+        if self.symmetric and len(args) >= 2:
+            args = (frozenset(args[:2]),) + args[2:]
+        return args, frozenset((k, _freeze(v)) for k, v in kwargs.items())
+
+    def _adapter_key(self, key):
+        digest = hashlib.sha1(_stable_repr(key).encode('utf-8')).hexdigest()
+        return '{}:{}'.format(self._name, digest)
+
+    def __len__(self):
+        return len(self._cache)
+
+    @property
+    def maxsize(self):
+        return self._cache.maxsize
+
+    @property
+    def hits(self):
+        return self._cache.hits
+
+    @property
+    def misses(self):
+        return self._cache.misses
+
+    @property
+    def evictions(self):
+        return self._cache.evictions
+
+    @property
+    def adapter_hits(self):
+        return self._adapter_hits
+
+    @property
+    def hit_rate(self):
+        """
+        float: Hits (of memory and key value adapter) over all cached calls, 0 if there's no call.
+        """
+        with self._cache._lock:
+            return self._hit_rate()
+
+    def _hit_rate(self):
+        total = self._cache.hits + self._cache.misses
+        return (self._cache.hits + self._adapter_hits) / float(total) if total else 0.0
+
+    def cache_info(self):
+        """
+        Returns:
+            dict: hits, misses, adapter_hits, evictions, size, maxsize and hit_rate (a consistent snapshot).
+        """
+        with self._cache._lock:
+            return {
+                'hits': self._cache.hits,
+                'misses': self._cache.misses,
+                'adapter_hits': self._adapter_hits,
+                'evictions': self._cache.evictions,
+                'size': len(self._cache),
+                'maxsize': self.maxsize,
+                'hit_rate': self._hit_rate(),
+            }
+
+    def clear(self):
+        """
+        Remove all entries in memory and reset statistics. The key value adapter is not touched.
+        """
+        self._cache.clear()
+        with self._cache._lock:
+            self._adapter_hits = 0
+
+
+def cached(function, maxsize=65536, symmetric=False, key_value_adapter: 'KeyValueAdapter' = None):
+    """
+    Memoize a similarity function, so repeated values (e.g., the same city or company name in many records) \
+    are only computed once.
+
+    Args:
+        function (function): Similarity (or distance) function.
+        maxsize (int, optional): Maximum number of results kept in memory, the least recently used one \
+            is evicted first. None means unbounded. Defaults to 65536.
+        symmetric (bool, optional): If the function is symmetric, calls with the first two arguments swapped \
+            share the same entry. Defaults to False.
+        key_value_adapter (KeyValueAdapter, optional): Second tier of cache (e.g., :meth:`rltk.DbmKeyValueAdapter`), \
+            it's looked up when memory misses and gets every newly computed result, \
+            so results survive eviction and can be shared across runs. Defaults to None.
+
+    Returns:
+        CachedSimilarity: Callable with the same signature as `function`.
+
+    Note:
+        Arguments are keyed by value. Lists, tuples, sets, dicts and numpy arrays are supported, \
+        calls with other unhashable arguments are not cached.
+
+    Examples::
+
+        levenshtein = rltk.cached(rltk.levenshtein_similarity, maxsize=100000, symmetric=True)
+        for r1, r2 in rltk.candidate_pairs(ds1, ds2):
+            levenshtein(r1.city, r2.city)
+        print(levenshtein.cache_info())
+    """
+    return CachedSimilarity(function, maxsize=maxsize, symmetric=symmetric, key_value_adapter=key_value_adapter)
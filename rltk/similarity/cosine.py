@@ -1,5 +1,8 @@
 import math
 import collections
+
+import numpy as np
+
 import rltk.utils as utils
 
 
@@ -8,8 +11,8 @@ def cosine_similarity(vec1, vec2):
     The cosine similarity between to vectors.
 
     Args:
-        vec1 (list): Vector 1. List of integer or float.
-        vec2 (list): Vector 2. List of integer or float. It should have the same length to vec1.
+        vec1 (list): Vector 1. List (or numpy.ndarray) of integer or float.
+        vec2 (list): Vector 2. List (or numpy.ndarray) of integer or float. It should have the same length to vec1.
 
     Returns:
         float: Cosine similarity.
@@ -20,10 +23,13 @@ def cosine_similarity(vec1, vec2):
     """
 
     utils.check_for_none(vec1, vec2)
-    utils.check_for_type(list, vec1, vec2)
+    utils.check_for_type((list, np.ndarray), vec1, vec2)
     if len(vec1) != len(vec2):
         raise ValueError('vec1 and vec2 should have same length')
 
+    if isinstance(vec1, np.ndarray) or isinstance(vec2, np.ndarray):
+        return float(cosine_similarity_matrix([vec1], [vec2])[0, 0])
+
     v_x_y, v_x_2, v_y_2 = 0.0, 0.0, 0.0
     for v1, v2 in zip(vec1, vec2):  # list of int / float
         v_x_y += v1 * v2
@@ -33,6 +39,47 @@ def cosine_similarity(vec1, vec2):
     return 0.0 if v_x_y == 0 else v_x_y / (math.sqrt(v_x_2) * math.sqrt(v_y_2))
 
 
+def cosine_similarity_batch(vec, vecs):
+    """
+    Cosine similarities from one vector to many vectors.
+
+    Args:
+        vec (list): Vector. List (or numpy.ndarray) of integer or float.
+        vecs (numpy.ndarray): 2-D array (or list of vectors), one vector per row.
+
+    Returns:
+        numpy.ndarray: Similarities in the same order as `vecs`.
+    """
+    if len(vecs) == 0:
+        return np.zeros(0)
+    return cosine_similarity_matrix([vec], vecs)[0]
+
+
+def cosine_similarity_matrix(vecs1, vecs2=None):
+    """
+    Pairwise cosine similarities. Zero vectors have similarity 0 to any vector.
+
+    Args:
+        vecs1 (numpy.ndarray): 2-D array (or list of vectors), one vector per row.
+        vecs2 (numpy.ndarray, optional): 2-D array, one vector per row. If it's None, `vecs1` is used. \
+            Defaults to None.
+
+    Returns:
+        numpy.ndarray: Similarity matrix, the shape is `(len(vecs1), len(vecs2))`.
+    """
+    def normalize(vecs):
+        vecs = np.asarray(vecs, dtype=np.float64)
+        if vecs.ndim != 2:
+            raise ValueError('Vectors should be a 2-D array')
+        norms = np.sqrt(np.einsum('ij,ij->i', vecs, vecs))
+        norms[norms == 0] = 1.0
+        return vecs / norms[:, None]
+
+    vecs1 = normalize(vecs1)
+    vecs2 = vecs1 if vecs2 is None else normalize(vecs2)
+    return vecs1.dot(vecs2.T)
+
+
 def string_cosine_similarity(bag1, bag2):
     """
     The similarity between the two strings is the cosine of the angle between these two vectors representation.
@@ -24,3 +24,15 @@ def dice_similarity(set1, set2):
         return 0
 
     return 2.0 * float(len(set1 & set2)) / float(len(set1) + len(set2))
+
+
+def _dice_upper_bound(set1, set2):
+    """
+    Upper bound of Dice similarity computed from sizes only: the smaller set is contained in the larger one.
+    """
+    if len(set1) == 0 or len(set2) == 0:
+        return 0.0
+    return 2.0 * min(len(set1), len(set2)) / float(len(set1) + len(set2))
+
+
+dice_similarity.upper_bound = _dice_upper_bound
@@ -1,30 +1,62 @@
 # https://docs.scipy.org/doc/scipy-0.14.0/reference/spatial.distance.html
-from scipy.spatial.distance import euclidean, cityblock
+import math
+
+import numpy as np
+from scipy.spatial.distance import cdist
 
 import rltk.utils as utils
 
 
+def _check_vectors(vec1, vec2, weights):
+    utils.check_for_none(vec1, vec2)
+    utils.check_for_type((list, np.ndarray), vec1, vec2)
+    if weights is not None:
+        utils.check_for_type((list, np.ndarray), weights)
+    if len(vec1) != len(vec2):
+        raise ValueError('vec1 and vec2 should have same length')
+    if weights is not None:
+        _check_weights(weights, len(vec1))
+
+
+def _check_weights(weights, length):
+    weights = np.asarray(weights, dtype=np.float64)
+    if weights.ndim != 1 or len(weights) != length:
+        raise ValueError('weights should have the same length as vectors')
+    if (weights < 0).any():
+        raise ValueError('weights should be non-negative')
+    return weights
+
+
+def _to_matrix(vecs):
+    vecs = np.asarray(vecs, dtype=np.float64)
+    if vecs.ndim != 2:
+        raise ValueError('Vectors should be a 2-D array')
+    return vecs
+
+
 def euclidean_distance(vec1, vec2, weights=None):
     """
     Euclidean distance.
 
     Args:
-        vec1 (list): Vector 1. List of integer or float.
-        vec2 (list): Vector 2. List of integer or float. It should have the same length to vec1.
+        vec1 (list): Vector 1. List (or numpy.ndarray) of integer or float.
+        vec2 (list): Vector 2. List (or numpy.ndarray) of integer or float. It should have the same length to vec1.
         weights (list): Weights for each value in vectors. If it's None, all weights will be 1.0. Defaults to None.
 
     Returns:
         float: Euclidean distance.
     """
+    _check_vectors(vec1, vec2, weights)
 
-    utils.check_for_none(vec1, vec2)
-    utils.check_for_type(list, vec1, vec2)
-    if weights:
-        utils.check_for_type(list, weights)
-    if len(vec1) != len(vec2):
-        raise ValueError('vec1 and vec2 should have same length')
+    if isinstance(vec1, np.ndarray) or isinstance(vec2, np.ndarray):
+        diff = np.asarray(vec1, dtype=np.float64) - np.asarray(vec2, dtype=np.float64)
+        if weights is not None:
+            return float(np.sqrt(np.dot(np.asarray(weights, dtype=np.float64) * diff, diff)))
+        return float(np.sqrt(np.dot(diff, diff)))
 
-    return euclidean(vec1, vec2, weights)
+    if weights is not None:
+        return math.sqrt(sum(w * (v1 - v2) * (v1 - v2) for v1, v2, w in zip(vec1, vec2, weights)))
+    return math.sqrt(sum((v1 - v2) * (v1 - v2) for v1, v2 in zip(vec1, vec2)))
 
 
 def euclidean_similarity(vec1, vec2, weights=None):
@@ -34,26 +66,66 @@ def euclidean_similarity(vec1, vec2, weights=None):
     return 1.0 / (1.0 + float(euclidean_distance(vec1, vec2, weights)))
 
 
+def euclidean_distance_batch(vec, vecs, weights=None):
+    """
+    Euclidean distances from one vector to many vectors.
+
+    Args:
+        vec (list): Vector. List (or numpy.ndarray) of integer or float.
+        vecs (numpy.ndarray): 2-D array (or list of vectors), one vector per row.
+        weights (list, optional): Weights for each value in vectors. Defaults to None.
+
+    Returns:
+        numpy.ndarray: Distances in the same order as `vecs`.
+    """
+    if len(vecs) == 0:
+        return np.zeros(0)
+    return euclidean_distance_matrix([vec], vecs, weights)[0]
+
+
+def euclidean_distance_matrix(vecs1, vecs2=None, weights=None):
+    """
+    Pairwise Euclidean distances.
+
+    Args:
+        vecs1 (numpy.ndarray): 2-D array (or list of vectors), one vector per row.
+        vecs2 (numpy.ndarray, optional): 2-D array, one vector per row. If it's None, `vecs1` is used. \
+            Defaults to None.
+        weights (list, optional): Weights for each value in vectors. Defaults to None.
+
+    Returns:
+        numpy.ndarray: Distance matrix, the shape is `(len(vecs1), len(vecs2))`.
+    """
+    vecs1 = _to_matrix(vecs1)
+    vecs2 = vecs1 if vecs2 is None else _to_matrix(vecs2)
+    if weights is not None:
+        return cdist(vecs1, vecs2, 'euclidean', w=_check_weights(weights, vecs1.shape[1]))
+    return cdist(vecs1, vecs2, 'euclidean')
+
+
 def manhattan_distance(vec1, vec2, weights=None):
     """
     Manhattan distance.
 
     Args:
-        vec1 (list): Vector 1. List of integer or float.
-        vec2 (list): Vector 2. List of integer or float. It should have the same length to vec1.
+        vec1 (list): Vector 1. List (or numpy.ndarray) of integer or float.
+        vec2 (list): Vector 2. List (or numpy.ndarray) of integer or float. It should have the same length to vec1.
         weights (list): Weights for each value in vectors. If it's None, all weights will be 1.0. Defaults to None.
 
     Returns:
         float: Manhattan distance.
     """
-    utils.check_for_none(vec1, vec2)
-    utils.check_for_type(list, vec1, vec2)
-    if weights:
-        utils.check_for_type(list, weights)
-    if len(vec1) != len(vec2):
-        raise ValueError('vec1 and vec2 should have same length')
+    _check_vectors(vec1, vec2, weights)
+
+    if isinstance(vec1, np.ndarray) or isinstance(vec2, np.ndarray):
+        diff = np.abs(np.asarray(vec1, dtype=np.float64) - np.asarray(vec2, dtype=np.float64))
+        if weights is not None:
+            return float(np.dot(np.asarray(weights, dtype=np.float64), diff))
+        return float(diff.sum())
 
-    return cityblock(vec1, vec2, weights)
+    if weights is not None:
+        return sum(w * abs(v1 - v2) for v1, v2, w in zip(vec1, vec2, weights))
+    return sum(abs(v1 - v2) for v1, v2 in zip(vec1, vec2))
 
 
 def manhattan_similarity(vec1, vec2, weights=None):
@@ -61,3 +133,40 @@ def manhattan_similarity(vec1, vec2, weights=None):
     Computed as 1 / (1 + manhattan_distance)
     """
     return 1.0 / (1.0 + manhattan_distance(vec1, vec2, weights))
+
+
+def manhattan_distance_batch(vec, vecs, weights=None):
+    """
+    Manhattan distances from one vector to many vectors.
+
+    Args:
+        vec (list): Vector. List (or numpy.ndarray) of integer or float.
+        vecs (numpy.ndarray): 2-D array (or list of vectors), one vector per row.
+        weights (list, optional): Weights for each value in vectors. Defaults to None.
+
+    Returns:
+        numpy.ndarray: Distances in the same order as `vecs`.
+    """
+    if len(vecs) == 0:
+        return np.zeros(0)
+    return manhattan_distance_matrix([vec], vecs, weights)[0]
+
+
+def manhattan_distance_matrix(vecs1, vecs2=None, weights=None):
+    """
+    Pairwise Manhattan distances.
+
+    Args:
+        vecs1 (numpy.ndarray): 2-D array (or list of vectors), one vector per row.
+        vecs2 (numpy.ndarray, optional): 2-D array, one vector per row. If it's None, `vecs1` is used. \
+            Defaults to None.
+        weights (list, optional): Weights for each value in vectors. Defaults to None.
+
+    Returns:
+        numpy.ndarray: Distance matrix, the shape is `(len(vecs1), len(vecs2))`.
+    """
+    vecs1 = _to_matrix(vecs1)
+    vecs2 = vecs1 if vecs2 is None else _to_matrix(vecs2)
+    if weights is not None:
+        return cdist(vecs1, vecs2, 'cityblock', w=_check_weights(weights, vecs1.shape[1]))
+    return cdist(vecs1, vecs2, 'cityblock')
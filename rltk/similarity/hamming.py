@@ -1,3 +1,5 @@
+import numpy as np
+
 import rltk.utils as utils
 
 
@@ -58,3 +60,53 @@ def hamming_similarity(s1, s2):
     """
 
     return 1 - normalized_hamming_distance(s1, s2)
+
+
+def hamming_distance_batch(s, candidates):
+    """
+    Hamming distances between one sequence and many candidates in a single vectorized call.
+
+    Args:
+        s (str or list): Sequence.
+        candidates (list or numpy.ndarray): Candidate sequences, all of them should have the same length as `s`.
+
+    Returns:
+        numpy.ndarray: Hamming distances, one for each candidate.
+
+    Examples:
+        >>> rltk.hamming_distance_batch('ab', ['cd', 'ad', 'ab'])
+        array([2, 1, 0])
+    """
+    utils.check_for_none(s, candidates)
+    candidates = list(candidates)
+
+    if isinstance(s, str):
+        utils.check_for_type(str, *candidates)
+        codes, lengths = utils.strings_to_code_matrix(candidates)
+        query = np.array([ord(c) for c in s], dtype=np.uint32)
+    else:
+        lengths = np.fromiter(map(len, candidates), dtype=np.int64, count=len(candidates))
+        query = np.asarray(s)
+        codes = np.asarray(candidates) if len(candidates) > 0 else np.zeros((0, len(s)))
+
+    if np.any(lengths != len(s)):
+        raise ValueError('Unequal length')
+
+    return (codes.reshape(len(candidates), len(s)) != query).sum(axis=1)
+
+
+def hamming_similarity_batch(s, candidates):
+    """
+    :meth:`hamming_similarity` between one sequence and many candidates.
+
+    Args:
+        s (str or list): Sequence.
+        candidates (list or numpy.ndarray): Candidate sequences, all of them should have the same length as `s`.
+
+    Returns:
+        numpy.ndarray: Hamming similarities (float), one for each candidate.
+    """
+    distance = hamming_distance_batch(s, candidates)
+    if len(s) == 0:
+        return np.ones(len(distance))
+    return 1.0 - distance / float(len(s))
@@ -1,10 +1,96 @@
 from scipy.optimize import linear_sum_assignment
 import rltk.utils as utils
+from rltk.similarity.cache import _LRUCache
 from rltk.similarity.jaro import jaro_winkler_similarity
 
 
+class TokenScoreCache(object):
+    """
+    Bounded and thread-safe cache of the scores of token pairs, keyed by (function, parameters, token1, token2).
+    It can be shared by :meth:`hybrid_jaccard_similarity`, :meth:`monge_elkan_similarity` and
+    :meth:`symmetric_monge_elkan_similarity` across calls, so that common tokens are scored only once.
+
+    Args:
+        maxsize (int, optional): Maximum number of cached scores, the least recently used one is evicted first. \
+            None means unbounded. Defaults to 1048576.
+        symmetric (bool, optional): If True, (token1, token2) and (token2, token1) share the same entry. \
+            It is only valid for symmetric functions (e.g., :meth:`levenshtein_similarity` \
+            or :meth:`jaccard_index_similarity`), `jaro_winkler_similarity` is not symmetric. Defaults to False.
+
+    Note:
+        Parameters of the function need to be hashable, otherwise the scores are not cached.
+
+    Examples::
+
+        cache = rltk.TokenScoreCache(maxsize=100000)
+        for r1, r2 in pairs:
+            rltk.symmetric_monge_elkan_similarity(r1.name_tokens, r2.name_tokens, cache=cache)
+        print(cache.hits, cache.misses)
+        # symmetric function, both directions share the scores
+        cache = rltk.TokenScoreCache(maxsize=100000, symmetric=True)
+        rltk.symmetric_monge_elkan_similarity(tokens1, tokens2, function=rltk.levenshtein_similarity, cache=cache)
+    """
+
+    def __init__(self, maxsize=1048576, symmetric=False):
+        self._symmetric = symmetric
+        self._scores = _LRUCache(maxsize)
+
+    def __len__(self):
+        return len(self._scores)
+
+    @property
+    def hits(self):
+        return self._scores.hits
+
+    @property
+    def misses(self):
+        return self._scores.misses
+
+    @property
+    def evictions(self):
+        return self._scores.evictions
+
+    def clear(self):
+        """
+        Remove all cached scores and reset statistics.
+        """
+        self._scores.clear()
+
+    def scorer(self, function, parameters=None):
+        """
+        Args:
+            function (function): Similarity function.
+            parameters (dict, optional): Other parameters of function. Defaults to None.
+
+        Returns:
+            function: ``score(token1, token2)`` which returns the cached score if there is one.
+        """
+        parameters = parameters if isinstance(parameters, dict) else {}
+        prefix = (function, tuple(sorted(parameters.items())))
+        try:
+            hash(prefix)
+        except TypeError:
+            return lambda s1, s2: function(s1, s2, **parameters)
+
+        def score(s1, s2):
+            key = prefix + ((frozenset((s1, s2)),) if self._symmetric else (s1, s2))
+            value = self._scores.get(key)
+            if value is _LRUCache._MISSING:
+                value = function(s1, s2, **parameters)
+                self._scores.put(key, value)
+            return value
+
+        return score
+
+
+def _get_scorer(function, parameters, cache):
+    if cache is not None:
+        return cache.scorer(function, parameters)
+    return lambda s1, s2: function(s1, s2, **parameters)
+
+
 def hybrid_jaccard_similarity(set1, set2, threshold=0.5, function=jaro_winkler_similarity,
-                              parameters=None, lower_bound=None):
+                              parameters=None, lower_bound=None, cache=None):
     """
     Generalized Jaccard Measure.
 
@@ -19,10 +105,17 @@ def hybrid_jaccard_similarity(set1, set2, threshold=0.5, function=jaro_winkler_s
         parameters (dict, optional): Other parameters of function. Defaults to None.
         lower_bound (float): This is for early exit. If the similarity is not possible to satisfy this value, \
             the function returns immediately with the return value 0.0. Defaults to None.
+        cache (TokenScoreCache, optional): Cache of the scores of token pairs. Defaults to None.
 
     Returns:
         float: Hybrid Jaccard similarity.
 
+    Note:
+        Pairs scored below `threshold` are pruned (by a cheap upper bound first if the function has one, \
+        see :meth:`similarity_upper_bound`), \
+        and the assignment is solved separately on each connected group of the remaining pairs, \
+        so large token sets with few similar pairs are fast.
+
     Examples:
         >>> def hybrid_test_similarity(m ,n):
         ...     ...
@@ -38,16 +131,25 @@ def hybrid_jaccard_similarity(set1, set2, threshold=0.5, function=jaro_winkler_s
     if len(set1) > len(set2):
         set1, set2 = set2, set1
     total_num_matches = len(set1)
+    if lower_bound and _hybrid_jaccard_upper_bound(set1, set2) < lower_bound:
+        return 0.0
+    set2 = list(set2)
 
-    matching_score = [[1.0] * len(set2) for _ in range(len(set1))]
+    # pairs below threshold are dropped (they can't contribute to the score),
+    # skip calling the function if its cheap upper bound already tells so
+    upper_bound = getattr(function, 'upper_bound', None)
+    score_of = _get_scorer(function, parameters, cache)
+    edges = {}
     row_max = [0.0] * len(set1)
     for i, s1 in enumerate(set1):
         for j, s2 in enumerate(set2):
-            score = function(s1, s2, **parameters)
-            if score < threshold:
-                score = 0.0
+            if upper_bound and upper_bound(s1, s2, **parameters) < threshold:
+                continue
+            score = score_of(s1, s2)
+            if score < threshold or score <= 0:
+                continue
+            edges[(i, j)] = score
             row_max[i] = max(row_max[i], score)
-            matching_score[i][j] = 1.0 - score  # munkres finds out the smallest element
 
         if lower_bound:
             max_possible_score_sum = sum(row_max[:i+1] + [1] * (total_num_matches - i - 1))
@@ -55,13 +157,28 @@ def hybrid_jaccard_similarity(set1, set2, threshold=0.5, function=jaro_winkler_s
             if max_possible < lower_bound:
                 return 0.0
 
-    # run munkres, finds the min score (max similarity) for each row
-    row_idx, col_idx = linear_sum_assignment(matching_score)
-
-    # recover scores
+    # the optimal assignment is the sum of the optimal assignments of each connected component
     score_sum = 0.0
-    for r, c in zip(row_idx, col_idx):
-        score_sum += 1.0 - matching_score[r][c]
+    for component in _connected_components(edges, len(set1)):
+        rows = sorted(set(i for i, _ in component))
+        cols = sorted(set(j for _, j in component))
+        if len(rows) == 1 or len(cols) == 1:
+            # star: only one of the edges can be taken
+            score_sum += max(edges[e] for e in component)
+            continue
+
+        row_pos = {r: idx for idx, r in enumerate(rows)}
+        col_pos = {c: idx for idx, c in enumerate(cols)}
+        matching_score = [[1.0] * len(cols) for _ in range(len(rows))]
+        for i, j in component:
+            matching_score[row_pos[i]][col_pos[j]] = 1.0 - edges[(i, j)]  # munkres finds out the smallest element
+
+        # run munkres, finds the min score (max similarity) for each row
+        row_idx, col_idx = linear_sum_assignment(matching_score)
+
+        # recover scores
+        for r, c in zip(row_idx, col_idx):
+            score_sum += 1.0 - matching_score[r][c]
 
     if len(set1) + len(set2) - total_num_matches == 0:
         return 1.0
@@ -71,7 +188,44 @@ def hybrid_jaccard_similarity(set1, set2, threshold=0.5, function=jaro_winkler_s
     return sim
 
 
-def monge_elkan_similarity(bag1, bag2, function=jaro_winkler_similarity, parameters=None, lower_bound=None):
+def _hybrid_jaccard_upper_bound(set1, set2, **kwargs):
+    """
+    Upper bound of :meth:`hybrid_jaccard_similarity` computed from sizes only: \
+    each element of the smaller set matches with score 1.
+    """
+    if len(set1) == 0 and len(set2) == 0:
+        return 1.0
+    return float(min(len(set1), len(set2))) / max(len(set1), len(set2))
+
+
+def _connected_components(edges, num_rows):
+    """
+    Group bipartite edges ``(row, col)`` into connected components by union-find.
+    Columns are numbered after rows.
+    """
+    parent = {}
+
+    def find(x):
+        root = x
+        while parent.setdefault(root, root) != root:
+            root = parent[root]
+        while parent[x] != root:
+            parent[x], x = root, parent[x]
+        return root
+
+    for i, j in edges:
+        root_i, root_j = find(i), find(num_rows + j)
+        if root_i != root_j:
+            parent[root_i] = root_j
+
+    components = {}
+    for i, j in edges:
+        components.setdefault(find(i), []).append((i, j))
+    return components.values()
+
+
+def monge_elkan_similarity(bag1, bag2, function=jaro_winkler_similarity, parameters=None, lower_bound=None,
+                           cache=None):
     """
     Monge Elkan similarity.
 
@@ -84,6 +238,7 @@ def monge_elkan_similarity(bag1, bag2, function=jaro_winkler_similarity, paramet
         parameters (dict, optional): Other parameters of function. Defaults to None.
         lower_bound (float): This is for early exit. If the similarity is not possible to satisfy this value, \
             the function returns immediately with the return value 0.0. Defaults to None.
+        cache (TokenScoreCache, optional): Cache of the scores of token pairs. Defaults to None.
 
     Returns:
         float: Monge Elkan similarity.
@@ -98,12 +253,13 @@ def monge_elkan_similarity(bag1, bag2, function=jaro_winkler_similarity, paramet
     utils.check_for_type(list, bag1, bag2)
 
     parameters = parameters if isinstance(parameters, dict) else {}
+    score_of = _get_scorer(function, parameters, cache)
 
     score_sum = 0
     for idx, ele1 in enumerate(bag1):
         max_score = utils.MIN_FLOAT
         for ele2 in bag2:
-            max_score = max(max_score, function(ele1, ele2, **parameters))
+            max_score = max(max_score, score_of(ele1, ele2))
         score_sum += max_score
 
         # if it satisfies early exit condition
@@ -118,7 +274,8 @@ def monge_elkan_similarity(bag1, bag2, function=jaro_winkler_similarity, paramet
     return sim
 
 
-def symmetric_monge_elkan_similarity(bag1, bag2, function=jaro_winkler_similarity, parameters=None, lower_bound=None):
+def symmetric_monge_elkan_similarity(bag1, bag2, function=jaro_winkler_similarity, parameters=None, lower_bound=None,
+                                     cache=None):
     """
     Symmetric Monge Elkan similarity is computed by \
     (monge_elkan_similarity(b1, b2) + monge_elkan_similarity(b2, b1)) / 2.
@@ -126,12 +283,18 @@ def symmetric_monge_elkan_similarity(bag1, bag2, function=jaro_winkler_similarit
     Note:
         If `lower_bound` is given, the return will be zero unless \
             both `monge_elkan_similarity`s are greater than it.
+        If `function` is symmetric (e.g., :meth:`levenshtein_similarity`, not the default \
+            `jaro_winkler_similarity`) and `cache` is a symmetric :meth:`TokenScoreCache`, \
+            scores of the first direction are reused by the second.
     """
 
-    s1 = monge_elkan_similarity(bag1, bag2, function, parameters, lower_bound=lower_bound)
+    s1 = monge_elkan_similarity(bag1, bag2, function, parameters, lower_bound=lower_bound, cache=cache)
     if lower_bound and s1 == 0:
         return 0.0
-    s2 = monge_elkan_similarity(bag2, bag1, function, parameters, lower_bound=lower_bound)
+    s2 = monge_elkan_similarity(bag2, bag1, function, parameters, lower_bound=lower_bound, cache=cache)
     if lower_bound and s2 == 0:
         return 0.0
     return (s1 + s2) / 2
+
+
+hybrid_jaccard_similarity.upper_bound = _hybrid_jaccard_upper_bound
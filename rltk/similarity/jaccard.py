@@ -46,3 +46,20 @@ def jaccard_index_distance(set1, set2):
         int: Jaccard Index Distance.
     """
     return 1 - jaccard_index_similarity(set1, set2)
+
+
+def _jaccard_index_upper_bound(set1, set2):
+    """
+    Upper bound of Jaccard Index computed from sizes only: the smaller set is contained in the larger one.
+    """
+    if len(set1) == 0 or len(set2) == 0:
+        return 0.0
+    return float(min(len(set1), len(set2))) / max(len(set1), len(set2))
+
+
+def _jaccard_index_distance_lower_bound(set1, set2):
+    return 1 - _jaccard_index_upper_bound(set1, set2)
+
+
+jaccard_index_similarity.upper_bound = _jaccard_index_upper_bound
+jaccard_index_distance.lower_bound = _jaccard_index_distance_lower_bound
@@ -1,4 +1,7 @@
 import math
+
+import numpy as np
+
 import rltk.utils as utils
 
 
@@ -72,6 +75,58 @@ def jaro_distance(s1, s2):
     return _jaro_distance(s1, s2)
 
 
+def _jaro_upper_bound(s1, s2):
+    """
+    Upper bound of Jaro Distance computed from lengths only: at most all characters of the shorter one match.
+    """
+    len1, len2 = len(s1.lower()), len(s2.lower())
+    if len1 == 0 or len2 == 0:
+        return 0.0
+    return (2.0 + float(min(len1, len2)) / max(len1, len2)) / 3.0
+
+
+def _jaro_winkler_upper_bound(s1, s2, threshold=0.7, scaling_factor=0.1, prefix_len=4):
+    """
+    Upper bound of Jaro Winkler Similarity computed from lengths only.
+    """
+    jaro = _jaro_upper_bound(s1, s2)
+    if jaro <= threshold:
+        return jaro
+    boost = scaling_factor * min(prefix_len, len(s1), len(s2))
+    if boost <= 0:
+        return jaro
+    if boost <= 1:
+        return jaro + boost * (1.0 - jaro)
+    return threshold + boost * (1.0 - threshold)  # boosted score decreases with jaro
+
+
+def _jaro_common_upper_bound(common, len1, len2, **kwargs):
+    """
+    Upper bound of Jaro Distance computed from the number of common characters (counted with multiplicity) \
+    and the lengths of the lowercase strings: each matching character is one of the common ones. \
+    Arguments can be numpy arrays. It doesn't apply to strings containing '*' (see :meth:`_get_matching_characters`).
+    """
+    common = np.asarray(common, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        jaro = (common / len1 + common / len2 + 1.0) / 3.0
+    return np.where(common > 0, jaro, 0.0)
+
+
+def _jaro_winkler_common_upper_bound(common, len1, len2, threshold=0.7, scaling_factor=0.1, prefix_len=4):
+    """
+    Upper bound of Jaro Winkler Similarity, see :meth:`_jaro_common_upper_bound`. \
+    Lowercase strings are not shorter, so the prefix bonus is not underestimated.
+    """
+    jaro = _jaro_common_upper_bound(common, len1, len2)
+    boost = scaling_factor * np.minimum(prefix_len, np.minimum(len1, len2))
+    boosted = np.where(boost <= 1, jaro + boost * (1.0 - jaro), threshold + boost * (1.0 - threshold))
+    return np.where((jaro <= threshold) | (boost <= 0), jaro, boosted)
+
+
+def _jaro_winkler_distance_lower_bound(s1, s2, threshold=0.7, scaling_factor=0.1, prefix_len=4):
+    return 1 - _jaro_winkler_upper_bound(s1, s2, threshold, scaling_factor, prefix_len)
+
+
 def _jaro_distance(s1, s2):
     # code from https://github.com/nap/jaro-winkler-distance
     # Copyright Jean-Bernard Ratte
@@ -87,15 +142,17 @@ def _jaro_distance(s1, s2):
     if len(s1) > len(s2):
         longer, shorter = shorter, longer
 
-    m1 = _get_matching_characters(shorter, longer)
-    m2 = _get_matching_characters(longer, shorter)
+    limit = min(len(shorter), len(longer)) // 2
+    m1 = _get_matching_characters(shorter, longer, limit)
+    m2 = _get_matching_characters(longer, shorter, limit)
 
     if len(m1) == 0 or len(m2) == 0:
         return 0.0
 
+    transpositions = sum(1 for c1, c2 in zip(m1, m2) if c1 != c2) // 2
     return (float(len(m1)) / len(shorter) +
             float(len(m2)) / len(longer) +
-            float(len(m1) - _transpositions(m1, m2)) / len(m1)) / 3.0
+            float(len(m1) - transpositions) / len(m1)) / 3.0
 
 
 def _get_diff_index(first, second):
@@ -126,18 +183,153 @@ def _get_prefix(first, second):
         return first[0:index]
 
 
-def _get_matching_characters(first, second):
+def _get_matching_characters(first, second, limit):
+    """
+    Characters in `first` which can be found in the match window of `second`, in order.
+    Every position in `second` can only be used once, the occupied ones are treated as '*'.
+    """
+    positions = {}  # bit mask of positions of each character in second
+    bit = 1
+    for c in second:
+        positions[c] = positions.get(c, 0) | bit
+        bit <<= 1
+
     common = []
-    limit = math.floor(min(len(first), len(second)) / 2)
+    used = 0
+    len_second = len(second)
+    for i, c in enumerate(first):
+        current = positions.get(c, 0)
+        if c == '*':
+            current |= used
+        else:
+            current &= ~used
+            if not current:
+                continue
+        left = i - limit if i > limit else 0
+        right = min(i + limit + 1, len_second)
+        if right > left and (current >> left) & ((1 << (right - left)) - 1):  # in match window
+            common.append(c)
+            used |= current & -current  # the first occurrence is taken
+    return common
+
+
+def jaro_winkler_similarity_batch(s, candidates, threshold=0.7, scaling_factor=0.1, prefix_len=4):
+    """
+    :meth:`jaro_winkler_similarity` between one sequence and many candidates in a single vectorized call.
 
-    for i, l in enumerate(first):
-        left, right = int(max(0, i - limit)), int(min(i + limit + 1, len(second)))
-        if l in second[left:right]:
-            common.append(l)
-            second = second[0:second.index(l)] + '*' + second[second.index(l) + 1:]
+    Args:
+        s (str): Sequence.
+        candidates (list or numpy.ndarray): Candidate sequences.
+        threshold (int, optional): Boost threshold, prefix bonus is only added when compared strings have a Jaro Distance above it. Defaults to 0.7.
+        scaling_factor (int, optional): Scaling factor for how much the score is adjusted upwards for having common prefixes. Defaults to 0.1.
+        prefix_len (int, optional): Max length of common prefix. Defaults to 4.
+
+    Returns:
+        numpy.ndarray: Jaro Winkler similarities (float), one for each candidate.
 
-    return ''.join(common)
+    Examples:
+        >>> rltk.jaro_winkler_similarity_batch('dixon', ['dicksonx', 'dixon'])
+        array([0.81333333, 1.        ])
+    """
+    utils.check_for_none(s, candidates)
+    utils.check_for_type(str, s)
+    candidates = list(candidates)
+    utils.check_for_type(str, *candidates)
+
+    jaro = _jaro_distance_batch(s, candidates)
+
+    # length of common prefix (case sensitive)
+    codes, lengths = utils.strings_to_code_matrix(candidates)
+    q_codes = np.array([ord(c) for c in s], dtype=np.uint32)
+    width = min(prefix_len, len(s), codes.shape[1])
+    same = (codes[:, :width] == q_codes[:width]) & (np.arange(width) < lengths[:, None])
+    prefix = np.cumprod(same, axis=1).sum(axis=1)
+
+    return np.where(jaro > threshold, jaro + scaling_factor * prefix * (1.0 - jaro), jaro)
+
+
+def _jaro_distance_batch(s, candidates):
+    original, s, lowered = s, s.lower(), [c.lower() for c in candidates]
+    m = len(s)
+    jaro = np.zeros(len(candidates))
+    if m == 0 or len(candidates) == 0:
+        return jaro
+
+    codes, lengths = utils.strings_to_code_matrix(lowered)
+    # positions are 64 bit masks, longer strings go through the scalar version
+    fit = lengths <= 64
+    if m > 64:
+        fit[:] = False
+    for idx in np.flatnonzero(~fit):
+        jaro[idx] = _jaro_distance(original, candidates[idx])
+    if not fit.any():
+        return jaro
+    codes, lengths = codes[fit][:, :int(lengths[fit].max())], lengths[fit]
+    n, width = codes.shape
+
+    q_codes = np.array([ord(c) for c in s], dtype=np.uint32)
+    low_mask = np.array([(1 << i) - 1 for i in range(65)], dtype=np.uint64)
+    one, star = np.uint64(1), ord('*')
+    limit = np.minimum(lengths, m) // 2
+
+    def first_match(pos_mask, used, is_star, left, right):
+        # same as `_get_matching_characters`: a matched character is replaced by '*' in second string
+        current = np.where(is_star, pos_mask | used, pos_mask & ~used)
+        found = (current & low_mask[right] & ~low_mask[left]) != 0
+        return found, np.where(found, current & (~current + one), np.uint64(0))
+
+    # s as first, candidates as second
+    bits = (one << np.arange(width, dtype=np.uint64))
+    cand_pos = {c: ((codes == c) * bits).sum(axis=1, dtype=np.uint64) for c in set(q_codes.tolist())}
+    used = np.zeros(n, dtype=np.uint64)
+    matched_s = np.zeros((n, m), dtype=bool)
+    for i in range(m):
+        left, right = np.maximum(0, i - limit), np.minimum(i + limit + 1, lengths)
+        found, bit = first_match(cand_pos[q_codes[i]], used, q_codes[i] == star, left, right)
+        matched_s[:, i] = found
+        used |= bit
+
+    # candidates as first, s as second
+    keys = np.unique(q_codes)
+    s_pos = np.array([sum(1 << i for i in range(m) if q_codes[i] == k) for k in keys], dtype=np.uint64)
+    idx = np.minimum(np.searchsorted(keys, codes), len(keys) - 1)
+    s_pos = np.where(keys[idx] == codes, s_pos[idx], np.uint64(0))
+    used = np.zeros(n, dtype=np.uint64)
+    matched_c = np.zeros((n, width), dtype=bool)
+    for j in range(width):
+        left, right = np.maximum(0, j - limit), np.minimum(j + limit + 1, m)
+        found, bit = first_match(s_pos[:, j], used, codes[:, j] == star, left, right)
+        found &= lengths > j
+        matched_c[:, j] = found
+        used |= np.where(found, bit, np.uint64(0))
+
+    # matched characters in order, left aligned
+    size = max(m, width)
+    seq_s, seq_c = np.full((n, size), -1, dtype=np.int64), np.full((n, size), -1, dtype=np.int64)
+    rows, cols = np.nonzero(matched_s)
+    seq_s[rows, np.cumsum(matched_s, axis=1)[rows, cols] - 1] = q_codes[cols]
+    rows, cols = np.nonzero(matched_c)
+    seq_c[rows, np.cumsum(matched_c, axis=1)[rows, cols] - 1] = codes[rows, cols]
+    count_s, count_c = matched_s.sum(axis=1), matched_c.sum(axis=1)
+    common = np.minimum(count_s, count_c)
+    transpositions = ((seq_s != seq_c) & (np.arange(size) < common[:, None])).sum(axis=1) // 2
+
+    # the shorter (original length) one is the first in `_jaro_distance`
+    s_shorter = np.fromiter(map(len, candidates), dtype=np.int64, count=len(candidates))[fit] >= len(original)
+    count_1, count_2 = np.where(s_shorter, count_s, count_c), np.where(s_shorter, count_c, count_s)
+    len_1, len_2 = np.where(s_shorter, m, lengths), np.where(s_shorter, lengths, m)
+    valid = (count_1 > 0) & (count_2 > 0)
+    count_1, len_1, len_2 = np.maximum(count_1, 1), np.maximum(len_1, 1), np.maximum(len_2, 1)
+    jaro[fit] = np.where(valid, (count_1 / len_1 + count_2 / len_2 + (count_1 - transpositions) / count_1) / 3.0, 0.0)
+    return jaro
 
 
-def _transpositions(first, second):
-    return math.floor(len([(f, s) for f, s in zip(first, second) if not f == s]) / 2.0)
+# cheap bounds computed from lengths only, see :meth:`rltk.similarity_upper_bound`
+jaro_distance.upper_bound = _jaro_upper_bound
+jaro_winkler_similarity.upper_bound = _jaro_winkler_upper_bound
+jaro_winkler_distance.lower_bound = _jaro_winkler_distance_lower_bound
+_jaro_upper_bound.length_only = True
+_jaro_winkler_upper_bound.length_only = True
+# bounds from common characters, used by :meth:`rltk.Soft_TF_IDF` to filter pairs of vocabulary
+jaro_distance.character_upper_bound = _jaro_common_upper_bound
+jaro_winkler_similarity.character_upper_bound = _jaro_winkler_common_upper_bound
@@ -2,20 +2,30 @@ import rltk.utils as utils
 
 
 def _lcs(s1, s2):
-    m, n = len(s1), len(s2)
+    """
+    Length of LCS by bit-parallel algorithm (Allison-Dix, Hyyro).
+    Python int is used as the bit vector, so strings in any length can be processed as one multi-word vector.
+    """
+    # the shorter one is the pattern
+    if len(s1) > len(s2):
+        s1, s2 = s2, s1
+    m = len(s1)
+    if m == 0:
+        return 0
 
-    dp = [[None] * (n + 1) for i in range(m + 1)]
+    peq = {}
+    for i, c in enumerate(s1):
+        peq[c] = peq.get(c, 0) | (1 << i)
 
-    for i in range(m + 1):
-        for j in range(n + 1):
-            if i == 0 or j == 0:
-                dp[i][j] = 0
-            elif s1[i - 1] == s2[j - 1]:
-                dp[i][j] = dp[i - 1][j - 1] + 1
-            else:
-                dp[i][j] = max(dp[i - 1][j], dp[i][j - 1])
+    mask = (1 << m) - 1
+    v = mask
+    for c in s2:
+        if c in peq:
+            u = v & peq[c]
+            v = ((v + u) | (v - u)) & mask
 
-    return dp[m][n]
+    # each zero bit is a matched position
+    return m - bin(v).count('1')
 
 
 def longest_common_subsequence_distance(s1, s2):
@@ -75,3 +85,18 @@ def metric_longest_common_subsequence(s1, s2):
 
     lcs = _lcs(s1, s2)
     return 1 - float(lcs) / max(len(s1), len(s2), 1)
+
+
+def _lcs_distance_lower_bound(s1, s2):
+    """
+    Lower bound of LCS distance computed from lengths only: LCS is not longer than the shorter string.
+    """
+    return abs(len(s1) - len(s2))
+
+
+def _metric_lcs_lower_bound(s1, s2):
+    return 1 - float(min(len(s1), len(s2))) / max(len(s1), len(s2), 1)
+
+
+longest_common_subsequence_distance.lower_bound = _lcs_distance_lower_bound
+metric_longest_common_subsequence.lower_bound = _metric_lcs_lower_bound
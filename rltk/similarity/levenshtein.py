@@ -1,10 +1,10 @@
-from collections import defaultdict
+import numpy as np
 
 import rltk.utils as utils
 
 
 def levenshtein_distance(s1, s2, insert=None, delete=None, substitute=None,
-                         insert_default=1, delete_default=1, substitute_default=1):
+                         insert_default=1, delete_default=1, substitute_default=1, max_distance=None):
     """
     The Levenshtein distance between two words is the minimum number of single-character edits (insertions, \
     deletions or substitutions) required to change one word into the other.
@@ -18,9 +18,17 @@ def levenshtein_distance(s1, s2, insert=None, delete=None, substitute=None,
         insert_default (int, optional): Default value of insert cost. Defaults to 1.
         delete_default (int, optional): Default value of delete cost. Defaults to 1.
         substitute_default (int, optional): Default value of substitute cost. Defaults to 1.
+        max_distance (int, optional): Upper bound of the distance. If it is set, only the diagonal band \
+            which can still be within this bound is computed and the computation stops as soon as \
+            every cell in a row exceeds it. Defaults to None.
 
     Returns:
-        int: Levenshtein Distance.
+        int: Levenshtein Distance. If `max_distance` is set and the distance exceeds it, \
+            `max_distance + 1` is returned.
+
+    Note:
+        If none of `insert`, `delete` and `substitute` is given and all the default costs are equal, \
+        a bit-parallel algorithm (Myers / Hyyro) is used instead of the full dynamic programming matrix.
 
     Examples:
         >>> rltk.levenshtein_distance('ab', 'abc')
@@ -44,36 +52,157 @@ def levenshtein_distance(s1, s2, insert=None, delete=None, substitute=None,
     if n1 == 0 and n2 == 0:
         return 0
 
+    if max_distance is not None and max_distance < 0:
+        return max_distance + 1
+
+    # unit (or uniform) cost without per-character tables: use bit-parallel algorithm
+    if not insert and not delete and not substitute \
+            and insert_default == delete_default == substitute_default:
+        if max_distance is None or insert_default == 0:
+            return _bit_parallel_levenshtein(s1, s2) * insert_default
+        k = int(max_distance // insert_default)
+        lev = _banded_distance(s1, s2, k)
+        return lev * insert_default if lev <= k else max_distance + 1
+
     # if n1 == 0 or n2 == 0:
     #     return max(n1, n2)
 
-    dp = [[0] * (n2 + 1) for _ in range(n1 + 1)]
-    for i in range(n1 + 1):
-        for j in range(n2 + 1):
-            if i == 0 and j == 0:  # [0,0]
-                continue
-            elif i == 0:  # most top row
-                c = s2[j - 1]
-                dp[i][j] = insert[c] if c in insert else insert_default
-                dp[i][j] += dp[i][j - 1]
-            elif j == 0:  # most left column
-                c = s1[i - 1]
-                dp[i][j] = delete[c] if c in delete else delete_default
-                dp[i][j] += dp[i - 1][j]
+    # only two rows of the matrix are kept
+    insert_costs = [insert[c] if c in insert else insert_default for c in s2]
+    prev, curr = utils.scratch_rows('levenshtein', 2, n2 + 1)
+    prev[0] = 0
+    for j in range(1, n2 + 1):  # most top row
+        prev[j] = prev[j - 1] + insert_costs[j - 1]
+
+    for i in range(1, n1 + 1):
+        c1 = s1[i - 1]
+        delete_cost = delete[c1] if c1 in delete else delete_default
+        substitute_costs = substitute[c1] if c1 in substitute else {}
+        curr[0] = row_min = prev[0] + delete_cost  # most left column
+        for j in range(1, n2 + 1):
+            c2 = s2[j - 1]
+            if c1 == c2:
+                v = prev[j - 1]
             else:
-                c1, c2 = s1[i - 1], s2[j - 1]
-                insert_cost = insert[c2] if c2 in insert else insert_default
-                delete_cost = delete[c1] if c1 in delete else delete_default
-                substitute_cost = substitute[c1][c2] \
-                    if c1 in substitute and c2 in substitute[c1] else substitute_default
+                substitute_cost = substitute_costs[c2] if c2 in substitute_costs else substitute_default
+                v = min(curr[j - 1] + insert_costs[j - 1],
+                        prev[j] + delete_cost,
+                        prev[j - 1] + substitute_cost)
+            curr[j] = v
+            if v < row_min:
+                row_min = v
+
+        # costs are non-negative, so no cell in following rows can go below the minimum of this row
+        # (rows are reused buffers which can be longer than n2 + 1, so the minimum is kept while filling)
+        if max_distance is not None and row_min > max_distance:
+            return max_distance + 1
+        prev, curr = curr, prev
+
+    if max_distance is not None and prev[n2] > max_distance:
+        return max_distance + 1
+    return prev[n2]
+
+
+def _strip_common_affix(s1, s2):
+    """
+    Common prefix and suffix don't change unit-cost edit distances.
+    """
+    start, end1, end2 = 0, len(s1), len(s2)
+    while start < end1 and start < end2 and s1[start] == s2[start]:
+        start += 1
+    while end1 > start and end2 > start and s1[end1 - 1] == s2[end2 - 1]:
+        end1 -= 1
+        end2 -= 1
+    if start > 0 or end1 < len(s1) or end2 < len(s2):
+        return s1[start:end1], s2[start:end2]
+    return s1, s2
+
+
+def _bit_parallel_levenshtein(s1, s2):
+    """
+    Unit-cost Levenshtein distance by Myers / Hyyro's bit-vector algorithm.
+    Python int is used as the bit vector, so there's no limit on the length of pattern.
+    """
+    s1, s2 = _strip_common_affix(s1, s2)
+
+    # the shorter one is the pattern
+    if len(s1) > len(s2):
+        s1, s2 = s2, s1
+    m = len(s1)
+    if m == 0:
+        return len(s2)
+
+    peq = {}
+    for i, c in enumerate(s1):
+        peq[c] = peq.get(c, 0) | (1 << i)
+
+    mask = (1 << m) - 1
+    last = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    for c in s2:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = (ph << 1) | 1
+        mh <<= 1
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+    return score
+
+
+def _banded_distance(s1, s2, k, transposition=False):
+    """
+    Unit-cost Levenshtein (or optimal string alignment if `transposition` is True) distance.
+    Only the diagonal band of width 2k+1 is computed (Ukkonen), k + 1 is returned once the distance exceeds k.
+    """
+    s1, s2 = _strip_common_affix(s1, s2)
+    n1, n2 = len(s1), len(s2)
+    big = k + 1
+    if abs(n1 - n2) > k:
+        return big
+
+    # cell (i, j) is stored in row[j - i + k], cells out of the band are always greater than k
+    w = 2 * k + 1
+    prev2, prev, curr = utils.scratch_rows('banded_distance', 3, w)
+    bigs = [big] * w
+    prev[:w] = bigs
+    for j in range(min(n2, k) + 1):
+        prev[j + k] = j
 
-                if c1 == c2:
-                    dp[i][j] = dp[i - 1][j - 1]
-                else:
-                    dp[i][j] = min(dp[i][j - 1] + insert_cost,
-                                   dp[i - 1][j] + delete_cost,
-                                   dp[i - 1][j - 1] + substitute_cost)
-    return dp[n1][n2]
+    for i in range(1, n1 + 1):
+        c1 = s1[i - 1]
+        curr[:w] = bigs
+        row_min = big
+        if i <= k:
+            curr[k - i] = row_min = i
+        for j in range(max(1, i - k), min(n2, i + k) + 1):
+            d = j - i + k
+            c2 = s2[j - 1]
+            v = prev[d] if c1 == c2 else prev[d] + 1
+            if d + 1 < w and prev[d + 1] < v:  # delete
+                v = prev[d + 1] + 1
+            if d > 0 and curr[d - 1] < v:  # insert
+                v = curr[d - 1] + 1
+            if transposition and i > 1 and j > 1 and c1 == s2[j - 2] and s1[i - 2] == c2 and prev2[d] < v:
+                v = prev2[d] + 1
+            if v > big:
+                v = big
+            curr[d] = v
+            if v < row_min:
+                row_min = v
+
+        # every path to the last cell goes through (or above) this row
+        if row_min > k:
+            return big
+        prev2, prev, curr = prev, curr, prev2
+
+    return prev[n2 - n1 + k]
 
 
 def levenshtein_similarity(s1, s2, insert=None, delete=None, substitute=None,
@@ -82,47 +211,26 @@ def levenshtein_similarity(s1, s2, insert=None, delete=None, substitute=None,
     """
     Computed as 1 - levenshtein_distance / max-cost(s1,s2)
     """
+    utils.check_for_none(s1, s2)
+    utils.check_for_type(str, s1, s2)
+
     insert = insert if isinstance(insert, dict) else {}
     delete = delete if isinstance(delete, dict) else {}
     substitute = substitute if isinstance(substitute, dict) else {}
+    costs = (insert, delete, substitute, insert_default, delete_default, substitute_default)
 
-    def compute_max_cost(s):
-        return sum([
-            max(
-                insert[c] if c in insert else insert_default,
-                delete[c] if c in delete else delete_default,
-                substitute[c] if c in substitute else substitute_default
-            ) for c in s
-        ])
-
-    def estimate_min_char_cost(s):
-        return min([min(
-                insert[c] if c in insert else insert_default,
-                delete[c] if c in delete else delete_default,
-                substitute[c] if c in substitute else substitute_default
-            ) for c in s])
-
-    utils.check_for_none(s1, s2)
-    utils.check_for_type(str, s1, s2)
+    max_cost = max(_max_cost(s1, costs), _max_cost(s2, costs))
 
-    max_cost = max(compute_max_cost(s1), compute_max_cost(s2))
-
-    if lower_bound:
-        diff = abs(len(s1) - len(s2))
-        if len(s1) == 0 and len(s2) == 0:
-            return 1.0
-        elif len(s1) == 0:
-            min_lev = float(diff * estimate_min_char_cost(s2))
-        elif len(s2) == 0:
-            min_lev = float(diff * estimate_min_char_cost(s1))
-        else:
-            min_lev = float(diff * min(estimate_min_char_cost(s1), estimate_min_char_cost(s2)))
-        est_sim = 1.0 - min_lev / max_cost
-        if est_sim < lower_bound:
-            return 0.0
+    if lower_bound and _levenshtein_similarity_upper_bound(s1, s2, *costs) < lower_bound:
+        return 0.0
 
+    # any distance greater than this can't satisfy lower bound
+    # (a small tolerance is added for float error, result is checked again below)
+    max_distance = (1.0 - lower_bound) * max_cost + 1e-9 if lower_bound else None
     lev = levenshtein_distance(s1, s2, insert, delete, substitute,
-                               insert_default, delete_default, substitute_default)
+                               insert_default, delete_default, substitute_default, max_distance)
+    if max_distance is not None and lev > max_distance:
+        return 0.0
 
     if max_cost < lev:
         raise ValueError('Illegal value of operation cost')
@@ -136,7 +244,148 @@ def levenshtein_similarity(s1, s2, insert=None, delete=None, substitute=None,
     return lev_sim
 
 
-def damerau_levenshtein_distance(s1, s2):
+def levenshtein_distance_batch(s, candidates):
+    """
+    Unit-cost Levenshtein distances between one sequence and many candidates in a single vectorized call.
+
+    Args:
+        s (str): Sequence.
+        candidates (list or numpy.ndarray): Candidate sequences.
+
+    Returns:
+        numpy.ndarray: Levenshtein distances, one for each candidate.
+
+    Examples:
+        >>> rltk.levenshtein_distance_batch('abc', ['ab', 'abc', 'xyz'])
+        array([1, 0, 3])
+    """
+    utils.check_for_none(s, candidates)
+    utils.check_for_type(str, s)
+    candidates = list(candidates)
+    utils.check_for_type(str, *candidates)
+
+    codes, lengths = utils.strings_to_code_matrix(candidates)
+    m = len(s)
+    if m == 0:
+        return lengths
+    if m > 64:  # pattern doesn't fit into a machine word
+        return np.fromiter((_bit_parallel_levenshtein(s, c) for c in candidates),
+                           dtype=np.int64, count=len(candidates))
+
+    # pattern bit masks of s, looked up by code point
+    chars = sorted(set(s))
+    keys = np.array([ord(c) for c in chars], dtype=np.uint32)
+    peq = np.array([sum(1 << i for i, c in enumerate(s) if c == ch) for ch in chars], dtype=np.uint64)
+    pos = np.minimum(np.searchsorted(keys, codes), len(keys) - 1)
+    eq_all = np.where(keys[pos] == codes, peq[pos], np.uint64(0))
+
+    # Myers / Hyyro's algorithm on all candidates at once, one column per step
+    one = np.uint64(1)
+    mask, last = np.uint64((1 << m) - 1), np.uint64(1 << (m - 1))
+    pv = np.full(len(candidates), mask, dtype=np.uint64)
+    mv = np.zeros(len(candidates), dtype=np.uint64)
+    score = np.full(len(candidates), m, dtype=np.int64)
+    for j in range(codes.shape[1]):
+        eq = eq_all[:, j]
+        active = lengths > j
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | ~(xh | pv)
+        mh = pv & xh
+        score += ((ph & last) != 0) & active
+        score -= ((mh & last) != 0) & active
+        ph = (ph << one) | one
+        mh = mh << one
+        pv = (mh | ~(xv | ph)) & mask
+        mv = ph & xv & mask
+    return score
+
+
+def levenshtein_similarity_batch(s, candidates):
+    """
+    Unit-cost :meth:`levenshtein_similarity` between one sequence and many candidates.
+
+    Args:
+        s (str): Sequence.
+        candidates (list or numpy.ndarray): Candidate sequences.
+
+    Returns:
+        numpy.ndarray: Levenshtein similarities (float), one for each candidate.
+    """
+    candidates = list(candidates)
+    distance = levenshtein_distance_batch(s, candidates)
+    max_cost = np.maximum(np.fromiter(map(len, candidates), dtype=np.int64, count=len(candidates)), len(s))
+    return 1.0 - np.divide(distance, max_cost, out=np.zeros(len(distance)), where=max_cost > 0)
+
+
+def _char_costs(c, costs):
+    insert, delete, substitute, insert_default, delete_default, substitute_default = costs
+    return (
+        insert[c] if c in insert else insert_default,
+        delete[c] if c in delete else delete_default,
+        substitute[c] if c in substitute else substitute_default
+    )
+
+
+def _max_cost(s, costs):
+    return sum(max(_char_costs(c, costs)) for c in s)
+
+
+def _min_char_cost(s, costs):
+    return min(min(_char_costs(c, costs)) for c in s)
+
+
+def _length_upper_bound(s1, s2, **kwargs):
+    """
+    Upper bound of unit-cost edit similarities: at least the length difference needs to be inserted.
+    """
+    max_len = max(len(s1), len(s2))
+    if max_len == 0:
+        return 1.0
+    return 1.0 - float(abs(len(s1) - len(s2))) / max_len
+
+
+def _length_lower_bound(s1, s2, max_distance=None, **kwargs):
+    """
+    Lower bound of unit-cost edit distances: the length difference.
+    """
+    diff = abs(len(s1) - len(s2))
+    return diff if max_distance is None else min(diff, max(max_distance + 1, 0))
+
+
+def _levenshtein_similarity_upper_bound(s1, s2, insert=None, delete=None, substitute=None,
+                                        insert_default=1, delete_default=1, substitute_default=1, **kwargs):
+    """
+    Upper bound of :meth:`levenshtein_similarity` computed from lengths only: \
+    the length difference needs to be inserted or deleted, each at least at the cheapest cost.
+    """
+    if not insert and not delete and not substitute \
+            and insert_default == delete_default == substitute_default:
+        return _length_upper_bound(s1, s2)
+
+    costs = (insert or {}, delete or {}, substitute or {}, insert_default, delete_default, substitute_default)
+    max_cost = max(_max_cost(s1, costs), _max_cost(s2, costs))
+    diff = abs(len(s1) - len(s2))
+    if diff == 0 or max_cost == 0:
+        return 1.0
+    min_char_cost = min(_min_char_cost(s, costs) for s in (s1, s2) if s)
+    return 1.0 - float(diff * min_char_cost) / max_cost
+
+
+def _levenshtein_distance_lower_bound(s1, s2, insert=None, delete=None, substitute=None,
+                                      insert_default=1, delete_default=1, substitute_default=1,
+                                      max_distance=None, **kwargs):
+    """
+    Lower bound of :meth:`levenshtein_distance` computed from lengths only.
+    """
+    if insert or delete or substitute:
+        return 0
+    diff = len(s2) - len(s1)
+    bound = diff * insert_default if diff > 0 else -diff * delete_default
+    return bound if max_distance is None else min(bound, max(max_distance + 1, 0))
+
+
+def damerau_levenshtein_distance(s1, s2, max_distance=None):
     """
     Similar to Levenshtein, Damerau-Levenshtein distance is the minimum number of operations needed to transform\
      one string into the other, where an operation is defined as an insertion, deletion, or substitution of \
@@ -145,9 +394,12 @@ def damerau_levenshtein_distance(s1, s2):
     Args:
         s1 (str): Sequence 1.
         s2 (str): Sequence 2.
+        max_distance (int, optional): Upper bound of the distance. If it is set, only the diagonal band \
+            is computed and the computation stops as soon as every cell in a row exceeds it. Defaults to None.
 
     Returns:
-        float: Damerau Levenshtein Distance.
+        float: Damerau Levenshtein Distance. If `max_distance` is set and the distance exceeds it, \
+            `max_distance + 1` is returned.
 
     Examples:
         >>> rltk.damerau_levenshtein_distance('abcd', 'acbd')
@@ -162,37 +414,96 @@ def damerau_levenshtein_distance(s1, s2):
     # s1 = utils.unicode_normalize(s1)
     # s2 = utils.unicode_normalize(s2)
 
-    n1, n2 = len(s1), len(s2)
-    infinite = n1 + n2
-
-    char_arr = defaultdict(int)
-    dp = [[0] * (n2 + 2) for _ in range(n1 + 2)]
+    if max_distance is not None:
+        if max_distance < 0:
+            return max_distance + 1
+        k = int(max_distance)
+        dist = _banded_damerau_levenshtein(s1, s2, k)
+        return dist if dist <= k else max_distance + 1
 
-    dp[0][0] = infinite
-    for i in range(0, n1 + 1):
-        dp[i + 1][0] = infinite
-        dp[i + 1][1] = i
-    for i in range(0, n2 + 1):
-        dp[0][i + 1] = infinite
-        dp[1][i + 1] = i
+    n1, n2 = len(s1), len(s2)
 
+    # row i - 1 is needed when transposing to the last row i where each character of s1 appears,
+    # so the matrix is not kept, only the previous row and those rows
+    last_row, row_before_last = {}, {}
+    prev = list(range(n2 + 1))
     for i in range(1, n1 + 1):
-        db = 0
+        c1 = s1[i - 1]
+        curr = [i] + [0] * n2
+        db = 0  # last matched column in this row
         for j in range(1, n2 + 1):
-            i1 = char_arr[s2[j - 1]]
-            j1 = db
+            c2 = s2[j - 1]
+            i1, j1 = last_row.get(c2, 0), db
             cost = 1
-            if s1[i - 1] == s2[j - 1]:
+            if c1 == c2:
                 cost = 0
                 db = j
 
-            dp[i + 1][j + 1] = min(dp[i][j] + cost,
-                                   dp[i + 1][j] + 1,
-                                   dp[i][j + 1] + 1,
-                                   dp[i1][j1] + (i - i1 - 1) + 1 + (j - j1 - 1))
-        char_arr[s1[i - 1]] = i
+            v = min(prev[j - 1] + cost,
+                    curr[j - 1] + 1,
+                    prev[j] + 1)
+            if i1 and j1:
+                v = min(v, row_before_last[c2][j1 - 1] + (i - i1 - 1) + 1 + (j - j1 - 1))
+            curr[j] = v
+        last_row[c1], row_before_last[c1] = i, prev
+        prev = curr
 
-    return dp[n1 + 1][n2 + 1]
+    return prev[n2]
+
+
+def _banded_damerau_levenshtein(s1, s2, k):
+    """
+    Damerau-Levenshtein distance within the diagonal band of width 2k+1, k + 1 is returned once it exceeds k.
+    Transpositions jump back to the row before the last row of a character, those rows are kept.
+    """
+    n1, n2 = len(s1), len(s2)
+    big = k + 1
+    if abs(n1 - n2) > k:
+        return big
+
+    # cell (i, j) is stored in row[j - i + k]
+    w = 2 * k + 1
+    prev = [big] * w
+    for j in range(min(n2, k) + 1):
+        prev[j + k] = j
+
+    last_row, row_before_last = {}, {}  # last row index of each character in s1 and the row before it
+    for i in range(1, n1 + 1):
+        c1 = s1[i - 1]
+        curr = [big] * w
+        row_min = big
+        if i <= k:
+            curr[k - i] = row_min = i
+        last_col = 0  # last matched column in this row
+        for j in range(max(1, i - k), min(n2, i + k) + 1):
+            d = j - i + k
+            c2 = s2[j - 1]
+            v = prev[d] if c1 == c2 else prev[d] + 1
+            if d + 1 < w and prev[d + 1] < v:  # delete
+                v = prev[d + 1] + 1
+            if d > 0 and curr[d - 1] < v:  # insert
+                v = curr[d - 1] + 1
+            i1, j1 = last_row.get(c2, 0), last_col
+            if i1 and j1:  # transpose, matches out of band can't be within k
+                d1 = j1 - i1 + k
+                if 0 <= d1 < w:
+                    t = row_before_last[c2][d1] + (i - i1 - 1) + 1 + (j - j1 - 1)
+                    if t < v:
+                        v = t
+            if c1 == c2:
+                last_col = j
+            if v > big:
+                v = big
+            curr[d] = v
+            if v < row_min:
+                row_min = v
+
+        if row_min > k:
+            return big
+        last_row[c1], row_before_last[c1] = i, prev
+        prev = curr
+
+    return prev[n2 - n1 + k]
 
 
 def damerau_levenshtein_similarity(s1, s2):
@@ -207,7 +518,7 @@ def damerau_levenshtein_similarity(s1, s2):
     return 1.0 - float(damerau_levenshtein_distance(s1, s2)) / max_cost
 
 
-def optimal_string_alignment_distance(s1, s2):
+def optimal_string_alignment_distance(s1, s2, max_distance=None):
         """
         This is a variation of the Damerau-Levenshtein distance that returns the strings' edit distance
         taking into account deletion, insertion, substitution, and transposition, under the condition
@@ -216,9 +527,13 @@ def optimal_string_alignment_distance(s1, s2):
         Args:
             s1 (str): Sequence 1.
             s2 (str): Sequence 2.
+            max_distance (int, optional): Upper bound of the distance. If it is set, only the diagonal band \
+                is computed and the computation stops as soon as every cell in a row exceeds it. \
+                Defaults to None.
 
         Returns:
-            float: Optimal String Alignment Distance.
+            float: Optimal String Alignment Distance. If `max_distance` is set and the distance exceeds it, \
+                `max_distance + 1` is returned.
 
         Examples:
             >>> rltk.optimal_string_alignment_distance('abcd', 'acbd')
@@ -233,27 +548,36 @@ def optimal_string_alignment_distance(s1, s2):
         # s1 = utils.unicode_normalize(s1)
         # s2 = utils.unicode_normalize(s2)
 
-        n1, n2 = len(s1), len(s2)
+        if max_distance is not None:
+            if max_distance < 0:
+                return max_distance + 1
+            k = int(max_distance)
+            dist = _banded_distance(s1, s2, k, transposition=True)
+            return dist if dist <= k else max_distance + 1
 
-        dp = [[0] * (n2 + 1) for _ in range(n1 + 1)]
+        n1, n2 = len(s1), len(s2)
 
-        for i in range(0, n1 + 1):
-            dp[i][0] = i
-        for j in range(0, n2 + 1):
-            dp[0][j] = j
+        # transposition needs two rows back, so three rows are kept
+        prev2, prev, curr = utils.scratch_rows('optimal_string_alignment', 3, n2 + 1)
+        prev[:n2 + 1] = range(n2 + 1)
 
         for i in range(1, n1 + 1):
+            c1 = s1[i - 1]
+            curr[0] = i
             for j in range(1, n2 + 1):
-                cost = 0 if s1[i - 1] == s2[j - 1] else 1
+                c2 = s2[j - 1]
+                cost = 0 if c1 == c2 else 1
 
-                dp[i][j] = min(dp[i][j - 1] + 1,
-                               dp[i - 1][j] + 1,
-                               dp[i - 1][j - 1] + cost)
+                v = min(curr[j - 1] + 1,
+                        prev[j] + 1,
+                        prev[j - 1] + cost)
 
-                if i > 1 and j > 1 and s1[i - 1] == s2[j - 2] and s1[i - 2] == s2[j - 1]:
-                    dp[i][j] = min(dp[i][j], dp[i - 2][j - 2] + cost)
+                if i > 1 and j > 1 and c1 == s2[j - 2] and s1[i - 2] == c2:
+                    v = min(v, prev2[j - 2] + cost)
+                curr[j] = v
+            prev2, prev, curr = prev, curr, prev2
 
-        return dp[n1][n2]
+        return prev[n2]
 
 
 def optimal_string_alignment_similarity(s1, s2):
@@ -266,3 +590,13 @@ def optimal_string_alignment_similarity(s1, s2):
         return 1.0
 
     return 1.0 - float(optimal_string_alignment_distance(s1, s2)) / max_cost
+
+
+# cheap bounds computed from lengths only, see :meth:`rltk.similarity_upper_bound`
+levenshtein_distance.lower_bound = _levenshtein_distance_lower_bound
+levenshtein_similarity.upper_bound = _levenshtein_similarity_upper_bound
+damerau_levenshtein_distance.lower_bound = _length_lower_bound
+damerau_levenshtein_similarity.upper_bound = _length_upper_bound
+optimal_string_alignment_distance.lower_bound = _length_lower_bound
+optimal_string_alignment_similarity.upper_bound = _length_upper_bound
+_length_upper_bound.length_only = True
@@ -1,12 +1,27 @@
+import functools
+
 import rltk.utils as utils
 
+_CACHE_SIZE = 65536
+
+# first character is skipped if s starts with these
+_SKIP_FIRST_PREFIXES = ('kn', 'gn', 'pn', 'ac', 'wr', 'ae')
+# characters coded regardless of their neighbours
+# ('b' is kept after 'm' as well, like the reference implementation)
+_SIMPLE_CODES = {'b': 'b', 'f': 'f', 'j': 'j', 'l': 'l', 'm': 'm', 'n': 'n', 'r': 'r',
+                 'q': 'k', 'v': 'f', 'z': 's'}
+_VOWELS = 'aeiou'
+_FRONT_VOWELS = 'iey'
+_END = '*****'  # neighbour after the end of s
+
 
-def metaphone(s):
+def metaphone(s, cache=True):
     """
     Metaphone fundamentally improves on the Soundex algorithm by using information about variations and inconsistencies in English spelling and pronunciation to produce a more accurate encoding, which does a better job of matching words and names which sound similar. As with Soundex, similar-sounding words should share the same keys. Metaphone is available as a built-in operator in a number of systems.
 
     Args:
         s (str): Sequence.
+        cache (bool, optional): If True, encodings are kept in a bounded LRU cache. Defaults to True.
 
     Returns:
         str: Coded sequence.
@@ -17,14 +32,18 @@ def metaphone(s):
         >>> rltk.metaphone('pineapple')
         'PNPL'
     """
+    utils.check_for_none(s)
+    utils.check_for_type(str, s)
+
+    return _metaphone_cached(s) if cache else _metaphone(s)
+
+
+def _metaphone(s):
     # code from https://github.com/jamesturk/jellyfish
     # Copyright (c) 2015, James Turk
     # Copyright (c) 2015, Sunlight Foundation
     # All rights reserved.
 
-    utils.check_for_none(s)
-    utils.check_for_type(str, s)
-
     s = utils.unicode_normalize(s)
 
     if len(s) == 0:
@@ -33,54 +52,51 @@ def metaphone(s):
     s = s.lower()
     result = []
 
-    # skip first character if s starts with these
-    if s.startswith(('kn', 'gn', 'pn', 'ac', 'wr', 'ae')):
+    if s.startswith(_SKIP_FIRST_PREFIXES):
         s = s[1:]
 
     i = 0
-
-    while i < len(s):
+    len_s = len(s)
+    while i < len_s:
         c = s[i]
-        next_ = s[i+1] if i < len(s)-1 else '*****'
-        nextnext = s[i+2] if i < len(s)-2 else '*****'
+        next_ = s[i+1] if i < len_s-1 else _END
+        nextnext = s[i+2] if i < len_s-2 else _END
 
         # skip doubles except for cc
         if c == next_ and c != 'c':
             i += 1
             continue
 
-        if c in 'aeiou':
+        code = _SIMPLE_CODES.get(c)
+        if code is not None:
+            result.append(code)
+        elif c in _VOWELS:
             if i == 0 or s[i-1] == ' ':
                 result.append(c)
-        elif c == 'b':
-            if (not (i != 0 and s[i-1] == 'm')) or next_:
-                result.append('b')
         elif c == 'c':
             if next_ == 'i' and nextnext == 'a' or next_ == 'h':
                 result.append('x')
                 i += 1
-            elif next_ in 'iey':
+            elif next_ in _FRONT_VOWELS:
                 result.append('s')
                 i += 1
             else:
                 result.append('k')
         elif c == 'd':
-            if next_ == 'g' and nextnext in 'iey':
+            if next_ == 'g' and nextnext in _FRONT_VOWELS:
                 result.append('j')
                 i += 2
             else:
                 result.append('t')
-        elif c in 'fjlmnr':
-            result.append(c)
         elif c == 'g':
-            if next_ in 'iey':
+            if next_ in _FRONT_VOWELS:
                 result.append('j')
             elif next_ not in 'hn':
                 result.append('k')
-            elif next_ == 'h' and nextnext and nextnext not in 'aeiou':
+            elif next_ == 'h' and nextnext not in _VOWELS:
                 i += 1
         elif c == 'h':
-            if i == 0 or next_ in 'aeiou' or s[i-1] not in 'aeiou':
+            if i == 0 or next_ in _VOWELS or s[i-1] not in _VOWELS:
                 result.append('h')
         elif c == 'k':
             if i == 0 or s[i-1] != 'c':
@@ -91,8 +107,6 @@ def metaphone(s):
                 i += 1
             else:
                 result.append('p')
-        elif c == 'q':
-            result.append('k')
         elif c == 's':
             if next_ == 'h':
                 result.append('x')
@@ -110,12 +124,10 @@ def metaphone(s):
                 i += 1
             elif next_ != 'c' or nextnext != 'h':
                 result.append('t')
-        elif c == 'v':
-            result.append('f')
         elif c == 'w':
             if i == 0 and next_ == 'h':
                 i += 1
-            if nextnext in 'aeiou' or nextnext == '*****':
+            if nextnext in _VOWELS or nextnext == _END:
                 result.append('w')
         elif c == 'x':
             if i == 0:
@@ -127,10 +139,8 @@ def metaphone(s):
                 result.append('k')
                 result.append('s')
         elif c == 'y':
-            if next_ in 'aeiou':
+            if next_ in _VOWELS:
                 result.append('y')
-        elif c == 'z':
-            result.append('s')
         elif c == ' ':
             if len(result) > 0 and result[-1] != ' ':
                 result.append(' ')
@@ -140,6 +150,24 @@ def metaphone(s):
     return ''.join(result).upper()
 
 
+_metaphone_cached = functools.lru_cache(maxsize=_CACHE_SIZE)(_metaphone)
+
+
+def metaphone_encode_many(strings, cache=True):
+    """
+    Metaphone codes of many strings. Each distinct string is only encoded once.
+
+    Args:
+        strings (list): Sequences.
+        cache (bool, optional): If True, encodings are kept in a bounded LRU cache. Defaults to True.
+
+    Returns:
+        list: Coded sequences.
+    """
+    codes = {s: metaphone(s, cache) for s in set(strings)}
+    return [codes[s] for s in strings]
+
+
 def metaphone_similarity(s1, s2):
     """
     metaphone(s1) == metaphone(s2)
@@ -1,3 +1,5 @@
+import numpy as np
+
 import rltk.utils as utils
 
 
@@ -27,22 +29,21 @@ def needleman_wunsch_score(s1, s2, match=2, mismatch=-1, gap=-0.5, score_table=N
     if n1 == 0 and n2 == 0:
         return 0
 
-    # construct matrix to get max score of all possible alignments
-    dp = [[0] * (n2 + 1) for _ in range(n1 + 1)]
-    for i in range(n1 + 1):
-        for j in range(n2 + 1):
-            if i == 0 and j == 0:  # [0,0]
-                continue
-            elif i == 0:  # most top row
-                dp[i][j] = gap + dp[i][j - 1]
-            elif j == 0:  # most left column
-                dp[i][j] = gap + dp[i - 1][j]
-            else:
-                dp[i][j] = max(dp[i][j - 1] + gap,
-                               dp[i - 1][j] + gap,
-                               dp[i - 1][j - 1] + _get_score(s1[i - 1], s2[j - 1], match, mismatch, score_table))
+    # max score of all possible alignments, only two rows of the matrix are kept
+    prev, curr = utils.scratch_rows('needleman_wunsch', 2, n2 + 1)
+    prev[0] = 0
+    for j in range(1, n2 + 1):  # most top row
+        prev[j] = gap + prev[j - 1]
+    for i in range(1, n1 + 1):
+        c1 = s1[i - 1]
+        curr[0] = gap + prev[0]  # most left column
+        for j in range(1, n2 + 1):
+            curr[j] = max(curr[j - 1] + gap,
+                          prev[j] + gap,
+                          prev[j - 1] + _get_score(c1, s2[j - 1], match, mismatch, score_table))
+        prev, curr = curr, prev
 
-    return dp[n1][n2]
+    return prev[n2]
 
 
 def needleman_wunsch_similarity(s1, s2, match=2, mismatch=-1, gap=-0.5, score_table=None):
@@ -73,3 +74,83 @@ def needleman_wunsch_similarity(s1, s2, match=2, mismatch=-1, gap=-0.5, score_ta
         raise ValueError('Illegal value of score_table')
 
     return float(nm) / max_score
+
+
+def needleman_wunsch_score_batch(s, candidates, match=2, mismatch=-1, gap=-0.5, score_table=None):
+    """
+    :meth:`needleman_wunsch_score` between one sequence and many candidates in a single vectorized call.
+
+    Args:
+        s (str): Sequence.
+        candidates (list or numpy.ndarray): Candidate sequences.
+        match (int, optional): Score of match.
+        mismatch (int, optional): Score of mismatch.
+        gap (int, optional): Gap penalty.
+        score_table (dict): Alignment score matrix. Default to None.
+
+    Returns:
+        numpy.ndarray: Needleman Wunsch scores (float), one for each candidate.
+    """
+    utils.check_for_none(s, candidates)
+    utils.check_for_type(str, s)
+    candidates = list(candidates)
+    utils.check_for_type(str, *candidates)
+
+    score_table = score_table if isinstance(score_table, dict) else {}
+
+    codes, lengths = utils.strings_to_code_matrix(candidates)
+    n, width = codes.shape
+    gaps = gap * np.arange(width + 1)
+
+    # one row of the matrix for all candidates at a time
+    prev = np.tile(gaps, (n, 1))
+    for i, c1 in enumerate(s):
+        scores = np.where(codes == ord(c1), float(match), float(mismatch))
+        for c2, score in score_table.get(c1, {}).items():
+            if len(c2) == 1:
+                scores[codes == ord(c2)] = score
+        best = np.maximum(prev[:, :-1] + scores, prev[:, 1:] + gap)
+        # curr[j] = max(best[j], curr[j - 1] + gap), which is solved as a running maximum
+        curr = np.empty_like(prev)
+        curr[:, 0] = (i + 1) * gap
+        curr[:, 1:] = best - gaps[1:]
+        prev = np.maximum.accumulate(curr, axis=1) + gaps
+
+    return prev[np.arange(n), lengths]
+
+
+def needleman_wunsch_similarity_batch(s, candidates, match=2, mismatch=-1, gap=-0.5, score_table=None):
+    """
+    :meth:`needleman_wunsch_similarity` between one sequence and many candidates.
+
+    Args:
+        s (str): Sequence.
+        candidates (list or numpy.ndarray): Candidate sequences.
+        match (int, optional): Score of match.
+        mismatch (int, optional): Score of mismatch.
+        gap (int, optional): Gap penalty.
+        score_table (dict): Alignment score matrix. Default to None.
+
+    Returns:
+        numpy.ndarray: Needleman Wunsch similarities (float), one for each candidate.
+    """
+    candidates = list(candidates)
+    nm = needleman_wunsch_score_batch(s, candidates, match, mismatch, gap, score_table)
+    score_table = score_table if isinstance(score_table, dict) else {}
+
+    # score of aligning each sequence to itself
+    codes, lengths = utils.strings_to_code_matrix(candidates)
+    valid = np.arange(codes.shape[1]) < lengths[:, None]
+    self_scores = np.where(valid, float(match), 0.0)
+    for c, scores in score_table.items():
+        if len(c) == 1 and c in scores:
+            self_scores[valid & (codes == ord(c))] = scores[c]
+    score_s = sum([_get_score(c, c, match, mismatch, score_table) for c in s])
+    max_score = np.maximum(self_scores.sum(axis=1), score_s)
+
+    if np.any(max_score < nm):
+        raise ValueError('Illegal value of score_table')
+    if np.any(max_score == 0):
+        raise ZeroDivisionError('float division by zero')
+
+    return nm / max_score
@@ -1,30 +1,47 @@
+import functools
+
 import rltk.utils as utils
 
+_CACHE_SIZE = 65536
+
+# (prefix, replacement) and (suffix, replacement), the first matched one is applied
+_PREFIXES = (('MAC', 'MCC'), ('KN', 'N'), ('K', 'C'), ('PH', 'FF'), ('PF', 'FF'), ('SCH', 'SSS'))
+_SUFFIXES = (('IE', 'Y'), ('EE', 'Y'), ('DT', 'D'), ('RT', 'D'), ('RD', 'D'), ('NT', 'D'), ('ND', 'D'))
+_PREFIX_KEYS = tuple(prefix for prefix, _ in _PREFIXES)
+_SUFFIX_KEYS = tuple(suffix for suffix, _ in _SUFFIXES)
+# characters translated regardless of their neighbours ('EV' is handled before)
+_SIMPLE_CODES = {'A': 'A', 'E': 'A', 'I': 'A', 'O': 'A', 'U': 'A', 'Q': 'G', 'Z': 'S', 'M': 'N'}
+_VOWELS = 'AEIOU'
+
 
-def nysiis(s):
+def nysiis(s, cache=True):
     """
     New York State Immunization Information System (NYSIIS) Phonetic Code is a phonetic algorithm created by `The New York State Department of Health's (NYSDOH) Bureau of Immunization
     <https://www.health.ny.gov/prevention/immunization/information_system/>`_.
 
     Args:
-        s1 (str): Sequence 1.
-        s2 (str): Sequence 2.
+        s (str): Sequence.
+        cache (bool, optional): If True, encodings are kept in a bounded LRU cache. Defaults to True.
 
     Returns:
-        int: 1 for same NYSIIS code, 0 for different.
+        str: Coded sequence.
 
     Examples:
         >>> rltk.nysiis_similarity('ashcraft', 'pineapple')
         0
     """
+    utils.check_for_none(s)
+    utils.check_for_type(str, s)
+
+    return _nysiis_cached(s) if cache else _nysiis(s)
+
+
+def _nysiis(s):
     # code from https://github.com/jamesturk/jellyfish
     # Copyright (c) 2015, James Turk
     # Copyright (c) 2015, Sunlight Foundation
     # All rights reserved.
 
-    utils.check_for_none(s)
-    utils.check_for_type(str, s)
-
     s = utils.unicode_normalize(s)
 
     if len(s) == 0:
@@ -34,22 +51,18 @@ def nysiis(s):
     key = []
 
     # step 1 - prefixes
-    if s.startswith('MAC'):
-        s = 'MCC' + s[3:]
-    elif s.startswith('KN'):
-        s = s[1:]
-    elif s.startswith('K'):
-        s = 'C' + s[1:]
-    elif s.startswith(('PH', 'PF')):
-        s = 'FF' + s[2:]
-    elif s.startswith('SCH'):
-        s = 'SSS' + s[3:]
+    if s.startswith(_PREFIX_KEYS):
+        for prefix, replacement in _PREFIXES:
+            if s.startswith(prefix):
+                s = replacement + s[len(prefix):]
+                break
 
     # step 2 - suffixes
-    if s.endswith(('IE', 'EE')):
-        s = s[:-2] + 'Y'
-    elif s.endswith(('DT', 'RT', 'RD', 'NT', 'ND')):
-        s = s[:-2] + 'D'
+    if s.endswith(_SUFFIX_KEYS):
+        for suffix, replacement in _SUFFIXES:
+            if s.endswith(suffix):
+                s = s[:-len(suffix)] + replacement
+                break
 
     # step 3 - first character of key comes from name
     key.append(s[0])
@@ -59,34 +72,29 @@ def nysiis(s):
     len_s = len(s)
     while i < len_s:
         ch = s[i]
+        code = _SIMPLE_CODES.get(ch)
         if ch == 'E' and i + 1 < len_s and s[i + 1] == 'V':
             ch = 'AF'
             i += 1
-        elif ch in 'AEIOU':
-            ch = 'A'
-        elif ch == 'Q':
-            ch = 'G'
-        elif ch == 'Z':
-            ch = 'S'
-        elif ch == 'M':
-            ch = 'N'
+        elif code is not None:
+            ch = code
         elif ch == 'K':
-            if i + 1 < len(s) and s[i + 1] == 'N':
+            if i + 1 < len_s and s[i + 1] == 'N':
                 ch = 'N'
             else:
                 ch = 'C'
         elif ch == 'S' and s[i + 1:i + 3] == 'CH':
             ch = 'SS'
             i += 2
-        elif ch == 'P' and i + 1 < len(s) and s[i + 1] == 'H':
+        elif ch == 'P' and i + 1 < len_s and s[i + 1] == 'H':
             ch = 'F'
             i += 1
-        elif ch == 'H' and (s[i - 1] not in 'AEIOU' or (i + 1 < len(s) and s[i + 1] not in 'AEIOU')):
-            if s[i - 1] in 'AEIOU':
+        elif ch == 'H' and (s[i - 1] not in _VOWELS or (i + 1 < len_s and s[i + 1] not in _VOWELS)):
+            if s[i - 1] in _VOWELS:
                 ch = 'A'
             else:
                 ch = s[i - 1]
-        elif ch == 'W' and s[i - 1] in 'AEIOU':
+        elif ch == 'W' and s[i - 1] in _VOWELS:
             ch = s[i - 1]
 
         if ch[-1] != key[-1][-1]:
@@ -113,6 +121,24 @@ def nysiis(s):
     return key
 
 
+_nysiis_cached = functools.lru_cache(maxsize=_CACHE_SIZE)(_nysiis)
+
+
+def nysiis_encode_many(strings, cache=True):
+    """
+    NYSIIS codes of many strings. Each distinct string is only encoded once.
+
+    Args:
+        strings (list): Sequences.
+        cache (bool, optional): If True, encodings are kept in a bounded LRU cache. Defaults to True.
+
+    Returns:
+        list: Coded sequences.
+    """
+    codes = {s: nysiis(s, cache) for s in set(strings)}
+    return [codes[s] for s in strings]
+
+
 def nysiis_similarity(s1, s2):
     """
     nysiis(s1) == nysiis(s2)
@@ -1,22 +1,92 @@
+import collections
+
 import rltk.utils as utils
 
 
 def get_ngrams(s, n):
-    all_ngrams = list()
-    for i in range(len(s) - 1):
-        if i + n <= len(s):
-            all_ngrams.append(s[i:i + n])
+    return set(s[i:i + n] for i in range(len(s) - n + 1))
+
+
+def qgram_profile(s, n=2):
+    """
+    Q-Gram profile of a string, which is the count of each q-gram (n-gram) in it.
+    It can be computed once per record (e.g., in a :meth:`rltk.record.cached_property`)
+    and compared by :meth:`qgram_profile_distance` or :meth:`qgram_profile_similarity`.
+
+    Args:
+        s (str): Sequence.
+        n (int, optional): Length of gram. Defaults to 2.
+
+    Returns:
+        collections.Counter: Q-Gram profile, format in ``{gram: count, ...}``.
+
+    Examples:
+        >>> rltk.qgram_profile('abab')
+        Counter({'ab': 2, 'ba': 1})
+    """
+    utils.check_for_none(s)
+    utils.check_for_type(str, s)
+
+    return collections.Counter(s[i:i + n] for i in range(len(s) - n + 1))
+
+
+def qgram_profile_distance(profile0, profile1):
+    """
+    QGram Distance between two Q-Gram profiles. The cost is linear in the size of profiles.
+
+    Args:
+        profile0 (dict): Q-Gram profile 0, see :meth:`qgram_profile`.
+        profile1 (dict): Q-Gram profile 1.
+
+    Returns:
+        int: QGram Distance.
+
+    Examples::
+
+        class Person(rltk.Record):
+            @rltk.cached_property
+            def name_profile(self):
+                return rltk.qgram_profile(self.raw_object['name'])
+
+        rltk.qgram_profile_distance(r1.name_profile, r2.name_profile)
+    """
+    utils.check_for_none(profile0, profile1)
+    utils.check_for_type(dict, profile0, profile1)
+
+    if len(profile0) > len(profile1):
+        profile0, profile1 = profile1, profile0
+    common = sum(min(c, profile1[g]) for g, c in profile0.items() if g in profile1)
+    return sum(profile0.values()) + sum(profile1.values()) - 2 * common
+
+
+def qgram_profile_similarity(profile0, profile1):
+    """
+    QGram Similarity between two Q-Gram profiles. The cost is linear in the size of the smaller profile.
 
-    return set(all_ngrams)
+    Args:
+        profile0 (dict): Q-Gram profile 0, see :meth:`qgram_profile`.
+        profile1 (dict): Q-Gram profile 1.
+
+    Returns:
+        int: QGram Similarity.
+    """
+    utils.check_for_none(profile0, profile1)
+    utils.check_for_type(dict, profile0, profile1)
+
+    if len(profile0) > len(profile1):
+        profile0, profile1 = profile1, profile0
+    return sum(min(c, profile1[g]) for g, c in profile0.items() if g in profile1)
 
 
 def qgram_distance(s0, s1, n=2):
     """
-    QGram Distance is the number of distinct q-grams (n-grams) between 2 strings
+    QGram Distance is the number of q-grams (n-grams) which are not shared by 2 strings, \
+    each q-gram is counted as many times as it occurs (Ukkonen).
 
     Args:
         s1 (str): Sequence 1.
         s2 (str): Sequence 2.
+        n (int, optional): Length of gram. Defaults to 2.
 
     Returns:
         float: QGram Distance.
@@ -28,23 +98,18 @@ def qgram_distance(s0, s1, n=2):
     if n > max(len(s0), len(s1)):
         return 1
 
-    s0_ngrams = get_ngrams(s0, n)
-    s1_ngrams = get_ngrams(s1, n)
-    all_ngrams = list(s0_ngrams | s1_ngrams)
-
-    v0 = [1 if all_ngrams[i] in s0 else 0 for i in range(len(all_ngrams))]
-    v1 = [1 if all_ngrams[i] in s1 else 0 for i in range(len(all_ngrams))]
-
-    return sum([1 if v0[i] != v1[i] else 0 for i in range(len(v0))])
+    return qgram_profile_distance(qgram_profile(s0, n), qgram_profile(s1, n))
 
 
 def qgram_similarity(s0, s1, n=2):
     """
-    QGram Similarity is the number of common q-grams (n-grams) between 2 strings
+    QGram Similarity is the number of common q-grams (n-grams) between 2 strings, \
+    each q-gram is counted as many times as it occurs in both.
 
     Args:
         s1 (str): Sequence 1.
         s2 (str): Sequence 2.
+        n (int, optional): Length of gram. Defaults to 2.
 
     Returns:
         float: QGram Similarity.
@@ -57,11 +122,4 @@ def qgram_similarity(s0, s1, n=2):
     if n > max(len(s0), len(s1)):
         return 0
 
-    s0_ngrams = get_ngrams(s0, n)
-    s1_ngrams = get_ngrams(s1, n)
-    all_ngrams = list(s0_ngrams | s1_ngrams)
-
-    v0 = [1 if all_ngrams[i] in s0 else 0 for i in range(len(all_ngrams))]
-    v1 = [1 if all_ngrams[i] in s1 else 0 for i in range(len(all_ngrams))]
-
-    return sum([1 if v0[i] == v1[i] else 0 for i in range(len(v0))])
+    return qgram_profile_similarity(qgram_profile(s0, n), qgram_profile(s1, n))
@@ -0,0 +1,220 @@
+import collections
+import math
+
+import numpy as np
+
+import rltk.utils as utils
+from rltk.similarity.jaro import jaro_winkler_similarity
+from rltk.similarity.tf_idf import TF_IDF, compute_tf
+
+
+def _normalized_tf_idf(bag, df_corpus, doc_size, math_log):
+    weights = {}
+    for k, v in compute_tf(bag).items():
+        if k not in df_corpus:
+            continue
+        idf = doc_size * 1.0 / df_corpus[k]
+        weights[k] = v * (math.log(idf) if math_log else idf)
+    norm = math.sqrt(sum(v * v for v in weights.values()))
+    if norm == 0:
+        return {}
+    return {k: v / norm for k, v in weights.items()}
+
+
+def soft_tf_idf_similarity(bag1, bag2, df_corpus, doc_size, math_log=False,
+                           threshold=0.9, function=jaro_winkler_similarity, parameters=None):
+    """
+    Soft TF/IDF (Cohen et al.) is TF/IDF cosine similarity in which a term of bag1 also matches \
+    its most similar term in bag2, if the secondary similarity of them is not less than threshold. \
+    The contribution is weighted by the secondary similarity.
+
+    Note:
+        If you will call this function many times, :meth:`Soft_TF_IDF` is more efficient.
+
+    Args:
+        bag1 (list): Bag 1.
+        bag2 (list): Bag 2.
+        df_corpus (dict): The pre calculated document frequency of corpus.
+        doc_size (int): total documents used in corpus.
+        math_log (bool, optional): Flag to indicate whether math.log() should be used in TF and IDF formulas. \
+            Defaults to False.
+        threshold (float, optional): The threshold of secondary similarity. Defaults to 0.9.
+        function (function, optional): The reference of secondary similarity function. \
+            Defaults to `jaro_winkler_similarity`.
+        parameters (dict, optional): Other parameters of function. Defaults to None.
+
+    Returns:
+        float: Soft TF/IDF similarity.
+
+    Examples:
+        >>> rltk.soft_tf_idf_similarity(['paul', 'johnson'], ['johson', 'paule'], {'paul': 1, 'johnson': 1, 'johson': 1, 'paule': 1}, 2)
+        0.943888888889
+    """
+    utils.check_for_none(bag1, bag2, df_corpus)
+    utils.check_for_type(list, bag1, bag2)
+
+    parameters = parameters if isinstance(parameters, dict) else {}
+    v_x = _normalized_tf_idf(bag1, df_corpus, doc_size, math_log)
+    v_y = _normalized_tf_idf(bag2, df_corpus, doc_size, math_log)
+
+    score = 0.0
+    for w, weight in v_x.items():
+        best = None  # (secondary similarity, weight of term in bag2)
+        for v, v_weight in v_y.items():
+            sim = function(w, v, **parameters)
+            if sim >= threshold and (best is None or (sim, v_weight) > best):
+                best = (sim, v_weight)
+        if best:
+            score += weight * best[1] * best[0]
+    return score
+
+
+class Soft_TF_IDF(TF_IDF):
+    """
+    Soft TF/IDF helper class, see :meth:`soft_tf_idf_similarity`.
+
+    It uses the corpus weights of :meth:`TF_IDF`. When pre-computing, the close terms (neighbours) of each term \
+    in vocabulary are computed once and cached, so comparisons only look up the cached neighbours. \
+    Pairs of terms are filtered by the upper bound of the secondary function if it has one \
+    (see :meth:`similarity_upper_bound`). If the bound only depends on lengths (e.g., the bound of \
+    `jaro_winkler_similarity`), terms are grouped by length and the whole groups out of the length window \
+    are skipped. Jaro and Jaro Winkler are also bounded by the number of characters two terms have in common, \
+    which is computed for a whole group at once. Every other pair is verified, \
+    so the neighbours are the same as the ones of all-pairs comparison.
+
+    Note:
+        Only :meth:`similarity` is soft, other methods inherited from :meth:`TF_IDF` use TF/IDF cosine similarity.
+
+    Args:
+        threshold (float, optional): The threshold of secondary similarity. Defaults to 0.9.
+        function (function, optional): The reference of secondary similarity function. \
+            Defaults to `jaro_winkler_similarity`.
+        parameters (dict, optional): Other parameters of function. Defaults to None.
+
+    Examples::
+
+        tfidf = Soft_TF_IDF(threshold=0.9)
+        tfidf.add_document('id1', ['paul', 'johnson'])
+        tfidf.add_document('id2', ['johson', 'paule'])
+        tfidf.pre_compute()
+        tfidf.similarity('id1', 'id2')
+    """
+
+    def __init__(self, threshold=0.9, function=jaro_winkler_similarity, parameters=None):
+        super(Soft_TF_IDF, self).__init__()
+        self._threshold = threshold
+        self._function = function
+        self._parameters = parameters if isinstance(parameters, dict) else {}
+        self._terms = []
+        self._neighbours = {}  # term -> {close term: secondary similarity}
+
+    def pre_compute(self, math_log: bool = False):
+        """
+        Pre-compute IDF score, the normalized TF/IDF matrix and neighbours of new terms.
+
+        Args:
+            math_log (bool, optional): Flag to indicate whether math.log() should be used in TF and IDF formulas. \
+                Defaults to False.
+        """
+        super(Soft_TF_IDF, self).pre_compute(math_log)
+        self._terms = list(self._vocabulary)
+        self._update_neighbours()
+
+    def _update_neighbours(self):
+        for term in [t for t in self._neighbours if t not in self._vocabulary]:
+            del self._neighbours[term]
+        new_terms = [t for t in self._terms if t not in self._neighbours]
+        if not new_terms:
+            return
+
+        upper_bound = getattr(self._function, 'upper_bound', None)
+        length_only = getattr(upper_bound, 'length_only', False)
+        character_bound = getattr(self._function, 'character_upper_bound', None)
+
+        def possible(t1, t2):
+            return not upper_bound or upper_bound(t1, t2, **self._parameters) >= self._threshold
+
+        def score(t1, t2):
+            sim = self._function(t1, t2, **self._parameters)
+            return sim if sim >= self._threshold else None
+
+        # length-only bounds may use the lengths of lowercase forms (e.g., jaro)
+        lowered = [t.lower() for t in self._terms]
+        groups = collections.defaultdict(list)  # lengths -> [term index]
+        for idx, term in enumerate(self._terms):
+            groups[(len(term), len(lowered[idx]))].append(idx)
+        groups = {key: np.array(rows, dtype=np.int64) for key, rows in groups.items()}
+
+        if character_bound:
+            alphabet = {c: i for i, c in enumerate(set(''.join(lowered)))}
+            counts = np.zeros((len(lowered), len(alphabet)), dtype=np.int32)
+            for idx, term in enumerate(lowered):
+                for c, n in collections.Counter(term).items():
+                    counts[idx, alphabet[c]] = n
+            lengths = np.array([len(t) for t in lowered], dtype=np.int64)
+            wildcards = np.array(['*' in t for t in lowered], dtype=bool)
+
+        term_index = {term: idx for idx, term in enumerate(self._terms)}
+        is_new = set(new_terms)
+        for term in new_terms:
+            self._neighbours[term] = {}
+        for term in new_terms:
+            idx = term_index[term]
+            for rows in groups.values():
+                # a length-only bound is the same for all terms of a group
+                other = self._terms[rows[0]]
+                forward = not length_only or possible(term, other)
+                backward = not length_only or possible(other, term)
+                if not forward and not backward:
+                    continue
+                if character_bound:
+                    common = np.minimum(counts[rows], counts[idx]).sum(axis=1)
+                    bound = character_bound(common, lengths[idx], lengths[rows], **self._parameters)
+                    keep = (bound >= self._threshold) | wildcards[rows] | wildcards[idx]
+                    rows = rows[keep]
+                for other in (self._terms[r] for r in rows.tolist()):
+                    if forward and (length_only or possible(term, other)):
+                        sim = score(term, other)
+                        if sim is not None:
+                            self._neighbours[term][other] = sim
+                    if backward and other not in is_new and (length_only or possible(other, term)):
+                        sim = score(other, term)
+                        if sim is not None:
+                            self._neighbours[other][term] = sim
+
+    def neighbours(self, term):
+        """
+        Close terms of a term in vocabulary.
+
+        Args:
+            term (str): Term.
+
+        Returns:
+            dict: ``{close term: secondary similarity}``.
+        """
+        self._get_matrix()
+        return {t: s for t, s in self._neighbours[term].items() if t in self._vocabulary}
+
+    def similarity(self, id1, id2):
+        """
+        Get Soft TF/IDF similarity
+
+        Args:
+            id1 (str): id 1
+            id2 (str): id2
+
+        Returns:
+            float:
+        """
+        v_x, v_y = self._row(id1), self._row(id2)
+        score = 0.0
+        for col, weight in v_x.items():
+            neighbours = self._neighbours[self._terms[col]]
+            best = None  # (secondary similarity, weight of term in id2)
+            for other_col, other_weight in v_y.items():
+                sim = neighbours.get(self._terms[other_col])
+                if sim is not None and (best is None or (sim, other_weight) > best):
+                    best = (sim, other_weight)
+            if best:
+                score += weight * best[1] * best[0]
+        return score
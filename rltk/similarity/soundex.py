@@ -1,12 +1,28 @@
+import functools
+
 import rltk.utils as utils
 
+_CODES = (
+    ('BFPV', '1'),
+    ('CGJKQSXZ', '2'),
+    ('DT', '3'),
+    ('L', '4'),
+    ('MN', '5'),
+    ('R', '6'),
+    ('AEIOUHWY', '.')  # placeholder
+)
+_CODE_DICT = dict((c, replace) for chars, replace in _CODES for c in chars)
+
+_CACHE_SIZE = 65536
+
 
-def soundex(s):
+def soundex(s, cache=True):
     """
     The standard used for this implementation is provided by `U.S. Census Bureau <https://www.archives.gov/research/census/soundex.html>`_.
 
     Args:
         s (str): Sequence.
+        cache (bool, optional): If True, encodings are kept in a bounded LRU cache. Defaults to True.
 
     Returns:
         str: Coded sequence.
@@ -21,38 +37,29 @@ def soundex(s):
     utils.check_for_none(s)
     utils.check_for_type(str, s)
 
+    return _soundex_cached(s) if cache else _soundex(s)
+
+
+def _soundex(s):
     s = utils.unicode_normalize(s)
 
     if len(s) == 0:
         raise ValueError('Empty string')
 
     s = s.upper()
-
-    CODES = (
-        ('BFPV', '1'),
-        ('CGJKQSXZ', '2'),
-        ('DT', '3'),
-        ('L', '4'),
-        ('MN', '5'),
-        ('R', '6'),
-        ('AEIOUHWY', '.')  # placeholder
-    )
-    CODE_DICT = dict((c, replace) for chars, replace in CODES for c in chars)
+    codes = [_CODE_DICT.get(c) for c in s]
 
     sdx = s[0]
     for i in range(1, len(s)):
-        if s[i] not in CODE_DICT:
-            continue
-
-        code = CODE_DICT[s[i]]
-        if code == '.':
+        code = codes[i]
+        if code is None or code == '.':
             continue
         if s[i] == s[i - 1]:  # ignore same letter
             continue
-        if s[i - 1] in CODE_DICT and CODE_DICT[s[i - 1]] == code:  # 'side-by-side' rule
+        if codes[i - 1] == code:  # 'side-by-side' rule
             continue
         if s[i - 1] in ('H', 'W') and i - 2 > 0 and \
-                        s[i - 2] in CODE_DICT and CODE_DICT[s[i - 2]] != '.':  # consonant separators
+                codes[i - 2] is not None and codes[i - 2] != '.':  # consonant separators
             continue
 
         sdx += code
@@ -62,6 +69,28 @@ def soundex(s):
     return sdx
 
 
+_soundex_cached = functools.lru_cache(maxsize=_CACHE_SIZE)(_soundex)
+
+
+def soundex_encode_many(strings, cache=True):
+    """
+    Soundex codes of many strings. Each distinct string is only encoded once.
+
+    Args:
+        strings (list): Sequences.
+        cache (bool, optional): If True, encodings are kept in a bounded LRU cache. Defaults to True.
+
+    Returns:
+        list: Coded sequences.
+
+    Examples:
+        >>> rltk.soundex_encode_many(['ashcraft', 'pineapple', 'ashcraft'])
+        ['A261', 'P514', 'A261']
+    """
+    codes = {s: soundex(s, cache) for s in set(strings)}
+    return [codes[s] for s in strings]
+
+
 def soundex_similarity(s1, s2):
     """
     soundex(s1) == soundex(s2)
@@ -1,5 +1,13 @@
 import collections
+import collections.abc
+import json
 import math
+import numbers
+import os
+
+import numpy as np
+from scipy import sparse
+from scipy.sparse import csr_matrix
 
 import rltk.utils as utils
 
@@ -117,9 +125,92 @@ def tf_idf_cosine_similarity(tfidf_dict1, tfidf_dict2):
     return 0.0 if v_x_y == 0 else v_x_y / (math.sqrt(v_x_2) * math.sqrt(v_y_2))
 
 
+# rows of normalized matrix kept as dicts for pairwise similarity
+_ROW_CACHE_SIZE = 65536
+
+
+def _encode_keys(keys):
+    """
+    Arrays of ids or terms: strings are concatenated into one UTF-8 buffer with an offsets array, \
+    integers are stored as they are.
+
+    Returns:
+        tuple: Format ('str' or 'int') and dict of array name suffix -> array.
+    """
+    if all(isinstance(k, str) for k in keys):
+        encoded = [k.encode('utf-8') for k in keys]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        return 'str', {'': np.frombuffer(b''.join(encoded), dtype=np.uint8), '_offsets': offsets}
+    if all(isinstance(k, numbers.Integral) and not isinstance(k, bool) for k in keys):
+        return 'int', {'': np.array(keys, dtype=np.int64)}
+    raise ValueError('Only str or int document ids and tokens can be saved')
+
+
+def _decode_keys(format_, load_array, name):
+    if format_ == 'int':
+        return load_array(name).tolist()
+    buffer = load_array(name).tobytes()
+    offsets = load_array(name + '_offsets').tolist()
+    return [buffer[start:end].decode('utf-8') for start, end in zip(offsets, offsets[1:])]
+
+
+class _TermFrequency(collections.abc.MutableMapping):
+    """
+    ``{doc_id: {term: tf}}`` view over the (memory-mapped) postings of a saved corpus. \
+    Documents added or removed after loading are kept in memory.
+    """
+
+    def __init__(self, doc_ids, terms, indptr, indices, data):
+        self.doc_ids = doc_ids
+        self.terms = terms
+        self.matrix = csr_matrix((data, indices, indptr), shape=(len(doc_ids), len(terms)))
+        self.index = {doc_id: idx for idx, doc_id in enumerate(doc_ids)}
+        self.changed = {}  # doc_id -> tf, None if removed
+
+    def __getitem__(self, doc_id):
+        if doc_id in self.changed:
+            tf = self.changed[doc_id]
+            if tf is None:
+                raise KeyError(doc_id)
+            return tf
+        row = self.index[doc_id]
+        start, end = self.matrix.indptr[row], self.matrix.indptr[row + 1]
+        return {self.terms[k]: v for k, v in
+                zip(self.matrix.indices[start:end].tolist(), self.matrix.data[start:end].tolist())}
+
+    def __setitem__(self, doc_id, tf):
+        self.changed[doc_id] = tf
+
+    def __delitem__(self, doc_id):
+        self[doc_id]
+        self.changed[doc_id] = None
+
+    def __iter__(self):
+        for doc_id in self.doc_ids:
+            if doc_id not in self.changed:
+                yield doc_id
+        for doc_id, tf in list(self.changed.items()):
+            if tf is not None:
+                yield doc_id
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def unchanged_rows(self):
+        keep = np.fromiter((doc_id not in self.changed for doc_id in self.doc_ids),
+                           dtype=bool, count=len(self.doc_ids))
+        return [doc_id for doc_id, k in zip(self.doc_ids, keep) if k], self.matrix[keep]
+
+
 class TF_IDF():
     """
     TF/IDF helper class (An efficient implementation)
+
+    :meth:`pre_compute` builds a L2-normalized sparse TF/IDF matrix (one row per document), \
+    so that similarity is a sparse dot product. Documents can be added or removed afterwards, \
+    the IDF and the matrix are re-computed lazily when they are needed. \
+    Corpus statistics can be saved by :meth:`save` and loaded (memory-mapped) by :meth:`load`.
     
     Examples::
     
@@ -134,6 +225,15 @@ class TF_IDF():
         # get similarity
         tfidf.similarity('id1', 'id2')
         tfidf.similarity('id1', 'id3')
+        tfidf.similarity_many('id1', ['id2', 'id3'])
+        # all pairs above threshold, or k most similar ones of each document
+        list(tfidf.similarity_join(threshold=0.5))
+        list(tfidf.top_k(k=1))
+        # score a new document against the corpus
+        tfidf.query(['b', 'c', 'e'], k=2)
+        # persist
+        tfidf.save('corpus_dir')
+        tfidf = TF_IDF.load('corpus_dir')
     """
 
     def __init__(self):
@@ -141,29 +241,109 @@ class TF_IDF():
         self.df_corpus = {}
         self.doc_size = 0
         self.idf = 0
+        self._math_log = None
+        self._doc_ids = []
+        self._doc_index = {}
+        self._vocabulary = {}
+        self._matrix = None
+        self._row_cache = {}
 
     def add_document(self, doc_id: str, tokens: list):
         """
-        Add document to corpus
+        Add document to corpus. If the id exists, the document is replaced.
         
         Args:
             doc_id (str): Document (record) id.
             tokens (list): List of token string.
         """
+        if doc_id in self.tf:
+            self.remove_document(doc_id)
         self.doc_size += 1
         tf = compute_tf(tokens)
         self.tf[doc_id] = tf
         for k, _ in tf.items():
             self.df_corpus[k] = self.df_corpus.get(k, 0) + 1
+        self._matrix = None
+
+    def remove_document(self, doc_id: str):
+        """
+        Remove document from corpus.
+
+        Args:
+            doc_id (str): Document (record) id.
+        """
+        tf = self.tf[doc_id]
+        del self.tf[doc_id]
+        self.doc_size -= 1
+        for k in tf:
+            self.df_corpus[k] -= 1
+            if self.df_corpus[k] == 0:
+                del self.df_corpus[k]
+        self._matrix = None
+
+    def _tf_matrix(self, vocabulary):
+        """
+        Document ids and the sparse TF matrix with columns in vocabulary.
+        """
+        doc_ids, blocks = [], []
+        docs = self.tf
+        if isinstance(self.tf, _TermFrequency):
+            doc_ids, matrix = self.tf.unchanged_rows()
+            mapping = np.array([vocabulary.get(t, -1) for t in self.tf.terms], dtype=np.int64)
+            matrix = csr_matrix((matrix.data, mapping[matrix.indices], matrix.indptr),
+                                shape=(matrix.shape[0], len(vocabulary)))
+            blocks.append(matrix)
+            docs = {doc_id: tf for doc_id, tf in self.tf.changed.items() if tf is not None}
+
+        indptr, indices, data = [0], [], []
+        for doc_id, tf in docs.items():
+            doc_ids.append(doc_id)
+            indices.extend(vocabulary[k] for k in tf)
+            data.extend(tf.values())
+            indptr.append(len(indices))
+        blocks.append(csr_matrix((np.array(data, dtype=np.float64), np.array(indices, dtype=np.int64), indptr),
+                                 shape=(len(indptr) - 1, len(vocabulary))))
+        return doc_ids, sparse.vstack(blocks, format='csr') if len(blocks) > 1 else blocks[0]
 
     def pre_compute(self, math_log: bool = False):
         """
-        Pre-compute IDF score
+        Pre-compute IDF score and the normalized TF/IDF matrix.
         
         Args:
             math_log (bool, optional): Flag to indicate whether math.log() should be used in TF and IDF formulas. Defaults to False.
         """
+        self._math_log = math_log
         self.idf = compute_idf(self.df_corpus, self.doc_size, math_log)
+        self._vocabulary = {term: idx for idx, term in enumerate(self.df_corpus)}
+        self._doc_ids, matrix = self._tf_matrix(self._vocabulary)
+        self._doc_index = {doc_id: idx for idx, doc_id in enumerate(self._doc_ids)}
+
+        idf = np.array([self.idf[term] for term in self._vocabulary], dtype=np.float64)
+        matrix.data = matrix.data * idf[matrix.indices]
+        norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+        norms[norms == 0] = 1.0
+        matrix.data /= np.repeat(norms, np.diff(matrix.indptr))
+        self._matrix = matrix
+        self._row_cache = {}
+
+    def _get_matrix(self):
+        if self._matrix is None:
+            if self._math_log is None:
+                raise ValueError('pre_compute() should be called after adding documents')
+            self.pre_compute(self._math_log)
+        return self._matrix
+
+    def _row(self, doc_id):
+        matrix = self._get_matrix()
+        if doc_id in self._row_cache:
+            return self._row_cache[doc_id]
+        if len(self._row_cache) >= _ROW_CACHE_SIZE:
+            self._row_cache.clear()
+        row = self._doc_index[doc_id]
+        start, end = matrix.indptr[row], matrix.indptr[row + 1]
+        v = dict(zip(matrix.indices[start:end].tolist(), matrix.data[start:end].tolist()))
+        self._row_cache[doc_id] = v
+        return v
 
     def similarity(self, id1, id2):
         """
@@ -176,8 +356,202 @@ class TF_IDF():
         Returns:
             float:
         """
-        tf_x = self.tf[id1]
-        tfidf_x = {k: v * self.idf[k] for k, v in tf_x.items()}
-        tf_y = self.tf[id2]
-        tfidf_y = {k: v * self.idf[k] for k, v in tf_y.items()}
-        return tf_idf_cosine_similarity(tfidf_x, tfidf_y)
+        v_x, v_y = self._row(id1), self._row(id2)
+        if len(v_x) > len(v_y):
+            v_x, v_y = v_y, v_x
+        return float(sum(v * v_y[k] for k, v in v_x.items() if k in v_y))
+
+    def similarity_many(self, id1, ids):
+        """
+        Get similarities of one document against many documents (e.g., a block) at once.
+
+        Args:
+            id1 (str): id 1
+            ids (list): List of ids to compare with.
+
+        Returns:
+            numpy.ndarray: Similarities in the same order as `ids`.
+        """
+        matrix = self._get_matrix()
+        rows = matrix[[self._doc_index[i] for i in ids]]
+        v_x = matrix[self._doc_index[id1]]
+        return np.asarray(rows.dot(v_x.T).todense()).ravel()
+
+    def query(self, tokens: list, k: int = None, threshold: float = 0.0):
+        """
+        Score a new document against the corpus, the corpus is not changed. \
+        Tokens which are not in the corpus are ignored.
+
+        Args:
+            tokens (list): List of token string.
+            k (int, optional): Only return the k most similar documents. Defaults to None (all).
+            threshold (float, optional): Minimum similarity. \
+                Documents with zero similarity are never returned. Defaults to 0.0.
+
+        Returns:
+            list: List of (id, similarity) in descending similarity.
+        """
+        matrix = self._get_matrix()
+        tf = compute_tf(tokens) if tokens else {}
+        terms = [t for t in tf if t in self._vocabulary]
+        weights = np.array([tf[t] * self.idf[t] for t in terms], dtype=np.float64)
+        norm = np.sqrt(np.dot(weights, weights))
+        if norm == 0:
+            return []
+        vector = csr_matrix((weights / norm, ([self._vocabulary[t] for t in terms], [0] * len(terms))),
+                            shape=(len(self._vocabulary), 1))
+        scores = matrix.dot(vector).tocoo()
+        mask = (scores.data >= threshold) & (scores.data > 0)
+        rows, data = scores.row[mask], scores.data[mask]
+        order = np.argsort(-data, kind='stable')[:k]
+        return [(self._doc_ids[rows[i]], float(data[i])) for i in order]
+
+    def save(self, path: str):
+        """
+        Save corpus statistics to a directory. Vocabulary, document ids and the TF postings (in CSR format) \
+        are stored as NumPy arrays (``.npy``), so that they can be memory-mapped by :meth:`load`. \
+        Strings are stored in one UTF-8 buffer with offsets.
+
+        Args:
+            path (str): Directory path, it will be created if it doesn't exist.
+
+        Raises:
+            ValueError: If document ids or tokens are neither all str nor all int.
+        """
+        vocabulary = {term: idx for idx, term in enumerate(self.df_corpus)}
+        doc_ids, matrix = self._tf_matrix(vocabulary)
+        vocabulary_format, vocabulary_arrays = _encode_keys(list(vocabulary))
+        doc_ids_format, doc_ids_arrays = _encode_keys(doc_ids)
+        if not os.path.exists(path):
+            os.makedirs(path)
+        arrays = {
+            'df': np.array(list(self.df_corpus.values()), dtype=np.int64),
+            'indptr': matrix.indptr.astype(np.int64),
+            'indices': matrix.indices.astype(np.int64),
+            'tf': matrix.data.astype(np.float64),
+        }
+        arrays.update({'vocabulary' + suffix: array for suffix, array in vocabulary_arrays.items()})
+        arrays.update({'doc_ids' + suffix: array for suffix, array in doc_ids_arrays.items()})
+        for name, array in arrays.items():
+            np.save(os.path.join(path, name + '.npy'), array)
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump({'doc_size': self.doc_size, 'math_log': self._math_log,
+                       'vocabulary_format': vocabulary_format, 'doc_ids_format': doc_ids_format}, f)
+
+    @classmethod
+    def load(cls, path: str, mmap_mode: str = 'r'):
+        """
+        Load corpus statistics saved by :meth:`save`. Documents can still be added or removed.
+
+        Args:
+            path (str): Directory path.
+            mmap_mode (str, optional): Memory-map mode of the postings, see :meth:`numpy.load`. \
+                None means reading them into memory. Defaults to 'r'.
+
+        Returns:
+            TF_IDF: Loaded instance. If it was pre-computed when saving, it is re-computed when needed.
+        """
+        def load_array(name, mode=None):
+            return np.load(os.path.join(path, name + '.npy'), mmap_mode=mode)
+
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        terms = _decode_keys(meta['vocabulary_format'], load_array, 'vocabulary')
+        doc_ids = _decode_keys(meta['doc_ids_format'], load_array, 'doc_ids')
+
+        tfidf = cls()
+        tfidf.doc_size = meta['doc_size']
+        tfidf._math_log = meta['math_log']
+        tfidf.df_corpus = dict(zip(terms, load_array('df').tolist()))
+        tfidf.tf = _TermFrequency(doc_ids, terms, load_array('indptr', mmap_mode),
+                                  load_array('indices', mmap_mode), load_array('tf', mmap_mode))
+        return tfidf
+
+    def _aligned_matrix(self, other):
+        """
+        Matrix of the other TF_IDF with columns in the vocabulary of this one, terms not in it are dropped.
+        """
+        if other is None or other is self:
+            return self._get_matrix()
+        other_matrix = other._get_matrix()
+        mapping = np.full(len(other._vocabulary), -1, dtype=np.int64)
+        for term, idx in other._vocabulary.items():
+            mapping[idx] = self._vocabulary.get(term, -1)
+        coo = other_matrix.tocoo()
+        cols = mapping[coo.col]
+        keep = cols >= 0
+        return csr_matrix((coo.data[keep], (coo.row[keep], cols[keep])),
+                          shape=(other_matrix.shape[0], len(self._vocabulary)))
+
+    def _chunked_products(self, other, chunk_size):
+        """
+        Yield (first row, similarity matrix of the chunk of rows against all rows of other).
+        """
+        matrix = self._get_matrix()
+        other_matrix_t = self._aligned_matrix(other).T.tocsr()
+        for start in range(0, matrix.shape[0], chunk_size):
+            product = matrix[start:start + chunk_size].dot(other_matrix_t).tocsr()
+            product.eliminate_zeros()
+            yield start, product
+
+    def similarity_join(self, other=None, threshold=0.5, chunk_size=1000):
+        """
+        Find all document pairs whose similarity is not less than threshold, \
+        without computing the pairs which share no term (pairs with zero similarity are never returned).
+
+        Args:
+            other (TF_IDF, optional): Documents to join with, each TF_IDF uses its own IDF. \
+                If it is None, pairs within this TF_IDF are returned (each pair once). Defaults to None.
+            threshold (float, optional): Minimum similarity. Defaults to 0.5.
+            chunk_size (int, optional): Number of rows multiplied at once, which bounds the memory. \
+                Defaults to 1000.
+
+        Returns:
+            iterator: Tuples of (id1, id2, similarity).
+        """
+        self_join = other is None or other is self
+        # matrices are re-computed lazily after documents are changed, which also rebinds the ids
+        self._get_matrix()
+        if not self_join:
+            other._get_matrix()
+        other_ids = self._doc_ids if self_join else other._doc_ids
+        for start, product in self._chunked_products(other, chunk_size):
+            product = product.tocoo()
+            rows = product.row + start
+            mask = product.data >= threshold
+            if self_join:
+                mask &= product.col > rows
+            for r, c, v in zip(rows[mask], product.col[mask], product.data[mask]):
+                yield self._doc_ids[r], other_ids[c], float(v)
+
+    def top_k(self, k, threshold=0.0, other=None, chunk_size=1000):
+        """
+        Find the k most similar documents of each document.
+
+        Args:
+            k (int): Number of similar documents to keep for each document.
+            threshold (float, optional): Minimum similarity. Pairs with zero similarity are never returned. \
+                Defaults to 0.0.
+            other (TF_IDF, optional): Documents to search in, each TF_IDF uses its own IDF. \
+                If it is None, it searches in this TF_IDF excluding the document itself. Defaults to None.
+            chunk_size (int, optional): Number of rows multiplied at once. Defaults to 1000.
+
+        Returns:
+            iterator: Tuples of (id1, id2, similarity), in descending similarity for each id1.
+        """
+        self_join = other is None or other is self
+        # matrices are re-computed lazily after documents are changed, which also rebinds the ids
+        self._get_matrix()
+        if not self_join:
+            other._get_matrix()
+        other_ids = self._doc_ids if self_join else other._doc_ids
+        for start, product in self._chunked_products(other, chunk_size):
+            for i in range(product.shape[0]):
+                begin, end = product.indptr[i], product.indptr[i + 1]
+                cols, data = product.indices[begin:end], product.data[begin:end]
+                mask = data >= threshold
+                if self_join:
+                    mask &= cols != start + i
+                cols, data = cols[mask], data[mask]
+                for idx in np.argsort(-data, kind='stable')[:k]:
+                    yield self._doc_ids[start + i], other_ids[cols[idx]], float(data[idx])
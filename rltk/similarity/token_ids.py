@@ -0,0 +1,187 @@
+import numpy as np
+
+import rltk.utils as utils
+
+
+class TokenInterner(object):
+    """
+    Map each token to an integer id, so that a token set can be stored as a sorted array of ids \
+    (4 bytes per token) instead of a set of strings, and compared by :meth:`sorted_jaccard_similarity`, \
+    :meth:`sorted_dice_similarity` or :meth:`sorted_overlap`.
+
+    Note:
+        For tiny sets, a single comparison of arrays is not faster than the one of Python sets, \
+        compare one record against many by the batch versions (e.g. :meth:`sorted_jaccard_similarity_batch`).
+
+    Examples::
+
+        interner = rltk.TokenInterner()
+
+        class Person(rltk.Record):
+            @rltk.cached_property
+            def name_ids(self):
+                return interner.intern(self.raw_object['name'].split(' '))
+
+        rltk.sorted_jaccard_similarity(r1.name_ids, r2.name_ids)
+    """
+
+    def __init__(self):
+        self._ids = {}
+        self._tokens = []
+
+    def __len__(self):
+        return len(self._tokens)
+
+    def token_id(self, token):
+        """
+        Args:
+            token (str): Token.
+
+        Returns:
+            int: Id of the token, a new id is assigned if it's not seen before.
+        """
+        id_ = self._ids.get(token)
+        if id_ is None:
+            id_ = self._ids[token] = len(self._tokens)
+            self._tokens.append(token)
+        return id_
+
+    def intern(self, tokens):
+        """
+        Args:
+            tokens (list): List (or set) of tokens.
+
+        Returns:
+            numpy.ndarray: Sorted and deduplicated token ids (uint32).
+        """
+        return np.unique(np.fromiter((self.token_id(t) for t in tokens), dtype=np.uint32, count=len(tokens)))
+
+    def tokens(self, ids):
+        """
+        Args:
+            ids (numpy.ndarray): Token ids.
+
+        Returns:
+            list: Tokens of the ids.
+        """
+        return [self._tokens[i] for i in ids]
+
+
+def _to_ids(ids):
+    utils.check_for_none(ids)
+    return np.asarray(ids, dtype=np.uint32)
+
+
+def sorted_overlap(ids1, ids2):
+    """
+    Size of the intersection of two sorted and deduplicated id arrays.
+
+    Args:
+        ids1 (numpy.ndarray): Sorted token ids, e.g., from :meth:`TokenInterner.intern`. \
+            `array.array('I')` is also accepted.
+        ids2 (numpy.ndarray): Sorted token ids.
+
+    Returns:
+        int: Overlap size.
+    """
+    ids1, ids2 = _to_ids(ids1), _to_ids(ids2)
+    if len(ids1) > len(ids2):
+        ids1, ids2 = ids2, ids1
+    if len(ids1) == 0:
+        return 0
+    pos = np.minimum(np.searchsorted(ids2, ids1), len(ids2) - 1)
+    return int(np.count_nonzero(ids2[pos] == ids1))
+
+
+def sorted_jaccard_similarity(ids1, ids2):
+    """
+    Same as :meth:`jaccard_index_similarity`, but on sorted id arrays.
+
+    Args:
+        ids1 (numpy.ndarray): Sorted token ids.
+        ids2 (numpy.ndarray): Sorted token ids.
+
+    Returns:
+        float: Jaccard Index similarity.
+    """
+    if len(ids1) == 0 or len(ids2) == 0:
+        return 0
+    inter_len = sorted_overlap(ids1, ids2)
+    return float(inter_len) / (len(ids1) + len(ids2) - inter_len)
+
+
+def sorted_dice_similarity(ids1, ids2):
+    """
+    Same as :meth:`dice_similarity`, but on sorted id arrays.
+
+    Args:
+        ids1 (numpy.ndarray): Sorted token ids.
+        ids2 (numpy.ndarray): Sorted token ids.
+
+    Returns:
+        float: Dice similarity.
+    """
+    if len(ids1) == 0 or len(ids2) == 0:
+        return 0
+    return 2.0 * sorted_overlap(ids1, ids2) / float(len(ids1) + len(ids2))
+
+
+def sorted_overlap_batch(ids, candidates):
+    """
+    Overlap sizes of one sorted id array against many, computed in one pass.
+
+    Args:
+        ids (numpy.ndarray): Sorted token ids.
+        candidates (list): List of sorted token id arrays.
+
+    Returns:
+        numpy.ndarray: Overlap sizes in the same order as `candidates`.
+    """
+    ids = _to_ids(ids)
+    lengths = np.fromiter((len(c) for c in candidates), dtype=np.int64, count=len(candidates))
+    if len(ids) == 0 or lengths.sum() == 0:
+        return np.zeros(len(candidates), dtype=np.int64)
+
+    flat = np.concatenate([_to_ids(c) for c in candidates])
+    pos = np.minimum(np.searchsorted(ids, flat), len(ids) - 1)
+    hits = np.concatenate(([0], np.cumsum(ids[pos] == flat)))
+    ends = np.cumsum(lengths)
+    return hits[ends] - hits[ends - lengths]
+
+
+def _sorted_batch_sizes(ids, candidates):
+    overlap = sorted_overlap_batch(ids, candidates)
+    lengths = np.fromiter((len(c) for c in candidates), dtype=np.int64, count=len(candidates))
+    return overlap, len(ids), lengths
+
+
+def sorted_jaccard_similarity_batch(ids, candidates):
+    """
+    Jaccard Index similarities of one sorted id array against many.
+
+    Args:
+        ids (numpy.ndarray): Sorted token ids.
+        candidates (list): List of sorted token id arrays.
+
+    Returns:
+        numpy.ndarray: Similarities in the same order as `candidates`.
+    """
+    overlap, length, lengths = _sorted_batch_sizes(ids, candidates)
+    union = np.maximum(length + lengths - overlap, 1)
+    return np.where((length == 0) | (lengths == 0), 0.0, overlap / union)
+
+
+def sorted_dice_similarity_batch(ids, candidates):
+    """
+    Dice similarities of one sorted id array against many.
+
+    Args:
+        ids (numpy.ndarray): Sorted token ids.
+        candidates (list): List of sorted token id arrays.
+
+    Returns:
+        numpy.ndarray: Similarities in the same order as `candidates`.
+    """
+    overlap, length, lengths = _sorted_batch_sizes(ids, candidates)
+    total = np.maximum(length + lengths, 1)
+    return np.where((length == 0) | (lengths == 0), 0.0, 2.0 * overlap / total)
@@ -1,14 +1,24 @@
 import pytest
 import random
 
+import numpy as np
+
 from rltk.record import Record
 from rltk.dataset import Dataset
 from rltk.io.reader.array_reader import ArrayReader
+from rltk.blocking.block import Block
+from rltk.blocking.compact_block import CompactBlock
 from rltk.blocking.block_black_list import BlockBlackList
+from rltk.blocking.meta_blocker import MetaBlocker
 from rltk.blocking.hash_block_generator import HashBlockGenerator
 from rltk.blocking.token_block_generator import TokenBlockGenerator
 from rltk.blocking.canopy_block_generator import CanopyBlockGenerator
 from rltk.blocking.sorted_neighbourhood_block_generator import SortedNeighbourhoodBlockGenerator
+from rltk.blocking.set_similarity_join_block_generator import SetSimilarityJoinBlockGenerator
+from rltk.blocking.edit_distance_join_block_generator import EditDistanceJoinBlockGenerator
+from rltk.similarity.jaccard import jaccard_index_similarity
+from rltk.similarity.distance import euclidean_distance
+from rltk.utils import candidate_pairs
 
 
 class ConcreteRecord(Record):
@@ -37,6 +47,186 @@ raw_data = [
 ds = Dataset(reader=ArrayReader(raw_data), record_class=ConcreteRecord)
 
 
+def test_block_unique_pairs():
+    block = Block()
+    for block_id, ids in (('x', '123'), ('y', '1234'), ('z', '35')):
+        for id_ in ids:
+            block.add(block_id, 'ds1', id_)
+    for id_ in '12':
+        block.add('x', 'ds2', id_)
+        block.add('y', 'ds2', id_)
+
+    expected = set([('1', '2'), ('1', '3'), ('2', '3'), ('1', '4'), ('2', '4'), ('3', '4'), ('3', '5')])
+    for buffer_size in (None, 1, 2, 100):
+        pairs = list(block.unique_pairs('ds1', buffer_size=buffer_size))
+        assert len(pairs) == len(expected) and set(pairs) == expected
+    pairs = list(block.unique_pairs('ds1', 'ds2', buffer_size=2))
+    assert len(pairs) == 8 and pairs == sorted(set((id1, id2) for _, id1, id2 in block.pairwise('ds1', 'ds2')))
+
+    report = block.pair_redundancy('ds1')
+    assert report['pairs'] == 3 + 6 + 1 and report['unique_pairs'] == 7
+    assert report['redundancy_ratio'] == pytest.approx(0.3)
+    assert block.pair_redundancy('ds1', 'ds2', buffer_size=2)['pairs'] == 6 + 8
+    assert Block().pair_redundancy('ds1')['redundancy_ratio'] == 0.0
+
+
+def test_block_statistics_and_purge():
+    block = Block()
+    for block_id, ids in (('x', '12'), ('y', '123'), ('z', '1234'), ('w', '5')):
+        for id_ in ids:
+            block.add(block_id, 'ds1', id_)
+    block.add('z', 'ds2', '1')
+    block.add('z', 'ds2', '2')
+
+    stats = block.statistics(top=2)
+    assert stats['blocks'] == 4 and stats['records'] == 2 + 3 + 6 + 1
+    assert stats['size_histogram'] == {1: 1, 2: 1, 3: 1, 6: 1}
+    assert stats['comparisons'] == {('ds1', 'ds1'): 1 + 3 + 6, ('ds1', 'ds2'): 8, ('ds2', 'ds2'): 1}
+    assert stats['largest_blocks'] == [('z', 6), ('y', 3)]
+
+    assert block.purge(100, 'ds1') == {'max_size': None, 'removed_blocks': 0, 'comparisons': 10}
+    block_black_list = BlockBlackList()
+    assert block.purge(5, 'ds1', block_black_list=block_black_list) == \
+        {'max_size': 3, 'removed_blocks': 1, 'comparisons': 4}
+    assert block.get('z') is None and block_black_list.has('z')
+    assert block.purge(0, 'ds1') == {'max_size': 1, 'removed_blocks': 2, 'comparisons': 0}
+
+
+def test_block_black_list_size():
+    block = Block()
+    fetched = []
+    get = block.key_set_adapter.get
+    block.key_set_adapter.get = lambda key: fetched.append(key) or get(key)
+
+    block_black_list = BlockBlackList(max_size=3)
+    for id_ in ['1', '2', '2', '3', '4', '5']:
+        if block_black_list.has('x'):
+            continue
+        block.add('x', 'ds1', id_)
+        block_black_list.add('x', block)
+    # sizes come from the adapter, the block data is not fetched
+    assert fetched == []
+    assert block.get('x') is None and block_black_list.has('x')
+
+    # changes which don't go through the black list are seen
+    block_black_list = BlockBlackList(max_size=3)
+    block.add('y', 'ds1', '1')
+    block_black_list.add('y', block)
+    block.key_set_adapter.set('y', set(('ds1', id_) for id_ in '1234'))
+    block.add('y', 'ds1', '5')
+    block_black_list.add('y', block)
+    assert block.get('y') is None and block_black_list.has('y')
+    block.add('z', 'ds1', '1')
+    block_black_list.add('z', block)
+    block.key_set_adapter.delete('z')
+    for id_ in '123':
+        block.add('z', 'ds1', id_)
+        block_black_list.add('z', block)
+    assert len(block.get('z')) == 3 and not block_black_list.has('z')
+
+    compact = CompactBlock()
+    for id_ in '1223':
+        compact.add('x', 'ds1', id_)
+        block_black_list.add('x', compact)
+    assert compact.key_set_adapter.size('x') == 3 and not block_black_list.has('x')
+    compact.add('x', 'ds1', '4')
+    block_black_list.add('x', compact)
+    assert compact.get('x') is None and block_black_list.has('x')
+
+
+def test_compact_block(monkeypatch):
+    bg = TokenBlockGenerator()
+    block = bg.block(ds, function_=lambda r: r.name.split(' '))
+    compact = bg.block(ds, function_=lambda r: r.name.split(' '), block=CompactBlock())
+    assert compact.get('apple') == set([(ds.id, '1'), (ds.id, '3')])
+    assert compact.get('nothing') is None
+
+    def pairs(b, *args):
+        return sorted((block_id, min(id1, id2), max(id1, id2)) for block_id, id1, id2 in b.pairwise(*args))
+
+    for b in (compact, CompactBlock.from_block(block), compact.freeze()):
+        assert dict(b.key_set_adapter) == dict(block.key_set_adapter)
+        assert sorted(b) == sorted(block)
+        assert pairs(b, ds) == pairs(block, ds)
+        assert list(b.pairwise('unknown')) == []
+    assert compact.frozen
+    with pytest.raises(ValueError):
+        compact.add('apple', ds.id, '2')
+
+    compact = CompactBlock()
+    compact.add('x', 'ds1', '1')
+    compact.add('x', 'ds2', '1')
+    compact.add('x', 'ds2', '2')
+    compact.add('x', 'ds2', '2')
+    compact.key_set_adapter.set('y', set([('ds1', '1'), ('ds1', '2')]))
+    compact.key_set_adapter.remove('y', ('ds1', '2'))
+    assert sorted(compact.pairwise('ds1', 'ds2')) == [('x', '1', '1'), ('x', '1', '2')]
+    assert list(compact.pairwise('ds1')) == []
+    block_black_list = BlockBlackList(max_size=2)
+    block_black_list.add('x', compact)
+    assert compact.get('x') is None and block_black_list.has('x')
+    assert dict(compact.freeze().key_set_adapter) == {'y': set([('ds1', '1')])}
+
+    # indices beyond 16 bits are not truncated
+    compact = CompactBlock()
+    for i in range(70000):
+        compact.add('x', 'ds{}'.format(i % 3), str(i))
+        compact.add('y', 'ds{}'.format(i), '1')
+    compact.freeze()
+    assert compact.key_set_adapter.get('x') == set(('ds{}'.format(i % 3), str(i)) for i in range(70000))
+    assert compact.key_set_adapter.get('y') == set(('ds{}'.format(i), '1') for i in range(70000))
+
+    compact = CompactBlock()
+    monkeypatch.setattr('rltk.blocking.compact_block._MAX_RECORDS', 2)
+    compact.add('x', 'ds1', '1')
+    compact.add('x', 'ds1', '2')
+    with pytest.raises(ValueError):
+        compact.add('x', 'ds1', '3')
+
+
+def test_meta_blocker(monkeypatch):
+    block = Block()
+    for block_id, ids in (('x', '12'), ('y', '12'), ('z', '123'), ('w', '34')):
+        for id_ in ids:
+            block.add(block_id, 'ds1', id_)
+
+    def pairs(mb, *args):
+        return sorted((min(id1, id2), max(id1, id2)) for id1, id2, _ in mb.pairs(block, *args))
+
+    # cbs: 1-2: 3, 1-3: 1, 2-3: 1, 3-4: 1
+    assert pairs(MetaBlocker('cbs', 'wep'), 'ds1') == [('1', '2')]
+    assert pairs(MetaBlocker('cbs', 'wnp'), 'ds1') == [('1', '2'), ('1', '3'), ('2', '3'), ('3', '4')]
+    result = pairs(MetaBlocker('cbs', 'cnp', k=1), 'ds1')  # 1-3 and 2-3 tie for 3
+    assert len(result) == 3 and ('1', '2') in result and ('3', '4') in result
+    result = pairs(MetaBlocker('cbs', 'rcnp', k=1), 'ds1')
+    assert result[0] == ('1', '2') and len(result) <= 2
+    assert pairs(MetaBlocker('js', 'wep'), 'ds1') == [('1', '2'), ('3', '4')]  # 1, 0.25, 0.25, 0.5
+    weights = dict(((min(id1, id2), max(id1, id2)), w) for id1, id2, w in MetaBlocker('arcs', 'wnp').pairs(block, 'ds1'))
+    assert weights[('1', '2')] == pytest.approx(1 + 1 + 1.0 / 3)
+    assert weights[('3', '4')] == pytest.approx(1.0)
+    weights = dict(((min(id1, id2), max(id1, id2)), w) for id1, id2, w in MetaBlocker('ecbs', 'wnp').pairs(block, 'ds1'))
+    assert weights[('1', '2')] == pytest.approx(3 * np.log(4.0 / 3) ** 2)
+
+    block.add('x', 'ds2', '1')
+    block.add('w', 'ds2', '2')
+    assert sorted(MetaBlocker().pairs(block, 'ds1', 'ds2')) == [('1', '1', 1.0), ('2', '1', 1.0),
+                                                                 ('3', '2', 1.0), ('4', '2', 1.0)]
+    pruned = MetaBlocker('cbs', 'wep').block(block, 'ds1')
+    assert sorted((min(id1, id2), max(id1, id2)) for _, id1, id2 in pruned.pairwise('ds1')) == [('1', '2')]
+    assert list(MetaBlocker().pairs(Block(), 'ds1')) == []
+    with pytest.raises(ValueError):
+        MetaBlocker(weighting='unknown')
+
+    # comparisons merged into distinct edges after every block
+    for weighting in ('cbs', 'ecbs', 'js', 'arcs'):
+        expected = sorted(MetaBlocker(weighting, 'wnp').pairs(block, 'ds1'))
+        with monkeypatch.context() as m:
+            m.setattr('rltk.blocking.meta_blocker._CHUNK_SIZE', 1)
+            result = sorted(MetaBlocker(weighting, 'wnp').pairs(block, 'ds1'))
+        assert [pair[:2] for pair in result] == [pair[:2] for pair in expected]
+        assert [pair[2] for pair in result] == pytest.approx([pair[2] for pair in expected])
+
+
 def test_hash_block_generator():
     bg = HashBlockGenerator()
     block = bg.block(ds, property_='category')
@@ -77,6 +267,22 @@ def test_token_block_generator():
         assert key in ('apple', 'banana')
 
 
+def test_parallel_block_generator():
+    for bg, function_ in ((HashBlockGenerator(), lambda r: r.category),
+                          (TokenBlockGenerator(), lambda r: r.name.split(' ')),
+                          (SortedNeighbourhoodBlockGenerator(), lambda r: r.name.split(' '))):
+        block = bg.block(ds, function_=function_)
+        parallel_block = bg.block(ds, function_=function_, pp_num_of_processor=2, pp_chunk_size=2)
+        assert dict(parallel_block.key_set_adapter) == dict(block.key_set_adapter)
+
+    block_black_list = BlockBlackList(max_size=1)
+    TokenBlockGenerator().block(ds, function_=lambda r: r.name.split(' '), block_black_list=block_black_list,
+                                pp_num_of_processor=2, pp_chunk_size=1)
+    assert set(key for key, _ in block_black_list.key_set_adapter) == set(['apple', 'banana'])
+    with pytest.raises(ValueError):
+        HashBlockGenerator().block(ds, function_=lambda r: 1, pp_num_of_processor=2)
+
+
 def test_canopy_block_generator():
     random.seed(0)
     bg = CanopyBlockGenerator(t1=5, t2=1, distance_metric=lambda x, y: abs(x[0] - y[0]))
@@ -92,6 +298,16 @@ def test_canopy_block_generator():
         ids = [r[1] for r in v]
         assert sorted(ids) == sorted(result[k]) 
 
+    # built-in metric on numpy vectors gives the same canopies
+    random.seed(0)
+    bg = CanopyBlockGenerator(t1=5, t2=1, distance_metric=euclidean_distance)
+    block = bg.block(ds, function_=lambda r: np.array([ord(r.name[0].lower()) - 0x61]))
+    output_block = bg.generate(block, block)
+    for k, v in output_block.key_set_adapter:
+        ids = [r[1] for r in v]
+        assert sorted(ids) == sorted(result[k])
+
+
 def test_sorted_neighbourhood_block_generator():
     class SNConcreteRecord1(Record):
         @property
@@ -138,3 +354,100 @@ def test_sorted_neighbourhood_block_generator():
         block_data.sort()
         for i in range(len(block_data) - 1):
             assert block_data[i] <= block_data[i+1]  # should be less than or equal to previous char
+
+
+def test_set_similarity_join_block_generator():
+    class TokenRecord(Record):
+        @property
+        def id(self):
+            return self.raw_object['id']
+
+        @property
+        def tokens(self):
+            return set(self.raw_object['name'].split(' '))
+
+    class TokenRecord2(TokenRecord):
+        pass
+
+    raw_data_1 = [
+        {'id': '11', 'name': 'apple banana peach'},
+        {'id': '12', 'name': 'apple banana'},
+        {'id': '13', 'name': 'coconut lime'},
+        {'id': '14', 'name': ''},
+    ]
+    raw_data_2 = [
+        {'id': '21', 'name': 'apple banana peach pear'},
+        {'id': '22', 'name': 'lime coconut'},
+        {'id': '23', 'name': 'pear'},
+    ]
+    ds1 = Dataset(reader=ArrayReader(raw_data_1), record_class=TokenRecord)
+    ds2 = Dataset(reader=ArrayReader(raw_data_2), record_class=TokenRecord2)
+
+    with pytest.raises(ValueError):
+        SetSimilarityJoinBlockGenerator(threshold=0)
+    with pytest.raises(ValueError):
+        SetSimilarityJoinBlockGenerator(threshold=0.5, measure='unknown')
+
+    bg = SetSimilarityJoinBlockGenerator(threshold=0.6)
+    pairs = list(bg.join(ds1, property_='tokens'))
+    assert [sorted((id1, id2)) for id1, id2, _ in pairs] == [['11', '12']]
+    assert pytest.approx(pairs[0][2]) == 2.0 / 3
+
+    pairs = sorted(bg.join(ds1, ds2, property_='tokens'))
+    assert [(id1, id2) for id1, id2, _ in pairs] == [('11', '21'), ('13', '22')]
+    for id1, id2, sim in pairs:
+        assert sim == jaccard_index_similarity(ds1.get_record(id1).tokens, ds2.get_record(id2).tokens)
+
+    block = bg.block(ds1, property_='tokens', dataset2=ds2)
+    assert sorted((r1.id, r2.id) for r1, r2 in candidate_pairs(ds1, ds2, block=block)) == [('11', '21'), ('13', '22')]
+    block = bg.block(ds1, function_=lambda r: r.tokens)
+    assert sorted(sorted((r1.id, r2.id)) for r1, r2 in candidate_pairs(ds1, block=block)) == [['11', '12']]
+
+    bg = SetSimilarityJoinBlockGenerator(threshold=0.8, measure='cosine')
+    pairs = list(bg.join(ds1, property_='tokens'))
+    assert [sorted((id1, id2)) for id1, id2, _ in pairs] == [['11', '12']]
+    assert pytest.approx(pairs[0][2]) == 2 / 6 ** 0.5
+    bg = SetSimilarityJoinBlockGenerator(threshold=0.8, measure='dice')
+    assert sorted((id1, id2) for id1, id2, _ in bg.join(ds1, ds2, property_='tokens')) == [('11', '21'), ('13', '22')]
+
+
+def test_edit_distance_join_block_generator():
+    class NameRecord(Record):
+        @property
+        def id(self):
+            return self.raw_object['id']
+
+        @property
+        def name(self):
+            return self.raw_object['name']
+
+    class NameRecord2(NameRecord):
+        pass
+
+    raw_data_1 = [
+        {'id': '11', 'name': 'jonathan'},
+        {'id': '12', 'name': 'johnathan'},
+        {'id': '13', 'name': 'smith'},
+        {'id': '14', 'name': ''},
+    ]
+    raw_data_2 = [
+        {'id': '21', 'name': 'jonathon'},
+        {'id': '22', 'name': 'smyth'},
+        {'id': '23', 'name': 'ab'},
+    ]
+    ds1 = Dataset(reader=ArrayReader(raw_data_1), record_class=NameRecord)
+    ds2 = Dataset(reader=ArrayReader(raw_data_2), record_class=NameRecord2)
+
+    with pytest.raises(ValueError):
+        EditDistanceJoinBlockGenerator(max_distance=-1)
+
+    bg = EditDistanceJoinBlockGenerator(max_distance=1)
+    assert [(sorted((id1, id2)), d) for id1, id2, d in bg.join(ds1, property_='name')] == [(['11', '12'], 1)]
+    assert sorted(bg.join(ds1, ds2, property_='name')) == [('11', '21', 1), ('13', '22', 1)]
+
+    bg = EditDistanceJoinBlockGenerator(max_distance=2)
+    assert sorted(bg.join(ds1, ds2, property_='name')) == \
+        [('11', '21', 1), ('12', '21', 2), ('13', '22', 1), ('14', '23', 2)]
+    block = bg.block(ds1, function_=lambda r: r.name, dataset2=ds2)
+    assert sorted((r1.id, r2.id) for r1, r2 in candidate_pairs(ds1, ds2, block=block)) == \
+        [('11', '21'), ('12', '21'), ('13', '22'), ('14', '23')]
@@ -65,6 +65,7 @@ def _test_key_set_adapter(adapter):
     adapter.remove('a', '4')
     assert adapter.get('a') == set(['1', '2', '3'])
     assert adapter.get('b') is None
+    assert adapter.size('a') == 3 and adapter.size('b') == 0
     for k, v in adapter:
         assert type(k) == str
         assert k == 'a'
@@ -1,6 +1,12 @@
 # -*- coding: utf-8 -*-
 
+import os
+import shutil
+import tempfile
+import threading
+
 import pytest
+import numpy as np
 
 from rltk.similarity import *
 
@@ -20,6 +26,43 @@ def test_euclidean_distance(v1, v2, w, result):
 def test_manhattan_distance(v1, v2, w, result):
     assert pytest.approx(manhattan_distance(v1, v2, w), 0.001) == result
 
+
+def test_vector_distance_batch():
+    vecs1 = np.array([[1, 2, 3], [0, 0, 0]])
+    vecs2 = [[4, 5, 6], [1, 2, 3], [0, 1, 0]]
+    weights = [1, 3, 9]
+    assert pytest.approx(euclidean_distance(np.array([1, 2, 3]), np.array([4, 5, 6]), weights), 0.001) == 10.817
+    assert pytest.approx(manhattan_distance(np.array([1, 2, 3]), [4, 5, 6], np.array(weights))) == 39
+    assert pytest.approx(cosine_similarity(np.array([1, 2]), np.array([2, 3])), 0.001) == 0.992
+
+    for batch, matrix, scalar in ((euclidean_distance_batch, euclidean_distance_matrix, euclidean_distance),
+                                  (manhattan_distance_batch, manhattan_distance_matrix, manhattan_distance)):
+        for w in (None, weights):
+            result = matrix(vecs1, vecs2, w)
+            assert result.shape == (2, 3)
+            for i, v1 in enumerate(vecs1.tolist()):
+                assert list(batch(v1, vecs2, w)) == pytest.approx(list(result[i]))
+                for j, v2 in enumerate(vecs2):
+                    assert pytest.approx(result[i][j]) == scalar(v1, v2, w)
+        assert matrix(vecs1).shape == (2, 2)
+        assert len(batch([1, 2, 3], [])) == 0
+        for w in ([1, -3, 9], [1, 3], np.array([1, 3, 9, 1])):  # negative or wrong length
+            for vec in ([1, 2, 3], np.array([1, 2, 3])):
+                with pytest.raises(ValueError):
+                    scalar(vec, [4, 5, 6], w)
+            with pytest.raises(ValueError):
+                batch([1, 2, 3], vecs2, w)
+            with pytest.raises(ValueError):
+                matrix(vecs1, vecs2, w)
+
+    result = cosine_similarity_matrix(vecs2, vecs1)
+    assert result.shape == (3, 2)
+    assert pytest.approx(result[0][0]) == cosine_similarity([4, 5, 6], [1, 2, 3])
+    assert result[0][1] == 0.0  # zero vector
+    assert list(cosine_similarity_batch([1, 2, 3], vecs2)) == pytest.approx(list(result[:, 0]))
+    with pytest.raises(ValueError):
+        euclidean_distance_matrix([1, 2, 3], vecs2)
+
 @pytest.mark.parametrize('n1, n2, epsilon, equal', [
     (1, 2, 0, 0),
     (-1, -2, 0, 0),
@@ -100,6 +143,42 @@ def test_levenshtein(s1, s2, distance, similarity):
         assert levenshtein_similarity(s1, s2) == similarity
 
 
+@pytest.mark.parametrize('s1, s2', [
+    ('', 'abc'),
+    ('kitten', 'sitting'),
+    ('flaw', 'lawn'),
+    ('abcdefghij' * 10, 'abcdefghij' * 9 + 'jihgfedcba'),
+    ('the quick brown fox jumps over the lazy dog' * 2, 'a quick brown dog jumps over the lazy fox' * 2),
+])
+def test_levenshtein_bit_parallel(s1, s2):
+    # a custom cost table forces the dynamic programming path
+    expected = levenshtein_distance(s1, s2, insert={'#': 1})
+    assert levenshtein_distance(s1, s2) == expected
+    assert levenshtein_distance(s2, s1) == expected
+    assert levenshtein_distance(s1, s2, insert_default=3, delete_default=3, substitute_default=3) == 3 * expected
+
+
+@pytest.mark.parametrize('s1, s2, max_distance', [
+    ('abc', 'abc', 0),
+    ('kitten', 'sitting', 2),
+    ('kitten', 'sitting', 3),
+    ('abcdef', 'badcfe', 1),
+    ('abcdef', 'badcfe', 3),
+    ('ca', 'abc', 2),
+    ('cape sand recycling', 'edith ann graham', 5),
+    ('cape sand recycling', 'edith ann graham', 20),
+    ('a', 'abcdefg', 4),
+])
+def test_bounded_edit_distance(s1, s2, max_distance):
+    for func in (levenshtein_distance, damerau_levenshtein_distance, optimal_string_alignment_distance):
+        distance = func(s1, s2)
+        expected = distance if distance <= max_distance else max_distance + 1
+        assert func(s1, s2, max_distance=max_distance) == expected
+    distance = levenshtein_distance(s1, s2, delete={'a': 2})
+    expected = distance if distance <= max_distance else max_distance + 1
+    assert levenshtein_distance(s1, s2, delete={'a': 2}, max_distance=max_distance) == expected
+
+
 @pytest.mark.parametrize('s1, s2, insert, delete, substitute,'
                          'insert_default, delete_default, substitute_default, distance', [
                              ('', 'abc', {'c': 50}, {}, {}, 100, 100, 100, 250),
@@ -169,6 +248,33 @@ def test_needleman_wunsch(s1, s2, score):
         assert needleman_wunsch_score(s1, s2) == score
 
 
+def test_dp_scratch_rows():
+    # rows are reused across calls: a long call must not leak into shorter ones, nor into other threads
+    pairs = [('abcdefghijklmnop' * 4, 'bacdefghijklmnpo' * 4), ('ab', 'ba'), ('', 'abc'), ('kitten', 'sitting')]
+    funcs = [
+        lambda s1, s2: levenshtein_distance(s1, s2, delete={'a': 2}),
+        lambda s1, s2: levenshtein_distance(s1, s2, delete={'a': 2}, max_distance=3),
+        lambda s1, s2: levenshtein_distance(s1, s2, max_distance=10),
+        lambda s1, s2: optimal_string_alignment_distance(s1, s2),
+        lambda s1, s2: optimal_string_alignment_distance(s1, s2, max_distance=10),
+        needleman_wunsch_score,
+    ]
+    expected = [[f(s1, s2) for s1, s2 in pairs] for f in funcs]
+    assert expected[3] == [8, 1, 3, 3] and expected[5][1:] == [1, -1.5, 5.5]
+    for _ in range(2):
+        for f, values in zip(funcs, expected):
+            assert [f(s1, s2) for s1, s2 in reversed(pairs)] == values[::-1]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(
+        [[f(s1, s2) for s1, s2 in pairs] for f in funcs for _ in range(20)])) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert all(r == [values for values in expected for _ in range(20)] for r in results)
+
+
 @pytest.mark.parametrize('s1, s2, distance', [
     ('dixon', 'dicksonx', 0.767),
     ('martha', 'marhta', 0.944),
@@ -200,6 +306,17 @@ def test_jaro_winkler(s1, s2, similarity):
         assert pytest.approx(jaro_winkler_similarity(s1, s2), 0.001) == similarity
 
 
+@pytest.mark.parametrize('s1, s2, threshold, scaling_factor, prefix_len, similarity', [
+    ('abchello', 'abcworld', 0.7, 0.1, 4, 0.6833333333333332),
+    ('prefixsame', 'prefixdiff', 0.5, 0.2, 6, 1.0533333333333332),
+    ('a*b*c', 'abc**', 0.7, 0.1, 4, 0.94),
+    ('CRATE', 'trace', 0.7, 0.1, 4, 0.7333333333333334),
+    ('aaaa', 'aa', 0.9, 0.1, 4, 0.8333333333333334),
+])
+def test_jaro_winkler_parameters(s1, s2, threshold, scaling_factor, prefix_len, similarity):
+    assert jaro_winkler_similarity(s1, s2, threshold, scaling_factor, prefix_len) == pytest.approx(similarity)
+
+
 @pytest.mark.parametrize('s1, s2, distance', [
     ('', '', 0),
     ('abc', '', 3),
@@ -208,6 +325,8 @@ def test_jaro_winkler(s1, s2, similarity):
     ('abcd', 'acb', 3),
     ('jellyifhs', 'jellyfish', 4),
     ('ifhs', 'fish', 4),
+    ('Apple iPhone 13 Pro Max 256GB Sierra Blue Unlocked Renewed Premium edition 2021 model with charger',
+     'iPhone 13 Pro Max (256 GB) - Sierra Blue, Unlocked, Renewed Premium, 2021 model, charger included', 37),
 ])
 def test_longest_common_subsequence_distance(s1, s2, distance):
     if s1 is None or s2 is None:
@@ -226,6 +345,9 @@ def test_longest_common_subsequence_distance(s1, s2, distance):
     ('jellyifhs', 'jellyfish', 0.2222222222222222),
     ('ifhs', 'fish', 0.5),
     ('Hello, world!', u'Hello,Â world!', 0.0714285714285714),
+    ('Apple iPhone 13 Pro Max 256GB Sierra Blue Unlocked Renewed Premium edition 2021 model with charger',
+     'iPhone 13 Pro Max (256 GB) - Sierra Blue, Unlocked, Renewed Premium, 2021 model, charger included',
+     0.19387755102040816),
 ])
 def test_metric_longest_common_subsequence(s1, s2, distance):
     if s1 is None or s2 is None:
@@ -294,6 +416,181 @@ def test_tf_idf(bag1, bag2, df_corpus, doc_size, math_log, score):
         assert pytest.approx(tf_idf_similarity(bag1, bag2, df_corpus, doc_size, math_log), 0.001) == score
 
 
+def test_tf_idf_class():
+    tfidf = TF_IDF()
+    tfidf.add_document('id1', ['a', 'b', 'a'])
+    tfidf.add_document('id2', ['a', 'c'])
+    tfidf.add_document('id3', ['a', 'b'])
+    with pytest.raises(ValueError):
+        tfidf.similarity('id1', 'id2')
+    tfidf.pre_compute()
+    df_corpus = {'a': 3, 'b': 2, 'c': 1}
+    assert pytest.approx(tfidf.similarity('id1', 'id2'), 1e-9) == \
+        tf_idf_similarity(['a', 'b', 'a'], ['a', 'c'], df_corpus, 3)
+    assert pytest.approx(tfidf.similarity('id1', 'id1'), 1e-9) == 1.0
+    assert list(tfidf.similarity_many('id1', ['id2', 'id3', 'id1'])) == pytest.approx(
+        [tfidf.similarity('id1', 'id2'), tfidf.similarity('id1', 'id3'), 1.0])
+
+    tfidf.pre_compute(math_log=True)
+    assert tfidf.similarity('id1', 'id2') == 0.0  # only 'a' is shared, which is in every document
+    assert pytest.approx(tfidf.similarity('id1', 'id3'), 1e-9) == 1.0
+
+
+def test_tf_idf_join():
+    tfidf = TF_IDF()
+    for doc_id, tokens in [('id1', ['a', 'b']), ('id2', ['a', 'b', 'c']), ('id3', ['c', 'd']), ('id4', ['e'])]:
+        tfidf.add_document(doc_id, tokens)
+    tfidf.pre_compute()
+
+    pairs = sorted(tfidf.similarity_join(threshold=0.1, chunk_size=2))
+    assert [(id1, id2) for id1, id2, _ in pairs] == [('id1', 'id2'), ('id2', 'id3')]
+    for id1, id2, score in pairs:
+        assert pytest.approx(score, 1e-9) == tfidf.similarity(id1, id2)
+    assert [(id1, id2) for id1, id2, _ in tfidf.similarity_join(threshold=0.9)] == []
+
+    top = list(tfidf.top_k(1, chunk_size=3))
+    assert [(id1, id2) for id1, id2, _ in top] == [('id1', 'id2'), ('id2', 'id1'), ('id3', 'id2')]
+
+    other = TF_IDF()
+    other.add_document('o1', ['a', 'b', 'x'])
+    other.add_document('o2', ['e'])
+    other.pre_compute()
+    pairs = sorted((id1, id2) for id1, id2, _ in tfidf.similarity_join(other, threshold=0.1))
+    assert pairs == [('id1', 'o1'), ('id2', 'o1'), ('id4', 'o2')]
+    assert [(id1, id2) for id1, id2, _ in tfidf.top_k(1, other=other)] == \
+        [('id1', 'o1'), ('id2', 'o1'), ('id4', 'o2')]
+
+    # joins right after incremental changes, without calling pre_compute()
+    tfidf.add_document('id5', ['e', 'f'])
+    other.remove_document('o1')
+    other.add_document('o3', ['f'])
+    pairs = sorted((id1, id2) for id1, id2, _ in tfidf.similarity_join(threshold=0.1))
+    assert pairs == [('id1', 'id2'), ('id2', 'id3'), ('id4', 'id5')]
+    assert ('id5', 'id4') in [(id1, id2) for id1, id2, _ in tfidf.top_k(1)]
+    pairs = sorted((id1, id2) for id1, id2, _ in tfidf.similarity_join(other, threshold=0.1))
+    assert pairs == [('id4', 'o2'), ('id5', 'o2'), ('id5', 'o3')]
+    assert ('id5', 'o3') in [(id1, id2) for id1, id2, _ in tfidf.top_k(2, other=other)]
+
+
+def test_tf_idf_incremental():
+    docs = {'id1': ['a', 'b', 'a'], 'id2': ['a', 'c'], 'id3': ['b', 'd'], 'id4': ['c', 'd', 'e']}
+    tfidf = TF_IDF()
+    for doc_id, tokens in docs.items():
+        tfidf.add_document(doc_id, tokens)
+    tfidf.pre_compute(math_log=True)
+
+    def rebuilt(docs):
+        expected = TF_IDF()
+        for doc_id, tokens in docs.items():
+            expected.add_document(doc_id, tokens)
+        expected.pre_compute(math_log=True)
+        return expected
+
+    def assert_same(tfidf, expected):
+        assert tfidf.df_corpus == expected.df_corpus
+        assert tfidf.doc_size == expected.doc_size
+        assert sorted(tfidf.tf) == sorted(expected.tf)
+        for id1 in expected.tf:
+            for id2 in expected.tf:
+                assert pytest.approx(tfidf.similarity(id1, id2), 1e-9) == expected.similarity(id1, id2)
+
+    tfidf.remove_document('id4')
+    tfidf.add_document('id1', ['a', 'e'])
+    tfidf.add_document('id5', ['d', 'e'])
+    del docs['id4']
+    docs['id1'] = ['a', 'e']
+    docs['id5'] = ['d', 'e']
+    assert_same(tfidf, rebuilt(docs))  # idf is re-computed lazily
+
+    path = os.path.join(tempfile.gettempdir(), 'rltk_test_tf_idf')
+    try:
+        tfidf.save(path)
+        loaded = TF_IDF.load(path)
+        assert_same(loaded, rebuilt(docs))
+        assert loaded.tf['id3'] == tfidf.tf['id3']
+
+        loaded.remove_document('id2')
+        loaded.add_document('id6', ['b', 'c'])
+        del docs['id2']
+        docs['id6'] = ['b', 'c']
+        assert_same(loaded, rebuilt(docs))
+
+        # score new document against frozen corpus
+        result = loaded.query(['d', 'e', 'unknown'], k=2)
+        assert [doc_id for doc_id, _ in result] == ['id5', 'id3']
+        assert loaded.query(['unknown']) == []
+        assert loaded.doc_size == len(docs)
+    finally:
+        shutil.rmtree(path)
+
+
+def test_tf_idf_save_load_ids():
+    for docs in [{1: ['a', 'b'], 2: ['a', 'c'], 3: ['b', 'x' * 1000]},
+                 {'id1': ['caf\u00e9', 'b'], 'id2': ['caf\u00e9', ''], 'id3': ['b']}]:
+        tfidf = TF_IDF()
+        for doc_id, tokens in docs.items():
+            tfidf.add_document(doc_id, tokens)
+        tfidf.pre_compute()
+        path = os.path.join(tempfile.gettempdir(), 'rltk_test_tf_idf_ids')
+        try:
+            tfidf.save(path)
+            loaded = TF_IDF.load(path)
+            assert loaded.df_corpus == tfidf.df_corpus
+            assert sorted(loaded.tf) == sorted(docs)
+            for id1 in docs:
+                assert loaded.tf[id1] == tfidf.tf[id1]
+                for id2 in docs:
+                    assert pytest.approx(loaded.similarity(id1, id2), 1e-9) == tfidf.similarity(id1, id2)
+            # one long token doesn't widen the other entries
+            assert os.path.getsize(os.path.join(path, 'vocabulary.npy')) < 2000
+        finally:
+            shutil.rmtree(path)
+
+    tfidf = TF_IDF()
+    tfidf.add_document(('a', 1), ['a'])
+    with pytest.raises(ValueError):
+        tfidf.save(os.path.join(tempfile.gettempdir(), 'rltk_test_tf_idf_ids'))
+
+
+def test_soft_tf_idf():
+    df_corpus = {'paul': 1, 'johnson': 1, 'johson': 1, 'paule': 1}
+    assert pytest.approx(soft_tf_idf_similarity(['paul', 'johnson'], ['johson', 'paule'], df_corpus, 2),
+                         1e-6) == 0.943889
+    # exact matches only, same as tf-idf cosine similarity
+    df_corpus = {'a': 3, 'b': 1, 'c': 1}
+    assert pytest.approx(soft_tf_idf_similarity(['a', 'b', 'a'], ['a', 'c'], df_corpus, 3, threshold=1.0),
+                         1e-9) == tf_idf_similarity(['a', 'b', 'a'], ['a', 'c'], df_corpus, 3)
+
+    docs = {'id1': ['paul', 'johnson'], 'id2': ['johson', 'paule'], 'id3': ['smith', 'paul'], 'id4': ['smyth']}
+    tfidf = Soft_TF_IDF(threshold=0.85)
+    for doc_id, tokens in docs.items():
+        tfidf.add_document(doc_id, tokens)
+    tfidf.pre_compute()
+    assert tfidf.neighbours('smith') == {'smith': 1.0, 'smyth': pytest.approx(0.893, 0.001)}
+    for id1 in docs:
+        for id2 in docs:
+            assert pytest.approx(tfidf.similarity(id1, id2), 1e-9) == soft_tf_idf_similarity(
+                docs[id1], docs[id2], tfidf.df_corpus, tfidf.doc_size, threshold=0.85)
+
+    tfidf.remove_document('id4')
+    tfidf.add_document('id5', ['smithe'])
+    assert tfidf.neighbours('smith') == {'smith': 1.0, 'smithe': pytest.approx(0.967, 0.001)}
+
+    # terms which share no q-gram (transpositions) and short terms are neighbours too
+    docs = {1: ['ddca', 'ab'], 2: ['dacd', 'ba'], 3: ['a', 'abdc'], 4: ['b', 'bacd'], 5: ['cd', 'dc', 'c']}
+    for function, threshold in ((jaro_winkler_similarity, 0.9), (jaro_winkler_similarity, 0.7),
+                                (levenshtein_similarity, 0.5)):
+        tfidf = Soft_TF_IDF(threshold=threshold, function=function)
+        for doc_id, tokens in docs.items():
+            tfidf.add_document(doc_id, tokens)
+        tfidf.pre_compute()
+        for id1 in docs:
+            for id2 in docs:
+                assert pytest.approx(tfidf.similarity(id1, id2), 1e-9) == soft_tf_idf_similarity(
+                    docs[id1], docs[id2], tfidf.df_corpus, tfidf.doc_size, threshold=threshold, function=function)
+    assert tfidf.similarity(1, 2) > 0
+
+
 @pytest.mark.parametrize('s1, s2, n, distance', [
     ('', '', 2, 1),
     ('abcd', 'abcd', 2, 0),
@@ -370,6 +667,47 @@ def test_qgram_similarity(s1, s2, n, similarity):
         assert qgram_similarity(s1, s2, n) == similarity
 
 
+@pytest.mark.parametrize('s1, s2, n, distance, similarity', [
+    ('abcde', 'abdcde', 2, 3, 3),
+    ('aaaa', 'aa', 2, 2, 1),
+    ('abab', 'baba', 2, 2, 2),
+    ('ab', 'b', 1, 1, 1),
+    ('abc', '', 2, 2, 0),
+])
+def test_qgram_profile(s1, s2, n, distance, similarity):
+    p1, p2 = qgram_profile(s1, n), qgram_profile(s2, n)
+    assert qgram_profile_distance(p1, p2) == distance
+    assert qgram_profile_similarity(p1, p2) == similarity
+    assert qgram_distance(s1, s2, n) == distance
+    assert qgram_similarity(s1, s2, n) == similarity
+
+
+def test_token_ids():
+    interner = TokenInterner()
+    ids1 = interner.intern(['b', 'a', 'c', 'a'])
+    ids2 = interner.intern(set(['c', 'd']))
+    ids3 = interner.intern([])
+    assert len(interner) == 4
+    assert list(ids1) == [0, 1, 2] and ids1.dtype == np.uint32
+    assert sorted(interner.tokens(ids2)) == ['c', 'd']
+    assert interner.token_id('d') == ids2[-1]
+
+    set1, set2 = set(['a', 'b', 'c']), set(['c', 'd'])
+    assert sorted_overlap(ids1, ids2) == 1
+    assert sorted_jaccard_similarity(ids1, ids2) == jaccard_index_similarity(set1, set2)
+    assert sorted_dice_similarity(ids1, ids2) == dice_similarity(set1, set2)
+    assert sorted_jaccard_similarity(ids1, ids3) == 0 and sorted_dice_similarity(ids3, ids1) == 0
+
+    candidates = [ids1, ids2, ids3, interner.intern(['a', 'c'])]
+    assert list(sorted_overlap_batch(ids1, candidates)) == [3, 1, 0, 2]
+    assert list(sorted_jaccard_similarity_batch(ids1, candidates)) == \
+        pytest.approx([sorted_jaccard_similarity(ids1, c) for c in candidates])
+    assert list(sorted_dice_similarity_batch(ids2, candidates)) == \
+        pytest.approx([sorted_dice_similarity(ids2, c) for c in candidates])
+    assert list(sorted_jaccard_similarity_batch(ids3, candidates)) == [0, 0, 0, 0]
+    assert len(sorted_overlap_batch(ids1, [])) == 0
+
+
 def test_hybrid_jaccard_similarity():
     # use a fixed test cases here only to test hybrid jaccard itself.
     def test_function(n, m):
@@ -390,6 +728,150 @@ def test_hybrid_jaccard_similarity():
                          0.001) == 0.5333
 
 
+def test_hybrid_jaccard_similarity_components():
+    # two independent components: {a, b} x {p, q} and {c} x {r, s}
+    scores = {('a', 'p'): 0.9, ('a', 'q'): 0.8, ('b', 'p'): 0.8, ('c', 'r'): 0.6, ('c', 's'): 0.7}
+
+    def test_function(m, n):
+        return scores.get((m, n), 0.1)
+
+    assert pytest.approx(hybrid_jaccard_similarity(set(['a', 'b', 'c']), set(['p', 'q', 'r', 's']),
+                                                   function=test_function), 0.001) == (0.8 + 0.8 + 0.7) / 4
+    assert hybrid_jaccard_similarity(set(), set(['p'])) == 0.0
+    assert hybrid_jaccard_similarity(set(), set()) == 1.0
+
+    # pruned by length bound, same as computing all pairs
+    set1 = set(['john', 'jonathan', 'smith', 'x'])
+    set2 = set(['jon', 'smyth', 'johnathan', 'doe'])
+    for function in (jaro_winkler_similarity, levenshtein_similarity):
+        def unpruned(m, n):
+            return function(m, n)
+        assert pytest.approx(hybrid_jaccard_similarity(set1, set2, function=function), 1e-9) == \
+            hybrid_jaccard_similarity(set1, set2, function=unpruned)
+
+
+def test_token_score_cache():
+    calls = []
+
+    def test_function(m, n, weight=1.0):
+        calls.append((m, n))
+        return weight if m == n else 0.0
+
+    cache = TokenScoreCache(maxsize=4)
+    assert monge_elkan_similarity(['a', 'b'], ['a', 'c'], test_function, cache=cache) == 0.5
+    assert monge_elkan_similarity(['a', 'b'], ['a', 'c'], test_function, cache=cache) == 0.5
+    assert len(calls) == 4
+    assert (cache.hits, cache.misses) == (4, 4)
+    assert monge_elkan_similarity(['a'], ['a'], test_function, parameters={'weight': 0.5}, cache=cache) == 0.5
+    assert len(cache) == 4  # the least recently used one was evicted
+    assert monge_elkan_similarity(['a'], ['a'], test_function, cache=cache) == 1.0
+    assert len(calls) == 6
+    cache.clear()
+    assert len(cache) == 0 and cache.hits == 0 and cache.misses == 0
+
+    del calls[:]
+    cache = TokenScoreCache(symmetric=True)
+    assert symmetric_monge_elkan_similarity(['a', 'b'], ['a', 'c', 'd'], test_function, cache=cache) == \
+        symmetric_monge_elkan_similarity(['a', 'b'], ['a', 'c', 'd'], test_function)
+    assert len(calls) == 6 + 12  # the second direction is reused from cache
+    assert cache.hits == 6
+    assert hybrid_jaccard_similarity(set(['a', 'b']), set(['a', 'c', 'd']), function=test_function, cache=cache) == \
+        pytest.approx(1.0 / 3)
+    assert cache.hits == 12
+
+    # documented setups give the same results as without cache
+    # (jaro_winkler_similarity('bcaab', 'aacbb') != jaro_winkler_similarity('aacbb', 'bcaab'))
+    bags = [['bcaab', 'paul'], ['aacbb', 'paule'], ['aacbb', 'bcaab']]
+    for function, cache in ((jaro_winkler_similarity, TokenScoreCache()),
+                            (levenshtein_similarity, TokenScoreCache(symmetric=True))):
+        for bag1 in bags:
+            for bag2 in bags:
+                assert symmetric_monge_elkan_similarity(bag1, bag2, function, cache=cache) == \
+                    symmetric_monge_elkan_similarity(bag1, bag2, function)
+
+
+def test_similarity_bound():
+    assert levenshtein_similarity.upper_bound('abc', 'abcdef') == 0.5
+    assert similarity_upper_bound(jaccard_index_similarity, set(['a']), set(['a', 'b'])) == 0.5
+    assert similarity_upper_bound(lambda s1, s2: 0.0, 'a', 'b') == 1.0
+    assert distance_lower_bound(levenshtein_distance, 'abc', 'abcdef') == 3
+    assert distance_lower_bound(levenshtein_distance, 'abc', 'abcdef', max_distance=1) == 2
+    assert cached(levenshtein_similarity).upper_bound('abc', 'abcdef') == 0.5
+
+    pairs = [('abc', 'abd'), ('abc', 'abcdef'), ('', 'ab'), ('', ''), ('johnson', 'jonson')]
+    for s1, s2 in pairs:
+        for f in (levenshtein_similarity, damerau_levenshtein_similarity, optimal_string_alignment_similarity,
+                  jaro_distance, jaro_winkler_similarity):
+            assert f.upper_bound(s1, s2) >= f(s1, s2)
+        for f in (levenshtein_distance, damerau_levenshtein_distance, optimal_string_alignment_distance,
+                  jaro_winkler_distance, longest_common_subsequence_distance, metric_longest_common_subsequence):
+            assert f.lower_bound(s1, s2) <= f(s1, s2)
+        costs = {'insert': {'a': 3}, 'insert_default': 2, 'substitute_default': 4}
+        assert levenshtein_similarity.upper_bound(s1, s2, **costs) >= levenshtein_similarity(s1, s2, **costs)
+        for f in (jaccard_index_similarity, dice_similarity, hybrid_jaccard_similarity):
+            assert f.upper_bound(set(s1), set(s2)) >= f(set(s1), set(s2))
+
+    calls = []
+
+    def test_function(m, n):
+        calls.append((m, n))
+        return 1.0 if m == n else 0.0
+
+    features = [(levenshtein_similarity, 'abc', 'abcdef'), (test_function, 'a', 'a'),
+                (jaro_winkler_similarity, 'abc', 'abd', {'prefix_len': 2})]
+    sim = weighted_similarity(features, weights=[2, 1, 1])
+    assert sim == pytest.approx((2 * 0.5 + 1 + jaro_winkler_similarity('abc', 'abd', prefix_len=2)) / 4)
+    assert weighted_similarity(features, weights=[2, 1, 1], lower_bound=sim) == sim
+    del calls[:]
+    assert weighted_similarity(features, weights=[2, 1, 1], lower_bound=0.8) == 0.0
+    assert len(calls) == 0  # pruned by upper bounds only
+    with pytest.raises(ValueError):
+        weighted_similarity(features, weights=[1])
+
+
+def test_cached():
+    from rltk.io.adapter import MemoryKeyValueAdapter
+
+    calls = []
+
+    def test_function(m, n, weight=1.0):
+        calls.append((m, n))
+        return weight * jaccard_index_similarity(set(m), set(n))
+
+    f = cached(test_function, maxsize=2, symmetric=True)
+    assert f(['a', 'b'], ['a']) == 0.5
+    assert f(['a'], ['a', 'b']) == 0.5
+    assert f(['a'], ['a', 'b'], weight=0.5) == 0.25
+    assert len(calls) == 2
+    assert (f.hits, f.misses, f.evictions, len(f)) == (1, 2, 0, 2)
+    assert f.hit_rate == pytest.approx(1.0 / 3)
+    assert f(('a',), ('a', 'b')) == 0.5  # tuples are not lists
+    assert len(calls) == 3 and f.evictions == 1
+
+    adapter = MemoryKeyValueAdapter()
+    f = cached(levenshtein_similarity, maxsize=1, key_value_adapter=adapter)
+    assert f('abc', 'abd') == levenshtein_similarity('abc', 'abd')
+    f('abc', 'xyz')
+    assert f('abc', 'abd') == levenshtein_similarity('abc', 'abd')
+    assert f.adapter_hits == 1 and f.evictions == 2
+    assert f.cache_info()['hit_rate'] == pytest.approx(1.0 / 3)
+    assert len(list(adapter)) == 2
+    f2 = cached(levenshtein_similarity, key_value_adapter=adapter)  # e.g., another run
+    f2('abc', 'xyz')
+    assert f2.adapter_hits == 1
+    f.clear()
+    assert len(f) == 0 and f.misses == 0 and f.adapter_hits == 0
+
+    # statistics stay consistent with concurrent callers
+    f = cached(levenshtein_similarity, maxsize=0, key_value_adapter=adapter)
+    threads = [threading.Thread(target=lambda: [f('abc', 'abd') for _ in range(500)]) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert f.cache_info()['misses'] == 4000 and f.adapter_hits == 4000
+
+
 @pytest.mark.parametrize('bag1, bag2, similarity, lower_bound', [
     (['paul', 'johnson'], ['johson', 'paule'], 0.944, None),
     (['Niall'], ['Neal'], 0.805, None),
@@ -543,3 +1025,43 @@ def test_nysiis(s, code):
             nysiis(s)
     else:
         assert nysiis(s) == code
+
+
+@pytest.mark.parametrize('s, candidates', [
+    ('dixon', ['dicksonx', 'dixon', 'DIXON', '', 'nodix']),
+    ('', ['abc', '']),
+    ('martha', np.array(['marhta', 'martha', 'm'])),
+    ('John Singer Sargent', ['John S. Sargent', 'Jane Klinger Sargent', 'John Stanislaus Sargent']),
+    ('abcdefghij' * 7, ['abcdefghij' * 6, 'abcdefghij' * 7 + 'x', 'jihgfedcba']),
+    ('abc', []),
+])
+def test_similarity_batch(s, candidates):
+    assert levenshtein_distance_batch(s, candidates).tolist() == [levenshtein_distance(s, c) for c in candidates]
+    assert levenshtein_similarity_batch(s, candidates) == \
+        pytest.approx([levenshtein_similarity(s, c) for c in candidates])
+    assert jaro_winkler_similarity_batch(s, candidates) == \
+        pytest.approx([jaro_winkler_similarity(s, c) for c in candidates])
+    assert needleman_wunsch_score_batch(s, candidates) == \
+        pytest.approx([needleman_wunsch_score(s, c) for c in candidates])
+    same_length = [c for c in candidates if len(c) == len(s)]
+    assert hamming_similarity_batch(s, same_length) == pytest.approx([hamming_similarity(s, c) for c in same_length])
+
+
+def test_similarity_batch_errors():
+    with pytest.raises(ValueError):
+        hamming_distance_batch('abc', ['ab'])
+    with pytest.raises(TypeError):
+        levenshtein_distance_batch('abc', ['ab', 1])
+    with pytest.raises(ValueError):
+        jaro_winkler_similarity_batch(None, ['ab'])
+
+
+def test_phonetic_encode_many():
+    names = ['Ashcraft', 'Tymczak', 'Ashcraft', 'Jackson', 'Catherine']
+    for encode, encode_many in ((soundex, soundex_encode_many),
+                                (metaphone, metaphone_encode_many),
+                                (nysiis, nysiis_encode_many)):
+        assert encode_many(names) == [encode(n) for n in names]
+        assert encode_many(names, cache=False) == [encode(n, cache=False) for n in names]
+    with pytest.raises(ValueError):
+        soundex_encode_many(['Ashcraft', ''])
@@ -1,6 +1,9 @@
+import threading
 import unicodedata
 import warnings
 
+import numpy as np
+
 from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from rltk.dataset import Dataset
@@ -11,6 +14,8 @@ if TYPE_CHECKING:
 MAX_FLOAT = float('inf')
 MIN_FLOAT = float('-inf')
 
+_scratch = threading.local()
+
 
 def check_for_none(*args):
     for arg in args:
@@ -34,6 +39,45 @@ def convert_list_to_set(s):
     return s
 
 
+def strings_to_code_matrix(strings):
+    """
+    Encode strings to a zero-padded matrix of unicode code points, one row per string.
+
+    Args:
+        strings (list): List of strings.
+
+    Returns:
+        tuple: Code point matrix (numpy.ndarray, uint32) and lengths of strings (numpy.ndarray, int64).
+    """
+    lengths = np.fromiter((len(s) for s in strings), dtype=np.int64, count=len(strings))
+    width = int(lengths.max()) if len(strings) > 0 else 0
+    codes = np.zeros((len(strings), width), dtype=np.uint32)
+    if width > 0:
+        flat = np.frombuffer(''.join(strings).encode('utf-32-le', 'surrogatepass'), dtype=np.uint32)
+        codes[np.arange(width) < lengths[:, None]] = flat
+    return codes, lengths
+
+
+def scratch_rows(name, count, length):
+    """
+    Row buffers of dynamic programming which are reused across calls in the same thread.
+    Each thread has its own buffers, they are grown to the longest length seen so far.
+
+    Args:
+        name (str): Owner of the buffers. Functions which may run while another one is \
+            still using its buffers need different names.
+        count (int): Number of rows.
+        length (int): Minimum length of each row.
+
+    Returns:
+        list: `count` rows (list). Rows may be longer than `length` and keep the values of the previous call.
+    """
+    rows = _scratch.__dict__.get(name)
+    if rows is None or len(rows[0]) < length:
+        rows = _scratch.__dict__[name] = [[0] * length for _ in range(count)]
+    return rows
+
+
 def candidate_pairs(dataset1: 'Dataset',
                      dataset2: 'Dataset' = None,
                      block: 'Block' = None,